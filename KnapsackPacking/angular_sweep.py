@@ -0,0 +1,47 @@
+import math
+import numpy as np
+
+# minimum angle (in radians) of the contacts found by a sweep, so that the vertices already touching an edge at the start of the rotation are not considered to stop it
+SWEEP_MIN_CONTACT_ANGLE = 1e-9
+
+
+def get_nearest_arc_hit_angle(points, angle_sign, segments, min_angle=SWEEP_MIN_CONTACT_ANGLE):
+
+    """Return the smallest angle (in radians, greater than the passed minimum) by which any of the points of the passed (n, 2) array can rotate around the origin, in the direction of the passed angle sign (as the rotation angles of poses), before the arc that it traces reaches any of the (x0, y0, x1, y1) segments of the passed (m, 4) array, or infinity if none is reached within a full turn"""
+
+    if not len(points) or not len(segments):
+        return math.inf
+
+    # the arc of each point (rows) is in the circle of its distance to the origin, which intersects the line of each segment (columns) where the segment proportion solves a quadratic equation
+    squared_radii = (points[:, 0] * points[:, 0] + points[:, 1] * points[:, 1])[:, None]
+    start_xs, start_ys = segments[None, :, 0], segments[None, :, 1]
+    x_differences, y_differences = segments[None, :, 2] - start_xs, segments[None, :, 3] - start_ys
+    a = x_differences * x_differences + y_differences * y_differences
+    b = 2 * (start_xs * x_differences + start_ys * y_differences)
+    c = start_xs * start_xs + start_ys * start_ys - squared_radii
+    discriminants = b * b - 4 * a * c
+    is_reached = (discriminants >= 0) & (a > 0)
+    discriminant_roots = np.sqrt(np.where(is_reached, discriminants, 0.))
+
+    # both solutions are checked at once, and the angle from each point to each reached one is measured in the direction of the rotation
+    with np.errstate(divide="ignore", invalid="ignore"):
+        segment_proportions = (-b + np.array([-1., 1.])[:, None, None] * discriminant_roots) / (2 * a)
+    is_hit = is_reached & (segment_proportions >= 0) & (segment_proportions <= 1)
+    hit_xs, hit_ys = start_xs + segment_proportions * x_differences, start_ys + segment_proportions * y_differences
+    point_xs, point_ys = points[:, 0:1], points[:, 1:2]
+    angles = np.mod(angle_sign * np.arctan2(point_xs * hit_ys - point_ys * hit_xs, point_xs * hit_xs + point_ys * hit_ys), 2 * math.pi)
+    is_hit &= angles > min_angle
+
+    return float(angles[is_hit].min()) if is_hit.any() else math.inf
+
+
+def get_max_sweep_angle(center, angle_sign, moving_segments, obstacle_segments, min_angle=SWEEP_MIN_CONTACT_ANGLE):
+
+    """Return the largest angle (in radians) by which the shape with the passed (n, 4) array of boundary segments can continuously rotate around the passed center, in the direction of the passed angle sign (as the rotation angles of poses), before its boundary touches any of the obstacle segments of the passed (m, 4) array, or infinity if it touches none within a full turn"""
+
+    # the first contact between the boundaries of two shapes is either a vertex of the rotating shape reaching an obstacle edge, or an obstacle vertex reaching an edge of the shape, which (relative to the shape) rotates in the opposite direction
+    center_offsets = np.array([center[0], center[1], center[0], center[1]])
+    relative_moving_segments = moving_segments - center_offsets
+    relative_obstacle_segments = obstacle_segments - center_offsets
+
+    return min(get_nearest_arc_hit_angle(relative_moving_segments[:, :2], angle_sign, relative_obstacle_segments, min_angle), get_nearest_arc_hit_angle(relative_obstacle_segments[:, :2], -angle_sign, relative_moving_segments, min_angle))
@@ -0,0 +1,129 @@
+import math
+import random
+import time
+import tracemalloc
+import numpy as np
+from shapely import affinity
+from shapely.geometry import Polygon
+import greedy
+from no_fit_polygon import NoFitPolygonEngine, get_edge_minkowski_sum, get_shape_core
+from problem_solution import Item, Container, Problem
+
+# numbers of iterations of the greedy algorithm with which the options are compared, from a short run to one long enough to amortize the work done in advance
+BENCHMARK_ITER_NUMS = (3000, 20000)
+
+# number of rotation buckets used in the benchmarks of options that need quantized rotations
+BENCHMARK_ROTATION_BUCKET_NUM = 8
+
+# seed of the random number streams of the benchmarked runs, so that the compared options find the same solutions
+BENCHMARK_SEED = 1
+
+# number of seeds of the runs whose times and values are averaged, for options that change the random number streams
+BENCHMARK_SEED_NUM = 5
+
+# number of tentative changes (most of them invalid, and undone) applied in the transaction of the benchmark of the journal
+BENCHMARK_TENTATIVE_CHANGE_NUM = 2000
+
+
+def create_non_convex_problem():
+
+    """Create a problem with a rectangular container and repeated non-convex items (L-shapes, T-shapes and stars) and squares, where most placement attempts collide with placed items"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    t_shape = Polygon([(0, 0), (1.5, 0), (1.5, 0.4), (0.95, 0.4), (0.95, 1.5), (0.55, 1.5), (0.55, 0.4), (0, 0.4)])
+    star = Polygon([(math.cos(angle) * radius, math.sin(angle) * radius) for angle, radius in zip(np.linspace(0, 2 * math.pi, 10, endpoint=False), [0.9, 0.4] * 5)])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+
+    items = [Item(shape, 1., value) for _ in range(10) for value, shape in enumerate([l_shape, t_shape, star, square], 1)]
+
+    return Problem(Container(1000., Polygon([(0, 0), (10, 0), (10, 8), (0, 8)])), items)
+
+
+def benchmark_no_fit_polygons():
+
+    """Compare the calculation of the no-fit polygons of all the pairs of shapes and rotations of a problem with convex decompositions and with sums of pairs of edges, and the greedy algorithm with and without discarding positions with no-fit polygons"""
+
+    problem = create_non_convex_problem()
+    engine = NoFitPolygonEngine(problem.items, BENCHMARK_ROTATION_BUCKET_NUM)
+    shape_indices = sorted(set(engine.shape_indices.values()))
+    pairs = [(fixed_index, fixed_bucket, moving_index, moving_bucket) for fixed_index in shape_indices for fixed_bucket in range(BENCHMARK_ROTATION_BUCKET_NUM) for moving_index in shape_indices for moving_bucket in range(BENCHMARK_ROTATION_BUCKET_NUM)]
+
+    start_time = time.time()
+    engine.precompute()
+    decomposition_time = time.time() - start_time
+
+    start_time = time.time()
+    for fixed_index, fixed_bucket, moving_index, moving_bucket in pairs:
+        fixed_core, _ = get_shape_core(engine.get_rotated_shape(fixed_index, fixed_bucket))
+        moving_core, _ = get_shape_core(engine.get_rotated_shape(moving_index, moving_bucket))
+        get_edge_minkowski_sum(fixed_core, affinity.scale(moving_core, -1., -1., origin=(0., 0.)))
+    edge_time = time.time() - start_time
+
+    print("No-fit polygons of {} pairs: {:.2f} s with convex decompositions, {:.2f} s with sums of pairs of edges".format(len(pairs), decomposition_time, edge_time))
+
+    for iter_num in BENCHMARK_ITER_NUMS:
+        for use_no_fit_polygons in (False, True):
+            problem = create_non_convex_problem()
+            start_time = time.time()
+            solution = greedy.solve_problem(problem, max_iter_num=iter_num, max_iter_num_without_changes=iter_num, rotation_bucket_num=BENCHMARK_ROTATION_BUCKET_NUM, use_no_fit_polygons=use_no_fit_polygons, seed=BENCHMARK_SEED)
+            elapsed_time = time.time() - start_time
+            stats = problem.get_no_fit_polygon_engine(BENCHMARK_ROTATION_BUCKET_NUM).get_stats()
+            print("Greedy, {} iterations, no-fit polygons {}: {:.2f} s, value {}, cache hit rate {:.3f}, {} no-fit polygons calculated".format(iter_num, "on" if use_no_fit_polygons else "off", elapsed_time, solution.value, stats["hit_rate"], stats["misses"]))
+
+
+def benchmark_inner_fit_regions():
+
+    """Compare the greedy algorithm with and without drawing positions from inner-fit regions, in a convex (rectangular) container, averaging several seeds, since the positions drawn differ"""
+
+    for iter_num in BENCHMARK_ITER_NUMS:
+        for use_inner_fit_regions in (False, True):
+            elapsed_times, values = list(), list()
+            for seed in range(BENCHMARK_SEED_NUM):
+                problem = create_non_convex_problem()
+                start_time = time.time()
+                solution = greedy.solve_problem(problem, max_iter_num=iter_num, max_iter_num_without_changes=iter_num, use_inner_fit_regions=use_inner_fit_regions, seed=seed)
+                elapsed_times.append(time.time() - start_time)
+                values.append(solution.value)
+            print("Greedy, {} iterations, inner-fit regions {}: {:.2f} s, value {:.1f} (mean of {} seeds)".format(iter_num, "on" if use_inner_fit_regions else "off", np.mean(elapsed_times), np.mean(values), BENCHMARK_SEED_NUM))
+
+
+def benchmark_journal():
+
+    """Measure the entries logged and the memory allocated by the journal of a transaction where random tentative changes (additions, movements and rotations, most of them invalid and undone within their methods) are applied to a solution, as the mutations of the evolutionary algorithm do"""
+
+    problem = create_non_convex_problem()
+    solution = greedy.solve_problem(problem, max_iter_num=BENCHMARK_ITER_NUMS[0], max_iter_num_without_changes=BENCHMARK_ITER_NUMS[0], seed=BENCHMARK_SEED)
+    random.seed(BENCHMARK_SEED)
+    changes = [(random.randrange(len(problem.items)), random.uniform(0., 1.), solution.get_random_placement(0)[0], random.uniform(-90., 90.)) for _ in range(BENCHMARK_TENTATIVE_CHANGE_NUM)]
+
+    tracemalloc.start()
+    start_time = time.time()
+    checkpoint = solution.begin_transaction()
+    for item_index, operation_probability, position, angle in changes:
+        if operation_probability < 0.2:
+            solution.add_item(item_index, position, angle)
+        elif operation_probability < 0.6:
+            solution.move_item_to(item_index, position)
+        else:
+            solution.rotate_item(item_index, angle)
+    journal_length = len(solution.journal)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    solution.rollback(checkpoint)
+    solution.commit_transaction()
+    elapsed_time = time.time() - start_time
+    tracemalloc.stop()
+
+    print("Journal, {} tentative changes: {} entries, peak memory {:.0f} KB, {:.2f} s".format(BENCHMARK_TENTATIVE_CHANGE_NUM, journal_length, peak_memory / 1024, elapsed_time))
+
+
+def main():
+
+    """Main function"""
+
+    benchmark_no_fit_polygons()
+    benchmark_inner_fit_regions()
+    benchmark_journal()
+
+
+if __name__ == "__main__":
+    main()
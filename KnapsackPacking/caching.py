@@ -0,0 +1,77 @@
+from collections import OrderedDict
+
+
+class LRUCache(object):
+
+    """Class representing a bounded key-value cache that evicts the least recently used entries when full, keeping statistics of its use"""
+
+    __slots__ = ("max_size", "entries", "hits", "misses", "get_value_size")
+
+    def __init__(self, max_size, get_value_size=None):
+
+        """Constructor"""
+
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        # optional function estimating the memory size (in bytes) of a cached value, to report the memory use of the cache
+        self.get_value_size = get_value_size
+
+    def __reduce__(self):
+
+        """Return the constructor and arguments with which an empty copy of the cache is created when unpickled"""
+
+        # the cached values are not serialized, since they can be regenerated on demand
+        return LRUCache, (self.max_size, self.get_value_size)
+
+    def __len__(self):
+
+        """Return the number of cached entries"""
+
+        return len(self.entries)
+
+    def get(self, key, default=None):
+
+        """Return the value cached for the passed key, marking it as the most recently used, or the default value if it is not cached"""
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        self.misses += 1
+
+        return default
+
+    def put(self, key, value):
+
+        """Cache the passed value for the passed key, evicting the least recently used entries if the maximum size is exceeded"""
+
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+
+        """Remove all the cached entries, keeping the statistics"""
+
+        self.entries.clear()
+
+    def reset_stats(self):
+
+        """Reset the hit and miss counters"""
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self):
+
+        """Return a dictionary with the number of hits and misses, the hit rate, the number of cached entries and (if it can be estimated) the memory used by the cached values, in bytes"""
+
+        lookup_num = self.hits + self.misses
+
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookup_num if lookup_num else 0., "size": len(self.entries), "memory": sum(self.get_value_size(value) for value in self.entries.values()) if self.get_value_size else None}
@@ -2,6 +2,8 @@ import numpy as np
 from shapely.geometry.base import BaseGeometry
 from shapely.geometry import Point, MultiPolygon
 from ellipse import Ellipse
+from prepared_shape import PreparedShape
+from circle_kernel import are_all_points_in_circle
 
 # resolution of the polygon approximating a circle used only for visualization; according to Shapely documentation, a resolution of 16 allows to cover 99.8% of the circle's area (https://shapely.readthedocs.io/en/stable/manual.html#object.buffer)
 VISUALIZATION_RESOLUTION = 32
@@ -25,6 +27,9 @@ class Circle(BaseGeometry):
         self.polygon = self.center.buffer(self.radius, resolution=INTERSECTION_POINT_RESOLUTION)
 
     def __reduce__(self):
+
+        """Return the constructor and arguments with which the circle is recreated when unpickled"""
+
         return Circle, (self.center, self.radius)
 
     def intersects(self, other):
@@ -63,6 +68,11 @@ class Circle(BaseGeometry):
 
             return other.radius > self.radius and self.center.distance(other.center) + self.radius + other.radius < 2 * other.radius
 
+        # a prepared shape (e.g. a container's) uses its index of holes to only check the nearby ones
+        if type(other) == PreparedShape:
+
+            return other.contains_circle(self.center, self.radius)
+
         # for a circle to be inside a multi-polygon, it must be within the exterior polygon and not intersecting with the holes
         if type(other) == MultiPolygon:
 
@@ -104,11 +114,8 @@ class Circle(BaseGeometry):
         if type(other) == Ellipse:
             other = other.polygon
 
-        # a circle contains another shape (e.g. polygon) if all the points of the shape are inside the circle, i.e. at a distance less than the radius
-        for coord in other.exterior.coords:
-            if self.center.distance(Point(coord)) >= self.radius:
-                return False
-        return True
+        # a circle contains another shape (e.g. polygon) if all the points of the shape are inside the circle, i.e. at a distance less than the radius; all the distances are computed at once
+        return are_all_points_in_circle(self.center.x, self.center.y, self.radius, np.array(other.exterior.coords)[:, :2])
 
     @property
     def area(self):
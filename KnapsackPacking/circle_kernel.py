@@ -0,0 +1,32 @@
+import numpy as np
+
+
+def get_point_distances(center_x, center_y, points):
+
+    """Return an array with the euclidean distances from the passed center to each of the points of the passed (n, 2) array, computed as GEOS does for point distances"""
+
+    x_differences = points[:, 0] - center_x
+    y_differences = points[:, 1] - center_y
+
+    return np.sqrt(x_differences * x_differences + y_differences * y_differences)
+
+
+def get_circle_intersection_mask(center_x, center_y, radius, centers, radii):
+
+    """Return a boolean array indicating which of the circles defined by the passed (n, 2) array of centers and array of radii intersect with the circle defined by the passed center and radius, i.e. those with a center-to-center distance no greater than the sum of the radii"""
+
+    return get_point_distances(center_x, center_y, centers) <= radius + radii
+
+
+def is_any_point_in_circle(center_x, center_y, radius, points):
+
+    """Return whether any of the points of the passed (n, 2) array is inside the circle defined by the passed center and radius, including its boundary"""
+
+    return bool(len(points)) and bool((get_point_distances(center_x, center_y, points) <= radius).any())
+
+
+def are_all_points_in_circle(center_x, center_y, radius, points):
+
+    """Return whether all the points of the passed (n, 2) array are strictly inside the circle defined by the passed center and radius"""
+
+    return bool((get_point_distances(center_x, center_y, points) < radius).all())
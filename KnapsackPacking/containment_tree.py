@@ -0,0 +1,156 @@
+from shapely.geometry import MultiPolygon, Polygon
+from shape_functions import does_shape_contain_other
+
+
+def has_holes(shape):
+
+    """Return whether the passed shape has holes where other items can be placed, which only multi-polygons are considered to have"""
+
+    return type(shape) == MultiPolygon and any(geom.interiors for geom in shape.geoms)
+
+
+def get_hole_polygons(shape):
+
+    """Return a list with a polygon for each hole of the passed multi-polygon"""
+
+    return [Polygon(hole) for geom in shape.geoms for hole in geom.interiors]
+
+
+def is_bounds_within(bounds, other_bounds):
+
+    """Return whether the passed (min_x, min_y, max_x, max_y) bounds are within the other passed bounds"""
+
+    return other_bounds[0] <= bounds[0] and other_bounds[1] <= bounds[1] and bounds[2] <= other_bounds[2] and bounds[3] <= other_bounds[3]
+
+
+def get_bounds_area(bounds):
+
+    """Return the area of the passed (min_x, min_y, max_x, max_y) bounds"""
+
+    return (bounds[2] - bounds[0]) * (bounds[3] - bounds[1])
+
+
+class ContainmentTree(object):
+
+    """Class representing the tree of the placed items that are inside the holes of other placed items, where the parent of each contained item is the innermost item containing it, so that the items inside an item can be found without checking all of them against its holes"""
+
+    __slots__ = ("holed_item_indices", "parents", "children", "hole_polygons", "changed_indices")
+
+    def __init__(self, holed_item_indices):
+
+        """Constructor"""
+
+        # indices of the items whose shape has holes, which are the only ones that can be parents
+        self.holed_item_indices = holed_item_indices
+
+        # index of the parent of each contained item, and indices of the children of each parent
+        self.parents = dict()
+        self.children = dict()
+
+        # polygons of the holes of the placed items with holes, in their current placement, only created when needed
+        self.hole_polygons = dict()
+
+        # indices of the items whose placement was added, changed or removed since the tree was last updated, which is only done when a query needs it
+        self.changed_indices = set()
+
+    def __deepcopy__(self, memo=None):
+
+        """Return a deep copy"""
+
+        # the indices of the items with holes are shared, and hole polygons are immutable
+        tree_copy = ContainmentTree.__new__(ContainmentTree)
+        tree_copy.holed_item_indices = self.holed_item_indices
+        tree_copy.parents = dict(self.parents)
+        tree_copy.children = {index: set(child_indices) for index, child_indices in self.children.items()}
+        tree_copy.hole_polygons = dict(self.hole_polygons)
+        tree_copy.changed_indices = set(self.changed_indices)
+
+        return tree_copy
+
+    def mark_changed(self, item_index):
+
+        """Register that the placement of the item with the passed index was added, changed or removed, so that its links are updated when needed"""
+
+        self.changed_indices.add(item_index)
+        self.hole_polygons.pop(item_index, None)
+
+    def detach(self, item_index):
+
+        """Remove the link of the item with the passed index with its parent, if any"""
+
+        parent_index = self.parents.pop(item_index, None)
+        if parent_index is not None:
+            child_indices = self.children[parent_index]
+            child_indices.discard(item_index)
+            if not child_indices:
+                del self.children[parent_index]
+
+    def find_parent(self, item_index, placed_items, placed_item_grid):
+
+        """Return the index of the innermost placed item with holes that contains the placed item with the passed index, or None if there is none"""
+
+        bounds = placed_item_grid.item_bounds[item_index]
+
+        # only the items with holes whose bounds contain those of the item can contain it, and the innermost of them has the smallest bounds
+        candidate_indices = [index for index in placed_item_grid.get_neighbor_indices(bounds, item_index) if index in self.holed_item_indices and is_bounds_within(bounds, placed_item_grid.item_bounds[index])]
+        candidate_indices.sort(key=lambda index: get_bounds_area(placed_item_grid.item_bounds[index]))
+
+        for index in candidate_indices:
+
+            if index not in self.hole_polygons:
+                self.hole_polygons[index] = get_hole_polygons(placed_items[index].shape)
+
+            for hole in self.hole_polygons[index]:
+                if does_shape_contain_other(hole, placed_items[item_index].shape):
+                    return index
+
+        return None
+
+    def refresh(self, placed_items, placed_item_grid):
+
+        """Update the links of the items whose placement changed since the tree was last updated, given the passed placed items (by index) and the spatial index of their bounds"""
+
+        # without items with holes, no item can be inside another
+        if not self.holed_item_indices:
+            self.changed_indices.clear()
+
+        if not self.changed_indices:
+            return
+
+        indices_to_update = set()
+        for item_index in self.changed_indices:
+
+            indices_to_update.add(item_index)
+
+            # the children of a changed item may not be inside of it anymore, and the items within the bounds of a changed item with holes may now be inside of it
+            indices_to_update.update(self.children.get(item_index, ()))
+            if item_index in self.holed_item_indices and item_index in placed_items:
+                indices_to_update.update(placed_item_grid.get_neighbor_indices(placed_item_grid.item_bounds[item_index], item_index))
+
+        self.changed_indices.clear()
+
+        for item_index in indices_to_update:
+
+            self.detach(item_index)
+
+            # removed items are only detached, as their children are
+            if item_index not in placed_items:
+                continue
+
+            parent_index = self.find_parent(item_index, placed_items, placed_item_grid)
+            if parent_index is not None:
+                self.parents[item_index] = parent_index
+                self.children.setdefault(parent_index, set()).add(item_index)
+
+    def get_descendant_indices(self, item_index):
+
+        """Return a list with the indices of the items inside the item with the passed index, i.e. its children and, recursively, their own descendants; the tree must be up to date"""
+
+        descendant_indices = list()
+        pending_indices = sorted(self.children.get(item_index, ()))
+        while pending_indices:
+            index = pending_indices.pop()
+            descendant_indices.append(index)
+            pending_indices.extend(sorted(self.children.get(index, ())))
+
+        return descendant_indices
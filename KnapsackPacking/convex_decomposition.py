@@ -0,0 +1,210 @@
+import numpy as np
+
+# relative tolerance of the check of the area covered by the convex parts of a decomposition, which must match that of the decomposed shape
+DECOMPOSITION_AREA_TOLERANCE = 1e-9
+
+
+def get_cross_products(points):
+
+    """Return an array with the cross product of the two edges meeting at each point of the passed (n, 2) array, taken as a closed ring, which is positive where the ring turns counter-clockwise"""
+
+    previous_points = np.roll(points, 1, axis=0)
+    next_points = np.roll(points, -1, axis=0)
+
+    return (points[:, 0] - previous_points[:, 0]) * (next_points[:, 1] - points[:, 1]) - (points[:, 1] - previous_points[:, 1]) * (next_points[:, 0] - points[:, 0])
+
+
+def get_signed_area(points):
+
+    """Return the signed area of the ring with the points of the passed (n, 2) array, positive if it is counter-clockwise"""
+
+    return 0.5 * float((points[:, 0] * np.roll(points[:, 1], -1) - np.roll(points[:, 0], -1) * points[:, 1]).sum())
+
+
+def is_convex_ring(points):
+
+    """Return whether the counter-clockwise ring with the points of the passed (n, 2) array is convex, without any tolerance; collinear points are allowed"""
+
+    return bool((get_cross_products(points) >= 0).all())
+
+
+def is_point_in_triangle(point, corner0, corner1, corner2):
+
+    """Return whether the passed point is inside of the counter-clockwise triangle with the passed corners, or on its boundary"""
+
+    for start, end in ((corner0, corner1), (corner1, corner2), (corner2, corner0)):
+        if (end[0] - start[0]) * (point[1] - start[1]) - (end[1] - start[1]) * (point[0] - start[0]) < 0:
+            return False
+
+    return True
+
+
+def get_triangulation(points, indices):
+
+    """Return a list with the triangles (as lists of three indices) of a triangulation of the counter-clockwise ring with the points of the passed (n, 2) array, in the passed order of indices, found by clipping ears; return None if no ear is found at some step, which only happens for invalid rings"""
+
+    triangles = list()
+    remaining_indices = list(indices)
+
+    while len(remaining_indices) > 3:
+
+        remaining_num = len(remaining_indices)
+        has_clipped = False
+        for i in range(remaining_num):
+
+            previous_index, index, next_index = remaining_indices[i - 1], remaining_indices[i], remaining_indices[(i + 1) % remaining_num]
+            previous_point, point, next_point = points[previous_index], points[index], points[next_index]
+            cross_product = (point[0] - previous_point[0]) * (next_point[1] - point[1]) - (point[1] - previous_point[1]) * (next_point[0] - point[0])
+
+            # a point where the ring does not turn only makes a triangle without area, which is dropped
+            if cross_product == 0:
+                del remaining_indices[i]
+                has_clipped = True
+                break
+
+            # an ear is a convex corner whose triangle contains no other point of the ring
+            if cross_product > 0 and not any(is_point_in_triangle(points[other_index], previous_point, point, next_point) for other_index in remaining_indices if other_index not in (previous_index, index, next_index) and tuple(points[other_index]) not in (tuple(previous_point), tuple(point), tuple(next_point))):
+                triangles.append([previous_index, index, next_index])
+                del remaining_indices[i]
+                has_clipped = True
+                break
+
+        if not has_clipped:
+            return None
+
+    if len(remaining_indices) == 3 and get_signed_area(points[remaining_indices]) > 0:
+        triangles.append(remaining_indices)
+
+    return triangles
+
+
+def merge_convex_parts(points, parts):
+
+    """Merge the passed counter-clockwise parts (as lists of indices of the points of the passed (n, 2) array) that share an edge as long as their union remains convex, and return the resulting list of parts"""
+
+    has_merged = True
+    while has_merged:
+
+        has_merged = False
+        for i in range(len(parts)):
+
+            # edges of the part, as (start index, end index) pairs; a neighbor part traverses a shared edge in the opposite direction
+            edges = {(parts[i][k], parts[i][(k + 1) % len(parts[i])]): k for k in range(len(parts[i]))}
+
+            for j in range(i + 1, len(parts)):
+
+                for k in range(len(parts[j])):
+
+                    start_index, end_index = parts[j][k], parts[j][(k + 1) % len(parts[j])]
+                    if (end_index, start_index) in edges:
+
+                        # join the path of the first part from the end to the start of the shared edge with the path of the second part from its start to its end
+                        first_offset = edges[(end_index, start_index)] + 1
+                        first_path = parts[i][first_offset:] + parts[i][:first_offset]
+                        second_path = parts[j][k + 1:] + parts[j][:k + 1]
+                        merged_part = first_path + second_path[1:-1]
+
+                        if is_convex_ring(points[merged_part]):
+                            parts[i] = merged_part
+                            del parts[j]
+                            has_merged = True
+
+                        break
+
+                if has_merged:
+                    break
+
+            if has_merged:
+                break
+
+    return parts
+
+
+def get_ring_convex_parts(points, offset):
+
+    """Return a list with the parts (as lists of indices, starting from the passed offset) of a convex decomposition of the ring with the distinct points of the passed (n, 2) array, or None if it cannot be decomposed"""
+
+    # consecutive repeated points are skipped, and the ring is traversed counter-clockwise
+    indices = [i for i in range(len(points)) if not np.array_equal(points[i], points[i - 1])]
+    if len(indices) < 3:
+        return None
+    if get_signed_area(points[indices]) < 0:
+        indices.reverse()
+
+    if is_convex_ring(points[indices]):
+        parts = [indices]
+
+    # a non-convex ring is triangulated, and the triangles are merged into bigger convex parts where possible
+    else:
+        triangles = get_triangulation(points, indices)
+        if triangles is None:
+            return None
+        parts = merge_convex_parts(points, triangles)
+
+    # the parts must cover the area of the ring
+    ring_area = get_signed_area(points[indices])
+    if abs(sum(get_signed_area(points[part]) for part in parts) - ring_area) > ring_area * DECOMPOSITION_AREA_TOLERANCE or not all(is_convex_ring(points[part]) for part in parts):
+        return None
+
+    return [[index + offset for index in part] for part in parts]
+
+
+def get_padded_part_index_array(parts):
+
+    """Return a (p, k) array with the indices of the passed p parts (lists of indices), each padded to k indices by repeating its last one, which adds no edge to the part"""
+
+    max_index_num = max(len(part) for part in parts)
+
+    return np.array([part + [part[-1]] * (max_index_num - len(part)) for part in parts], dtype=np.intp)
+
+
+def get_separation_mask(parts, other_parts):
+
+    """Return a (p, q) boolean array indicating which of the convex parts of the passed (p, k, 2) array are separated from each of the convex parts of the passed (q, m, 2) array by the line of one of their own edges (including the repeated points that pad the parts, which give no axis)"""
+
+    # the normals of the edges are the axes onto which the points of both parts are projected
+    part_num, point_num, _ = parts.shape
+    other_part_num, other_point_num, _ = other_parts.shape
+    edges = np.concatenate((parts[:, 1:], parts[:, :1]), axis=1) - parts
+    axes = edges[:, :, ::-1] * (-1., 1.)
+
+    projections = np.matmul(parts, axes.transpose(0, 2, 1))
+    min_projections, max_projections = projections.min(axis=1), projections.max(axis=1)
+    other_projections = np.matmul(other_parts.reshape(-1, 2), axes.reshape(-1, 2).T).reshape(other_part_num, other_point_num, part_num, point_num)
+    other_min_projections, other_max_projections = other_projections.min(axis=1), other_projections.max(axis=1)
+
+    # the projections of a separated pair do not overlap (nor touch) in some axis
+    return ((max_projections < other_min_projections) | (other_max_projections < min_projections)).any(axis=2).T
+
+
+def get_convex_part_intersection_mask(parts, other_parts):
+
+    """Return a (p, q) boolean array indicating which of the convex parts of the passed (p, k, 2) array intersect with (or touch) each of the convex parts of the passed (q, m, 2) array, according to the separating axis theorem: two convex polygons are disjoint if and only if the projections of their points do not overlap in the normal of some of their edges"""
+
+    return ~(get_separation_mask(parts, other_parts) | get_separation_mask(other_parts, parts).T)
+
+
+def get_padded_part_array(parts_list):
+
+    """Return a (p, k, 2) array concatenating the convex parts of the passed list of (p_i, k_i, 2) arrays, padding each part to the maximum number of points by repeating its last one"""
+
+    max_point_num = max(parts.shape[1] for parts in parts_list)
+
+    return np.concatenate([parts if parts.shape[1] == max_point_num else parts[:, np.minimum(np.arange(max_point_num), parts.shape[1] - 1)] for parts in parts_list])
+
+
+def do_convex_parts_intersect(parts, other_parts):
+
+    """Return whether any of the convex parts of the passed (p, k, 2) array intersects with (or touches) any of the convex parts of the passed (q, m, 2) array, i.e. whether the shapes that they compose intersect"""
+
+    return bool(get_convex_part_intersection_mask(parts, other_parts).any())
+
+
+def get_convex_part_set_intersections(parts, other_parts_list):
+
+    """Return a list of booleans indicating whether the shape composed by the convex parts of the passed (p, k, 2) array intersects with (or touches) each of the shapes composed by the convex parts of the passed list of arrays, checked at once"""
+
+    part_nums = [len(other_parts) for other_parts in other_parts_list]
+    part_mask = get_convex_part_intersection_mask(parts, get_padded_part_array(other_parts_list)).any(axis=0)
+
+    return np.logical_or.reduceat(part_mask, np.cumsum([0] + part_nums[:-1])).tolist()
@@ -28,6 +28,9 @@ class Ellipse(BaseGeometry):
         self.polygon = polygon
 
     def __reduce__(self):
+
+        """Return the constructor and arguments with which the ellipse is recreated when unpickled, reusing its approximate polygon"""
+
         return Ellipse, (self.center, self.half_width, self.half_height, self.polygon)
 
     def intersects(self, other):
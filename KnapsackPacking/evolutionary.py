@@ -8,9 +8,10 @@ import greedy
 from circle import Circle
 from common_algorithm_functions import get_time_since
 from ellipse import Ellipse
+from problem_solution import get_solution_options, ROTATION_BUCKET_NUM, LAZY_PLACEMENTS, USE_NO_FIT_POLYGONS, USE_INNER_FIT_REGIONS, USE_OCCUPANCY_GRID, USE_PLACEMENT_CHECK_CACHE, PLACEMENT_CANDIDATE_NUM
 from shape_functions import get_bounds, create_random_polygon, do_shapes_intersect, \
-    create_random_triangle_in_rectangle_corner, does_shape_contain_other, \
-    create_random_quadrilateral_in_rectangle_corners
+    create_random_triangle_in_rectangle_corner, \
+    create_random_quadrilateral_in_rectangle_corners, get_shape_intersections, get_shape_containments
 
 # size of the population
 POPULATION_SIZE = 100
@@ -105,6 +106,12 @@ CONVERGE_GENERATION_NUM = 12
 # maximum proportion of iterations of the generation of an initial solution in which to specialize in trying to place a specific item
 INITIAL_SOLUTION_GENERATION_FIRST_ITEM_SPECIALIZATION_ITER_PROPORTION = 0.5
 
+# default choice of discarding the offspring whose placements are (practically) equal to those of an individual of the population or of previous offspring, according to their fingerprints, before updating the population
+DEDUPLICATE_OFFSPRING = True
+
+# default choice of discarding the offspring with any invalid placement (which changes are not supposed to produce) before updating the population, checking them exhaustively, with evaluations memoized by solution fingerprint
+VALIDATE_OFFSPRING = False
+
 
 def get_fitness(solution):
 
@@ -261,20 +268,26 @@ def get_fittest_solutions(solutions, size, break_ties=True):
     return solutions_by_fitness
 
 
-def generate_initial_solution(problem, item_index_to_place_first=-1, item_specialization_iter_proportion=0., calculate_times=False):
+def generate_initial_solution(problem, item_index_to_place_first=-1, item_specialization_iter_proportion=0., solution_options=None, calculate_times=False):
+
+    """Generate an initial solution for the passed problem trying to place randomly selected items until some termination criteria is met, with the passed options of the placements of solutions, or the default ones"""
 
-    """Generate an initial solution for the passed problem trying to place randomly selected items until some termination criteria is met"""
+    if solution_options is None:
+        solution_options = get_solution_options()
 
     # use the greedy algorithm without weighting, with pure random choices
-    return greedy.solve_problem(problem, greedy_score_function=greedy.get_constant_score, repetition_num=1, max_iter_num=INITIAL_SOLUTION_GENERATION_MAX_ITER_NUM, max_iter_num_without_changes=INITIAL_SOLUTION_GENERATION_CONVERGE_ITER_NUM, item_index_to_place_first=item_index_to_place_first, item_specialization_iter_proportion=item_specialization_iter_proportion, calculate_times=calculate_times)
+    return greedy.solve_problem(problem, greedy_score_function=greedy.get_constant_score, repetition_num=1, max_iter_num=INITIAL_SOLUTION_GENERATION_MAX_ITER_NUM, max_iter_num_without_changes=INITIAL_SOLUTION_GENERATION_CONVERGE_ITER_NUM, item_index_to_place_first=item_index_to_place_first, item_specialization_iter_proportion=item_specialization_iter_proportion, calculate_times=calculate_times, **solution_options)
 
 
-def generate_population(problem, population_size, item_specialization_iter_proportion):
+def generate_population(problem, population_size, item_specialization_iter_proportion, solution_options=None):
 
-    """Generate a population of the passed size for the passed problem"""
+    """Generate a population of the passed size for the passed problem, with the passed options of the placements of solutions, or the default ones"""
 
-    # find the items whose weight does not exceed the container's capacity
-    feasible_item_indices = [index for (index, item) in problem.items.items() if item.weight <= problem.container.max_weight]
+    if solution_options is None:
+        solution_options = get_solution_options()
+
+    # find the items whose weight does not exceed the container's capacity (and that fit in the container, if inner-fit regions are used)
+    feasible_item_indices = [index for (index, item) in problem.items.items() if item.weight <= problem.container.max_weight and (not solution_options["use_inner_fit_regions"] or problem.can_item_fit(index, solution_options["rotation_bucket_num"]))]
 
     # limit the initial number of items to the population size (so that each of the kept items can have at least one specialization solution), picking a random sample of them if exceeding it
     if len(feasible_item_indices) > population_size:
@@ -289,11 +302,11 @@ def generate_population(problem, population_size, item_specialization_iter_propo
     # for each feasible item, initialize a certain number of solutions with that item placed first (if possible)
     for item_index in feasible_item_indices:
 
-        population.extend([generate_initial_solution(problem, item_index, item_specialization_iter_proportion) for _ in range(solution_num_per_item_specialization)])
+        population.extend([generate_initial_solution(problem, item_index, item_specialization_iter_proportion, solution_options) for _ in range(solution_num_per_item_specialization)])
 
     # create as many solutions with standard initialization as needed to reach the wanted population size
     remaining_solution_num = population_size - len(population)
-    population.extend([generate_initial_solution(problem) for _ in range(remaining_solution_num)])
+    population.extend([generate_initial_solution(problem, solution_options=solution_options) for _ in range(remaining_solution_num)])
 
     return population
 
@@ -450,17 +463,22 @@ def get_crossover(parent0, parent1, max_attempt_num, shape_min_length_proportion
         # use the created shape to divide the placed items of each parent in 3 lists: items in the first region (inside the shape), items in the second region (outside the shape), and intersecting items
         parent0_separated_item_indices = list()
         parent1_separated_item_indices = list()
+        shape_bounds = get_bounds(shape)
         for parent in [parent0, parent1]:
             region0_indices, region1_indices, intersected_indices = list(), list(), list()
-            for item_index, placed_item in parent.placed_items.items():
-                has_intersection = do_shapes_intersect(shape, placed_item.shape)
+            placed_item_indices = list(parent.placed_items.keys())
+            intersections = get_shape_intersections(shape, [parent.placed_items[item_index].shape for item_index in placed_item_indices], shape_bounds, [parent.placed_items[item_index].get_current_bounds() for item_index in placed_item_indices])
+            non_intersected_indices = list()
+            for item_index, has_intersection in zip(placed_item_indices, intersections):
                 if has_intersection:
                     intersected_indices.append(item_index)
                 else:
-                    if does_shape_contain_other(shape, placed_item.shape):
-                        region0_indices.append(item_index)
-                    else:
-                        region1_indices.append(item_index)
+                    non_intersected_indices.append(item_index)
+            for item_index, is_contained in zip(non_intersected_indices, get_shape_containments(shape, [parent.placed_items[item_index].shape for item_index in non_intersected_indices])):
+                if is_contained:
+                    region0_indices.append(item_index)
+                else:
+                    region1_indices.append(item_index)
             if parent == parent0:
                 parent0_separated_item_indices = [region0_indices, region1_indices, intersected_indices]
             else:
@@ -470,13 +488,13 @@ def get_crossover(parent0, parent1, max_attempt_num, shape_min_length_proportion
         for item_index in parent0_separated_item_indices[1] + parent0_separated_item_indices[2]:
             offspring0.remove_item(item_index)
         for item_index in parent1_separated_item_indices[1]:
-            offspring0.add_item(item_index, (random.uniform(min_x, max_x), random.uniform(min_y, max_y)), random.uniform(0, 360))
+            offspring0.add_item_randomly(item_index)
 
         # for the second offspring, keep only the items placed in the second region in the first parent, then try to place the items of the first region of the second parent (duplication is internally prevented)
         for item_index in parent0_separated_item_indices[0] + parent0_separated_item_indices[2]:
             offspring1.remove_item(item_index)
         for item_index in parent1_separated_item_indices[0]:
-            offspring1.add_item(item_index, (random.uniform(min_x, max_x), random.uniform(min_y, max_y)), random.uniform(0, 360))
+            offspring1.add_item_randomly(item_index)
 
         # find all the pairs (item index, parent index); one for each intersected item in a parent
         item_parent_pairs = list()
@@ -537,15 +555,12 @@ def mutate_with_addition(solution, max_attempt_num):
     # find the weight than can still be added to the container
     remaining_weight = solution.problem.container.max_weight - solution.weight
 
-    # determine the feasible items: those that are within the capacity limits and not placed yet
-    feasible_item_indices = [index for index in solution.problem.items.keys() if solution.problem.items[index].weight <= remaining_weight and index not in solution.placed_items.keys()]
+    # determine the feasible items: those that are within the capacity limits, not placed yet, and that may fit in the container
+    feasible_item_indices = [index for index in solution.problem.items.keys() if solution.problem.items[index].weight <= remaining_weight and index not in solution.placed_items.keys() and solution.can_item_fit(index)]
 
     # only proceed if there are feasible items
     if feasible_item_indices:
 
-        # determine the bounds of the container
-        min_x, min_y, max_x, max_y = get_bounds(solution.problem.container.shape)
-
         # randomly select an item
         item_index = random.choice(feasible_item_indices)
 
@@ -553,7 +568,7 @@ def mutate_with_addition(solution, max_attempt_num):
         for _ in range(max_attempt_num):
 
             # if the action succeeds, there is nothing more to try
-            if solution.add_item(item_index, (random.uniform(min_x, max_x), random.uniform(min_y, max_y)), random.uniform(0, 360)):
+            if solution.add_item_randomly(item_index):
                 return True
 
     return False
@@ -687,11 +702,13 @@ def get_mutation(solution, min_iter_num, mutation_add_weight, mutation_remove_we
 
     """Generate and return a mutated copy of the passed solution"""
 
-    # all changes will be applied to a copy of the individual
+    # all changes will be applied to a copy of the individual, logging them so that the best intermediate solution can be restored
     mutated_solution = copy.deepcopy(solution)
+    mutated_solution.begin_transaction()
 
-    # temporarily keep the original solution as the best one
-    best_solution = solution
+    # temporarily keep the original solution as the best one, which is represented without checkpoint
+    best_checkpoint = None
+    best_fitness = get_fitness(solution)
 
     removal_num_to_compensate = 0
     iter_count = 0
@@ -724,18 +741,21 @@ def get_mutation(solution, min_iter_num, mutation_add_weight, mutation_remove_we
         else:
             has_mutated = mutate_with_placement_modification(mutated_solution, mutation_modify_max_attempt_num, small_position_change_proportion, small_rotation_change_proportion,  mutation_modify_move_until_intersection_point_num, mutation_modify_move_until_intersection_min_dist_proportion, mutation_modify_rotate_until_intersection_angle_num)
 
-        # if a mutation was applied and there is any possibility to select intermediate solutions as final ones and the current intermediate solution is better than any previous one, keep a copy of it
-        if has_mutated and mutation_intermediate_selection_prob > 0 and get_fitness(mutated_solution) > get_fitness(best_solution):
-            best_solution = copy.deepcopy(mutated_solution)
+        # if a mutation was applied and there is any possibility to select intermediate solutions as final ones and the current intermediate solution is better than any previous one, keep a checkpoint of it
+        if has_mutated and mutation_intermediate_selection_prob > 0 and get_fitness(mutated_solution) > best_fitness:
+            best_checkpoint = mutated_solution.checkpoint()
+            best_fitness = get_fitness(mutated_solution)
 
         iter_count += 1
 
-    # if possible, select an intermediate solution as final with a certain probability if it is better than the last mutation solution
-    if mutation_intermediate_selection_prob > 0 and mutated_solution != best_solution and best_solution != solution and random.uniform(0, 1) < mutation_intermediate_selection_prob:
-        return best_solution
+    # if possible, select an intermediate solution as final with a certain probability if it is better than the last mutation solution, reverting the later changes
+    if mutation_intermediate_selection_prob > 0 and best_checkpoint is not None and random.uniform(0, 1) < mutation_intermediate_selection_prob:
+        mutated_solution.rollback(best_checkpoint)
+
     # otherwise, keep the last mutated solution as final
-    else:
-        return mutated_solution
+    mutated_solution.commit_transaction()
+
+    return mutated_solution
 
 
 def generate_offspring(parents, mutation_min_iter_num, mutation_add_weight, mutation_remove_weight, mutation_modify_weight, mutation_add_max_attempt_num, mutation_modify_max_attempt_num, small_position_change_proportion, small_rotation_change_proportion, mutation_modify_move_until_intersection_point_num, mutation_modify_move_until_intersection_min_dist_proportion, mutation_modify_rotate_until_intersection_angle_num, mutation_intermediate_selection_prob, crossover_ignore_mutation_probability, crossover_max_attempt_num, crossover_shape_min_length_proportion, crossover_shape_max_length_proportion, crossover_shape_min_area_proportion, crossover_polygon_max_vertex_num, crossover_max_permutation_num, crossover_min_fitness_for_non_best, calculate_times=False):
@@ -826,6 +846,22 @@ def get_surviving_population(population, survivor_num, population_update_pool_si
     return surviving_population
 
 
+def get_unique_solutions(solutions, existing_solutions=None):
+
+    """Return the passed solutions discarding those with the same fingerprint as a previous one or as any of the passed existing solutions"""
+
+    fingerprints = {solution.get_fingerprint() for solution in existing_solutions} if existing_solutions else set()
+
+    unique_solutions = list()
+    for solution in solutions:
+        fingerprint = solution.get_fingerprint()
+        if fingerprint not in fingerprints:
+            fingerprints.add(fingerprint)
+            unique_solutions.append(solution)
+
+    return unique_solutions
+
+
 def sort_by_fitness(population):
 
     """Sort the passed population by descending fitness, in-place, without considering tie-breaking criteria"""
@@ -857,7 +893,7 @@ def get_fitness_stats(population):
     return {"max": max_fitness, "min": min_fitness, "avg": fitness_sum / len(population), "mode": max(fitness_counts, key=fitness_counts.get)}
 
 
-def solve_problem(problem, population_size=POPULATION_SIZE, initial_generation_item_specialization_iter_proportion=INITIAL_SOLUTION_GENERATION_FIRST_ITEM_SPECIALIZATION_ITER_PROPORTION, offspring_size=OFFSPRING_SIZE, elite_size=ELITE_SIZE, parent_selection_pool_size=PARENT_SELECTION_POOL_SIZE, population_update_pool_size=POPULATION_UPDATE_POOL_SIZE, max_generation_num=MAX_GENERATION_NUM, converge_generation_num=CONVERGE_GENERATION_NUM, mutation_min_iter_num=MUTATION_MIN_ITER_NUM, mutation_add_weight=MUTATION_ADD_WEIGHT, mutation_remove_weight=MUTATION_REMOVE_WEIGHT, mutation_modify_weight=MUTATION_MODIFY_WEIGHT, mutation_add_max_attempt_num=MUTATION_ADD_MAX_ATTEMPT_NUM, mutation_modify_max_attempt_num=MUTATION_MODIFY_MAX_ATTEMPT_NUM, small_position_change_proportion=MUTATION_MODIFY_SMALL_POSITION_CHANGE_PROPORTION, small_rotation_change_proportion=MUTATION_MODIFY_SMALL_ROTATION_CHANGE_PROPORTION, mutation_modify_move_until_intersection_point_num=MUTATION_MODIFY_MOVE_UNTIL_INTERSECTION_POINT_NUM, mutation_modify_move_until_intersection_min_dist_proportion=MUTATION_MODIFY_MOVE_UNTIL_INTERSECTION_MIN_DIST_PROPORTION, mutation_modify_rotate_until_intersection_angle_num=MUTATION_MODIFY_ROTATE_UNTIL_INTERSECTION_ANGLE_NUM, mutation_intermediate_selection_prob=MUTATION_INTERMEDIATE_SELECTION_PROB, can_use_crossover=CAN_USE_CROSSOVER, crossover_ignore_mutation_probability=CROSSOVER_IGNORE_MUTATION_PROBABILITY, crossover_max_attempt_num=CROSSOVER_MAX_ATTEMPT_NUM, crossover_shape_min_length_proportion=CROSSOVER_SHAPE_MIN_LENGTH_PROPORTION, crossover_shape_max_length_proportion=CROSSOVER_SHAPE_MAX_LENGTH_PROPORTION, crossover_shape_min_area_proportion=CROSSOVER_SHAPE_MIN_AREA_PROPORTION, crossover_polygon_max_vertex_num=CROSSOVER_POLYGON_MAX_VERTEX_NUM, crossover_max_permutation_num=CROSSOVER_MAX_PERMUTATION_NUM, crossover_min_fitness_for_non_best_proportion=CROSSOVER_MIN_FITNESS_FOR_NON_BEST_PROPORTION, calculate_times=False, return_population_fitness_per_generation=False):
+def solve_problem(problem, population_size=POPULATION_SIZE, initial_generation_item_specialization_iter_proportion=INITIAL_SOLUTION_GENERATION_FIRST_ITEM_SPECIALIZATION_ITER_PROPORTION, offspring_size=OFFSPRING_SIZE, elite_size=ELITE_SIZE, parent_selection_pool_size=PARENT_SELECTION_POOL_SIZE, population_update_pool_size=POPULATION_UPDATE_POOL_SIZE, max_generation_num=MAX_GENERATION_NUM, converge_generation_num=CONVERGE_GENERATION_NUM, mutation_min_iter_num=MUTATION_MIN_ITER_NUM, mutation_add_weight=MUTATION_ADD_WEIGHT, mutation_remove_weight=MUTATION_REMOVE_WEIGHT, mutation_modify_weight=MUTATION_MODIFY_WEIGHT, mutation_add_max_attempt_num=MUTATION_ADD_MAX_ATTEMPT_NUM, mutation_modify_max_attempt_num=MUTATION_MODIFY_MAX_ATTEMPT_NUM, small_position_change_proportion=MUTATION_MODIFY_SMALL_POSITION_CHANGE_PROPORTION, small_rotation_change_proportion=MUTATION_MODIFY_SMALL_ROTATION_CHANGE_PROPORTION, mutation_modify_move_until_intersection_point_num=MUTATION_MODIFY_MOVE_UNTIL_INTERSECTION_POINT_NUM, mutation_modify_move_until_intersection_min_dist_proportion=MUTATION_MODIFY_MOVE_UNTIL_INTERSECTION_MIN_DIST_PROPORTION, mutation_modify_rotate_until_intersection_angle_num=MUTATION_MODIFY_ROTATE_UNTIL_INTERSECTION_ANGLE_NUM, mutation_intermediate_selection_prob=MUTATION_INTERMEDIATE_SELECTION_PROB, can_use_crossover=CAN_USE_CROSSOVER, crossover_ignore_mutation_probability=CROSSOVER_IGNORE_MUTATION_PROBABILITY, crossover_max_attempt_num=CROSSOVER_MAX_ATTEMPT_NUM, crossover_shape_min_length_proportion=CROSSOVER_SHAPE_MIN_LENGTH_PROPORTION, crossover_shape_max_length_proportion=CROSSOVER_SHAPE_MAX_LENGTH_PROPORTION, crossover_shape_min_area_proportion=CROSSOVER_SHAPE_MIN_AREA_PROPORTION, crossover_polygon_max_vertex_num=CROSSOVER_POLYGON_MAX_VERTEX_NUM, crossover_max_permutation_num=CROSSOVER_MAX_PERMUTATION_NUM, crossover_min_fitness_for_non_best_proportion=CROSSOVER_MIN_FITNESS_FOR_NON_BEST_PROPORTION, rotation_bucket_num=ROTATION_BUCKET_NUM, lazy_placements=LAZY_PLACEMENTS, use_no_fit_polygons=USE_NO_FIT_POLYGONS, use_inner_fit_regions=USE_INNER_FIT_REGIONS, use_occupancy_grid=USE_OCCUPANCY_GRID, use_placement_check_cache=USE_PLACEMENT_CHECK_CACHE, placement_candidate_num=PLACEMENT_CANDIDATE_NUM, deduplicate_offspring=DEDUPLICATE_OFFSPRING, validate_offspring=VALIDATE_OFFSPRING, calculate_times=False, return_population_fitness_per_generation=False):
 
     """Find and return a solution to the passed problem, using an evolutionary algorithm"""
 
@@ -870,7 +906,7 @@ def solve_problem(problem, population_size=POPULATION_SIZE, initial_generation_i
         start_time = time.time()
 
     # generate the initial population
-    population = generate_population(problem, population_size, initial_generation_item_specialization_iter_proportion)
+    population = generate_population(problem, population_size, initial_generation_item_specialization_iter_proportion, get_solution_options(rotation_bucket_num, lazy_placements, use_no_fit_polygons, use_inner_fit_regions, use_occupancy_grid, use_placement_check_cache, placement_candidate_num))
 
     if calculate_times:
         initial_population_time += get_time_since(start_time)
@@ -936,6 +972,14 @@ def solve_problem(problem, population_size=POPULATION_SIZE, initial_generation_i
         if calculate_times:
             start_time = time.time()
 
+        # if needed, discard the duplicated offspring, which would not add diversity to the population
+        if deduplicate_offspring:
+            offspring = get_unique_solutions(offspring, population)
+
+        # if needed, discard the invalid offspring
+        if validate_offspring:
+            offspring = [solution for solution in offspring if solution.is_valid()]
+
         # define a temporary extended population by joining the original population and their offspring
         extended_population = population + offspring
 
@@ -1,8 +1,9 @@
-import copy
-import itertools
 import random
 import time
-from problem_solution import Solution, get_bounds
+import numpy as np
+from multiprocessing import Pool
+from problem_solution import Solution, get_solution_options, ROTATION_BUCKET_NUM, LAZY_PLACEMENTS, USE_NO_FIT_POLYGONS, USE_INNER_FIT_REGIONS, USE_OCCUPANCY_GRID, USE_PLACEMENT_CHECK_CACHE, PLACEMENT_CANDIDATE_NUM
+from weighted_sampler import WeightedSampler
 from common_algorithm_functions import get_index_after_weight_limit, get_time_since
 
 # default weight of the value of an item in the weighted sum of the value and the profitability ratio, that has a weight of 1-VALUE_WEIGHT
@@ -23,6 +24,24 @@ REPETITION_NUM = 1
 # whether the constant score can be used if explicitely indicated
 CAN_USE_CONSTANT_SCORE = True
 
+# strategy that places each selected item in a uniformly random position (in the container or its inner-fit region) and rotation
+RANDOM_PLACEMENT = "random"
+
+# strategy that tries, in bottom-left order, candidate positions next to the corners of the container and the placed items, discarding the selected item if none is valid
+BOTTOM_LEFT_FILL_PLACEMENT = "bottom-left-fill"
+
+# default strategy to place the selected items
+PLACEMENT_STRATEGY = RANDOM_PLACEMENT
+
+# default number of equally distributed rotations tried for each candidate position with the bottom-left-fill placement strategy
+BOTTOM_LEFT_FILL_ROTATION_NUM = 4
+
+# default number of processes among which the repetitions of the algorithm are distributed; with 1, they are run sequentially in the current process
+PROCESS_NUM = 1
+
+# problem whose repetitions are run in a worker process of a pool, set when the process is started
+worker_state = {"problem": None}
+
 
 def get_constant_score(item, value_weight, area_weight, can_use_constant_score=CAN_USE_CONSTANT_SCORE):
 
@@ -49,180 +68,251 @@ def get_weighted_sum_of_item_value_and_profitability_ratio(item, value_weight, a
     return value_weight * item.value + (1. - value_weight) * get_item_profitability_ratio(item, area_weight)
 
 
-def select_item(items_with_profit_ratio):
-
-    """Given a list of tuples of the form (item_index, item_profitability_ratio, item), select an item proportionally to its profitability ratio, and return its index"""
-
-    # find the cumulative profitability ratios, code based on random.choices() from the standard library of Python
-    cumulative_profit_ratios = list(itertools.accumulate(item_with_profit_ratio[1] for item_with_profit_ratio in items_with_profit_ratio))
-    profit_ratio_sum = cumulative_profit_ratios[-1]
-
-    # randomly select a ratio within the range of the sum
-    profit_ratio = random.uniform(0, profit_ratio_sum)
-
-    # find the value that lies within the random ratio selected; binary search code is based on bisect.bisect_left from standard Python library, but adapted to profitability ratio check
-    lowest = 0
-    highest = len(items_with_profit_ratio)
-    while lowest < highest:
-        middle = (lowest + highest) // 2
-        if cumulative_profit_ratios[middle] <= profit_ratio:
-            lowest = middle + 1
-        else:
-            highest = middle
-
-    return lowest
-
-
-def solve_problem(problem, greedy_score_function=get_weighted_sum_of_item_value_and_profitability_ratio, value_weight=VALUE_WEIGHT, area_weight=AREA_WEIGHT, max_iter_num=MAX_ITER_NUM, max_iter_num_without_changes=MAX_ITER_NUM_WITHOUT_CHANGES, repetition_num=REPETITION_NUM, item_index_to_place_first=-1, item_specialization_iter_proportion=0., calculate_times=False, return_value_evolution=False):
+def solve_repetition(problem, items_by_weight, item_list_indices, max_iter_num, max_iter_num_without_changes, item_index_to_place_first, max_item_specialization_iter_num, solution_options, placement_strategy, bottom_left_fill_rotation_num, calculate_times, return_value_evolution, seed=None):
 
-    """Find and return a solution to the passed problem, using a greedy strategy"""
+    """Run a repetition of the greedy algorithm with the passed (index, score, item) tuples of the items that can be placed, sorted by weight, and return the found solution, the (item discarding, item selection, addition, value evolution) times and the value of each iteration (or None if not requested); if a seed is passed, the random number generators are seeded with it first"""
 
-    # determine the bounds of the container
-    min_x, min_y, max_x, max_y = get_bounds(problem.container.shape)
-
-    max_item_specialization_iter_num = item_specialization_iter_proportion * max_iter_num
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
 
     start_time = 0
-    sort_time = 0
     item_discarding_time = 0
     item_selection_time = 0
     addition_time = 0
     value_evolution_time = 0
 
-    if calculate_times:
-        start_time = time.time()
-
     if return_value_evolution:
         value_evolution = list()
     else:
         value_evolution = None
 
-    if calculate_times:
-        value_evolution_time += get_time_since(start_time)
+    # sampler of the pending items (by position in the sorted list) weighted by their greedy score, created for each repetition, to start fresh
+    pending_items = WeightedSampler([score for (_, score, _) in items_by_weight])
 
-    if calculate_times:
-        start_time = time.time()
+    # create an initial solution with no item placed in the container
+    solution = Solution(problem, **solution_options)
 
-    # sort items (with greedy score calculated) by weight, to speed up their discarding (when they would cause the capacity to be exceeded)
-    original_items_by_weight = [(index_item_tuple[0], greedy_score_function(index_item_tuple[1], value_weight, area_weight), index_item_tuple[1]) for index_item_tuple in sorted(list(problem.items.items()), key=lambda index_item_tuple: index_item_tuple[1].weight)]
+    # placements can only be possible with capacity and valid items
+    if problem.container.max_weight and pending_items:
 
-    if calculate_times:
-        sort_time += get_time_since(start_time)
+        iter_count_without_changes = 0
 
-    if calculate_times:
-        start_time = time.time()
+        # try to add items to the container, for a maximum number of iterations
+        for i in range(max_iter_num):
 
-    # discard the items that would make the capacity of the container to be exceeded
-    original_items_by_weight = original_items_by_weight[:get_index_after_weight_limit(original_items_by_weight, problem.container.max_weight)]
+            if calculate_times:
+                start_time = time.time()
 
-    if calculate_times:
-        item_discarding_time += get_time_since(start_time)
+            # if needed, select a specific item to try to place (only for a maximum number of attempts)
+            if item_index_to_place_first >= 0 and i < max_item_specialization_iter_num:
+                item_index = item_index_to_place_first
+                list_index = -1
 
-    best_solution = None
+            # perform a random choice of the next item to try to place, weighting each item with their profitability ratio, that acts as an stochastic selection probability
+            else:
+                list_index = pending_items.sample()
+                item_index = items_by_weight[list_index][0]
 
-    # if the algorithm is iterated, it is repeated and the best solution is kept in the end
-    for _ in range(repetition_num):
+            if calculate_times:
+                item_selection_time += get_time_since(start_time)
+
+            if calculate_times:
+                start_time = time.time()
+
+            # try to add the item in the first valid candidate placement, in bottom-left order
+            if placement_strategy == BOTTOM_LEFT_FILL_PLACEMENT:
+                is_added = False
+                for position, rotation in solution.get_bottom_left_placements(item_index, bottom_left_fill_rotation_num):
+                    if solution.add_item(item_index, position, rotation):
+                        is_added = True
+                        break
+
+            # try to add the item in a random position and with a random rotation
+            else:
+                is_added = solution.add_item_randomly(item_index)
+
+            # if the placement is valid, remove the item from the pending list
+            if is_added:
+
+                # the item to place first is assumed to have been placed, if there was any
+                item_index_to_place_first = -1
 
-        # if the algorithm is iterated, use a copy of the initial sorted items, to start fresh next time
-        if repetition_num > 1:
-            items_by_weight = copy.deepcopy(original_items_by_weight)
-        else:
-            items_by_weight = original_items_by_weight
+                if calculate_times:
+                    addition_time += get_time_since(start_time)
 
-        # create an initial solution with no item placed in the container
-        solution = Solution(problem)
+                # find the weight that can still be added
+                remaining_weight = problem.container.max_weight - solution.weight
 
-        # placements can only be possible with capacity and valid items
-        if problem.container.max_weight and items_by_weight:
+                # stop early if the capacity has been exactly reached
+                if not remaining_weight:
+                    break
 
-            iter_count_without_changes = 0
+                # remove the placed item from the pending items
+                if list_index >= 0:
+                    pending_items.remove(list_index)
 
-            # try to add items to the container, for a maximum number of iterations
-            for i in range(max_iter_num):
+                # if focusing on an item to place first, find its associated position in the list to remove it
+                elif item_index in item_list_indices:
+                    pending_items.remove(item_list_indices[item_index])
 
                 if calculate_times:
                     start_time = time.time()
 
-                # if needed, select a specific item to try to place (only for a maximum number of attempts)
-                if item_index_to_place_first >= 0 and i < max_item_specialization_iter_num:
-                    item_index = item_index_to_place_first
-                    list_index = -1
+                # discard the items that would make the capacity of the container to be exceeded
+                pending_items.truncate(get_index_after_weight_limit(items_by_weight, remaining_weight))
+
+                if calculate_times:
+                    item_discarding_time += get_time_since(start_time)
+
+                # stop early if it is not possible to place more items, because all have been placed or all the items outside would cause the capacity to be exceeded
+                if not pending_items:
+                    break
 
-                # perform a random choice of the next item to try to place, weighting each item with their profitability ratio, that acts as an stochastic selection probability
-                else:
-                    list_index = select_item(items_by_weight)
-                    item_index = items_by_weight[list_index][0]
+                # reset the potential convergence counter, since an item has been added
+                iter_count_without_changes = 0
+
+            else:
 
                 if calculate_times:
-                    item_selection_time += get_time_since(start_time)
+                    addition_time += get_time_since(start_time)
+
+                # register the fact of being unable to place an item this iteration
+                iter_count_without_changes += 1
+
+                # with bottom-left-fill, the candidate placements are deterministic, so an item that could not be placed is not tried again
+                if placement_strategy == BOTTOM_LEFT_FILL_PLACEMENT:
+                    item_index_to_place_first = -1
+                    if item_index in item_list_indices:
+                        pending_items.remove(item_list_indices[item_index])
+                    if not pending_items:
+                        break
+
+                # stop early if there have been too many iterations without changes (unless a specific item is tried to be placed first)
+                if iter_count_without_changes >= max_iter_num_without_changes and item_index_to_place_first < 0:
+                    break
+
+            if return_value_evolution:
 
                 if calculate_times:
                     start_time = time.time()
 
-                # try to add the item in a random position and with a random rotation; if it is valid, remove the item from the pending list
-                if solution.add_item(item_index, (random.uniform(min_x, max_x), random.uniform(min_y, max_y)), random.uniform(0, 360)):
+                value_evolution.append(solution.value)
 
-                    # the item to place first is assumed to have been placed, if there was any
-                    item_index_to_place_first = -1
+                if calculate_times:
+                    value_evolution_time += get_time_since(start_time)
 
-                    if calculate_times:
-                        addition_time += get_time_since(start_time)
+    return solution, (item_discarding_time, item_selection_time, addition_time, value_evolution_time), value_evolution
 
-                    # find the weight that can still be added
-                    remaining_weight = problem.container.max_weight - solution.weight
 
-                    # stop early if the capacity has been exactly reached
-                    if not remaining_weight:
-                        break
+def initialize_worker(problem):
 
-                    # remove the placed item from the list of pending items
-                    if list_index >= 0:
-                        items_by_weight.pop(list_index)
+    """Set the problem whose repetitions are run in this worker process, which is received only once, when the process is started"""
 
-                    # if focusing on an item to place first, find its associated entry in the list to remove it
-                    else:
-                        for list_i in range(len(items_by_weight)):
-                            if items_by_weight[list_i][0] == item_index:
-                                items_by_weight.pop(list_i)
-                                break
+    worker_state["problem"] = problem
 
-                    if calculate_times:
-                        start_time = time.time()
 
-                    # discard the items that would make the capacity of the container to be exceeded
-                    items_by_weight = items_by_weight[:get_index_after_weight_limit(items_by_weight, remaining_weight)]
+def solve_repetition_in_worker(params):
 
-                    if calculate_times:
-                        item_discarding_time += get_time_since(start_time)
+    """Run a repetition of the greedy algorithm, with the passed (scored item indices, other parameters) pair, for the problem of this worker process, and return the packed solution (cheaper to transfer), the times and the value evolution"""
 
-                    # stop early if it is not possible to place more items, because all have been placed or all the items outside would cause the capacity to be exceeded
-                    if not items_by_weight:
-                        break
+    scored_item_indices, repetition_params = params
+    problem = worker_state["problem"]
 
-                    # reset the potential convergence counter, since an item has been added
-                    iter_count_without_changes = 0
+    # the items are taken from the problem of the worker instead of being transferred with each repetition
+    items_by_weight = [(index, score, problem.items[index]) for (index, score) in scored_item_indices]
+    solution, times, value_evolution = solve_repetition(problem, items_by_weight, *repetition_params)
 
-                else:
+    return solution.pack(), times, value_evolution
 
-                    if calculate_times:
-                        addition_time += get_time_since(start_time)
 
-                    # register the fact of being unable to place an item this iteration
-                    iter_count_without_changes += 1
+def solve_problem(problem, greedy_score_function=get_weighted_sum_of_item_value_and_profitability_ratio, value_weight=VALUE_WEIGHT, area_weight=AREA_WEIGHT, max_iter_num=MAX_ITER_NUM, max_iter_num_without_changes=MAX_ITER_NUM_WITHOUT_CHANGES, repetition_num=REPETITION_NUM, item_index_to_place_first=-1, item_specialization_iter_proportion=0., rotation_bucket_num=ROTATION_BUCKET_NUM, lazy_placements=LAZY_PLACEMENTS, use_no_fit_polygons=USE_NO_FIT_POLYGONS, use_inner_fit_regions=USE_INNER_FIT_REGIONS, use_occupancy_grid=USE_OCCUPANCY_GRID, use_placement_check_cache=USE_PLACEMENT_CHECK_CACHE, placement_candidate_num=PLACEMENT_CANDIDATE_NUM, placement_strategy=PLACEMENT_STRATEGY, bottom_left_fill_rotation_num=BOTTOM_LEFT_FILL_ROTATION_NUM, process_num=PROCESS_NUM, seed=None, calculate_times=False, return_value_evolution=False, return_repetition_values=False):
 
-                    # stop early if there have been too many iterations without changes (unless a specific item is tried to be placed first)
-                    if iter_count_without_changes >= max_iter_num_without_changes and item_index_to_place_first < 0:
-                        break
+    """Find and return a solution to the passed problem, using a greedy strategy; the repetitions can be distributed among processes, and if a seed is passed, each repetition uses an independent random number stream derived from it, so that the results are the same whether run sequentially or in parallel"""
+
+    if placement_strategy not in (RANDOM_PLACEMENT, BOTTOM_LEFT_FILL_PLACEMENT):
+        raise ValueError("Unknown placement strategy: {}".format(placement_strategy))
+
+    max_item_specialization_iter_num = item_specialization_iter_proportion * max_iter_num
+
+    start_time = 0
+    sort_time = 0
+    item_discarding_time = 0
+    item_selection_time = 0
+    addition_time = 0
+    value_evolution_time = 0
 
-                if return_value_evolution:
+    if calculate_times:
+        start_time = time.time()
 
-                    if calculate_times:
-                        start_time = time.time()
+    if return_value_evolution:
+        value_evolution = list()
+    else:
+        value_evolution = None
 
-                    value_evolution.append(solution.value)
+    if calculate_times:
+        value_evolution_time += get_time_since(start_time)
+
+    if calculate_times:
+        start_time = time.time()
 
-                    if calculate_times:
-                        value_evolution_time += get_time_since(start_time)
+    # sort items (with greedy score calculated) by weight, to speed up their discarding (when they would cause the capacity to be exceeded)
+    items_by_weight = [(index_item_tuple[0], greedy_score_function(index_item_tuple[1], value_weight, area_weight), index_item_tuple[1]) for index_item_tuple in sorted(list(problem.items.items()), key=lambda index_item_tuple: index_item_tuple[1].weight)]
+
+    if calculate_times:
+        sort_time += get_time_since(start_time)
+
+    if calculate_times:
+        start_time = time.time()
+
+    # discard the items that would make the capacity of the container to be exceeded
+    items_by_weight = items_by_weight[:get_index_after_weight_limit(items_by_weight, problem.container.max_weight)]
+
+    # if inner-fit regions are used, discard the items that cannot fit in the container
+    if use_inner_fit_regions:
+        items_by_weight = [(index, score, item) for (index, score, item) in items_by_weight if problem.can_item_fit(index, rotation_bucket_num)]
+
+    if calculate_times:
+        item_discarding_time += get_time_since(start_time)
+
+    # the list of sorted items is not modified, and the pending items are tracked by their position in the list
+    item_list_indices = {item_index: list_index for list_index, (item_index, _, _) in enumerate(items_by_weight)}
+
+    # seeds of the independent random number streams of the repetitions, if a seed is passed or the repetitions run in parallel (with a seed drawn from the current stream)
+    if seed is None and process_num > 1:
+        seed = random.getrandbits(64)
+    if seed is not None:
+        repetition_seeds = [int(seed_sequence.generate_state(1)[0]) for seed_sequence in np.random.SeedSequence(seed).spawn(repetition_num)]
+    else:
+        repetition_seeds = [None] * repetition_num
+
+    solution_options = get_solution_options(rotation_bucket_num, lazy_placements, use_no_fit_polygons, use_inner_fit_regions, use_occupancy_grid, use_placement_check_cache, placement_candidate_num)
+    repetition_params = [(item_list_indices, max_iter_num, max_iter_num_without_changes, item_index_to_place_first, max_item_specialization_iter_num, solution_options, placement_strategy, bottom_left_fill_rotation_num, calculate_times, return_value_evolution, repetition_seed) for repetition_seed in repetition_seeds]
+
+    # if allowed, run the repetitions in parallel, in a pool of processes that receive the problem only once
+    if process_num > 1 and repetition_num > 1:
+        scored_item_indices = [(index, score) for (index, score, _) in items_by_weight]
+        with Pool(min(process_num, repetition_num), initializer=initialize_worker, initargs=(problem,)) as process_pool:
+            results = process_pool.map(solve_repetition_in_worker, [(scored_item_indices, params) for params in repetition_params])
+        results = [(packed_solution.unpack(problem), times, repetition_value_evolution) for packed_solution, times, repetition_value_evolution in results]
+
+    # otherwise, run them sequentially
+    else:
+        results = [solve_repetition(problem, items_by_weight, *params) for params in repetition_params]
+
+    best_solution = None
+    repetition_values = list()
+
+    # if the algorithm is iterated, it is repeated and the best solution is kept in the end
+    for solution, (repetition_item_discarding_time, repetition_item_selection_time, repetition_addition_time, repetition_value_evolution_time), repetition_value_evolution in results:
+
+        item_discarding_time += repetition_item_discarding_time
+        item_selection_time += repetition_item_selection_time
+        addition_time += repetition_addition_time
+        value_evolution_time += repetition_value_evolution_time
+        if return_value_evolution:
+            value_evolution.extend(repetition_value_evolution)
+        repetition_values.append(solution.value)
 
         # if the algorithm uses multiple iterations, adopt the current solution as the best one if it is the one with highest value up to now
         if not best_solution or solution.value > best_solution.value:
@@ -233,10 +323,19 @@ def solve_problem(problem, greedy_score_function=get_weighted_sum_of_item_value_
         approx_total_time = sort_time + item_selection_time + item_discarding_time + addition_time + value_evolution_time
         time_dict = {"Weight-sort and profit ratio calculation": (sort_time, sort_time / approx_total_time), "Stochastic item selection": (item_selection_time, item_selection_time / approx_total_time), "Item discarding": (item_discarding_time, item_discarding_time / approx_total_time), "Addition and geometric validation": (addition_time, addition_time / approx_total_time), "Keeping value of each iteration": (value_evolution_time, value_evolution_time / approx_total_time)}
         if return_value_evolution:
+            if return_repetition_values:
+                return best_solution, time_dict, value_evolution, repetition_values
             return best_solution, time_dict, value_evolution
+        if return_repetition_values:
+            return best_solution, time_dict, repetition_values
         return best_solution, time_dict
 
     if return_value_evolution:
+        if return_repetition_values:
+            return best_solution, value_evolution, repetition_values
         return best_solution, value_evolution
 
+    if return_repetition_values:
+        return best_solution, repetition_values
+
     return best_solution
@@ -0,0 +1,135 @@
+import math
+import random
+import numpy as np
+from shapely import affinity
+from shapely.geometry import box, MultiPoint, Point
+from shapely.prepared import prep
+from circle import Circle
+from ellipse import Ellipse
+from no_fit_polygon import get_polygons, is_convex
+
+# default number of equally distributed angles for which inner-fit regions are calculated when rotations are continuous, in which case the region of the nearest angle is used as an approximation
+INNER_FIT_REGION_ROTATION_BUCKET_NUM = 8
+
+# default number of cells per side of the grid that splits an inner-fit region in pieces, to sample positions uniformly with few rejections
+SAMPLING_CELLS_PER_SIDE = 8
+
+# resolution of the polygon circumscribing a circular container, so that the inner-fit regions are never smaller than the real ones
+CIRCLE_CONTAINER_RESOLUTION = 16
+
+# minimum proportion of the area of its bounds that an inner-fit region must fill not to be split in pieces, since positions drawn in its bounds are then rejected at most half of the times
+MIN_UNSPLIT_REGION_FILL_RATIO = 0.5
+
+# relative tolerance under which a piece of an inner-fit region is considered to fill its bounds, so that positions drawn in them are not checked
+BOUNDS_FILL_TOLERANCE = 1e-9
+
+# maximum number of rejected draws when sampling a position in a piece of an inner-fit region, after which the representative point of the piece is used
+MAX_SAMPLING_ATTEMPT_NUM = 100
+
+
+def get_container_polygon(container_shape):
+
+    """Return a (multi-)polygon representing the passed container shape for the calculation of inner-fit regions: circles are circumscribed by a polygon, and ellipses use their approximate polygon"""
+
+    if type(container_shape) == Circle:
+
+        # grow the inscribed polygon of the buffer so that the middle of its edges reaches the circle
+        return container_shape.center.buffer(container_shape.radius / math.cos(math.pi / (4 * CIRCLE_CONTAINER_RESOLUTION)), CIRCLE_CONTAINER_RESOLUTION)
+
+    if type(container_shape) == Ellipse:
+
+        return container_shape.polygon
+
+    return container_shape
+
+
+def can_calculate_inner_fit_regions(container_shape):
+
+    """Return whether the inner-fit regions of shapes in the passed container shape can be calculated, which is only the case for convex containers, where they are cheap; in a non-convex container, the region would need the no-fit polygon of the outside of the container, which costs more than the exact checks that it saves"""
+
+    return is_convex(get_container_polygon(container_shape))
+
+
+def get_inner_fit_region_shape(container_shape, shape):
+
+    """Return the inner-fit region of the passed shape (with its reference position in the origin) in the passed convex container shape, i.e. the (possibly empty) set of reference positions where the shape is within the container"""
+
+    container_polygon = get_container_polygon(container_shape)
+
+    # a circle fits wherever its center is far enough from the boundary of the container, i.e. in the container shrunk by the radius
+    if type(shape) == Circle:
+
+        return container_polygon.buffer(-shape.radius)
+
+    # for the ellipse, use the approximate polygon
+    if type(shape) == Ellipse:
+        shape = shape.polygon
+
+    # a convex container contains the shape if it contains all the vertices of the convex hull of the shape, so the region is the intersection of the container translated to the opposite of each vertex
+    region = container_polygon
+    for x, y in MultiPoint([coord for polygon in get_polygons(shape) for coord in polygon.exterior.coords]).convex_hull.exterior.coords[:-1]:
+        region = region.intersection(affinity.translate(container_polygon, -x, -y))
+
+    return region
+
+
+class InnerFitRegion(object):
+
+    """Class representing the inner-fit region of an item in a container, split in pieces so that positions can be uniformly sampled from it"""
+
+    __slots__ = ("shape", "area", "pieces", "prepared_pieces", "cumulative_areas")
+
+    def __init__(self, shape, cells_per_side=SAMPLING_CELLS_PER_SIDE):
+
+        """Constructor"""
+
+        self.shape = shape
+        self.area = shape.area
+
+        # pieces of the region inside the cells of a grid over its bounds, which fill most of their own bounds, with the cumulative areas used to select them proportionally to their area; a region that already fills most of its bounds (e.g. in a rectangular container) is its only piece
+        self.pieces = list()
+        if self.area > 0 and self.area >= box(*shape.bounds).area * MIN_UNSPLIT_REGION_FILL_RATIO:
+            self.pieces.append(shape)
+        elif self.area > 0:
+            min_x, min_y, max_x, max_y = shape.bounds
+            cell_width = (max_x - min_x) / cells_per_side
+            cell_height = (max_y - min_y) / cells_per_side
+            for column in range(cells_per_side):
+                for row in range(cells_per_side):
+                    piece = shape.intersection(box(min_x + column * cell_width, min_y + row * cell_height, min_x + (column + 1) * cell_width, min_y + (row + 1) * cell_height))
+                    if piece.area > 0:
+                        self.pieces.append(piece)
+        self.cumulative_areas = np.cumsum([piece.area for piece in self.pieces])
+
+        # prepared pieces to check the positions drawn in their bounds, or None for the pieces that fill their bounds, where every position is valid
+        self.prepared_pieces = [None if piece.area >= box(*piece.bounds).area * (1 - BOUNDS_FILL_TOLERANCE) else prep(piece) for piece in self.pieces]
+
+    def is_empty(self):
+
+        """Return whether the region has no position, i.e. the item cannot fit in the container"""
+
+        return self.shape.is_empty
+
+    def sample_position(self):
+
+        """Return a random (x, y) position uniformly distributed in the region, which must not be empty"""
+
+        # a region without area (where the item fits exactly) has no pieces, so any of its points is used
+        if not self.pieces:
+            representative_point = self.shape.representative_point()
+            return representative_point.x, representative_point.y
+
+        # select a piece with a probability proportional to its area
+        piece_index = min(int(np.searchsorted(self.cumulative_areas, random.uniform(0, self.cumulative_areas[-1]), side="right")), len(self.pieces) - 1)
+        piece, prepared_piece = self.pieces[piece_index], self.prepared_pieces[piece_index]
+
+        # draw points in the bounds of the piece until one is inside of it
+        min_x, min_y, max_x, max_y = piece.bounds
+        for _ in range(MAX_SAMPLING_ATTEMPT_NUM):
+            position = (random.uniform(min_x, max_x), random.uniform(min_y, max_y))
+            if prepared_piece is None or prepared_piece.intersects(Point(position)):
+                return position
+
+        representative_point = piece.representative_point()
+
+        return representative_point.x, representative_point.y
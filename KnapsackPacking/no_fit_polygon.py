@@ -0,0 +1,353 @@
+import math
+import numpy as np
+from shapely import affinity
+from shapely.geometry import JOIN_STYLE, MultiPoint, MultiPolygon, Point, Polygon
+from shapely.ops import unary_union
+from shapely.prepared import prep
+from caching import LRUCache
+from circle import Circle
+from ellipse import Ellipse
+from shape_functions import get_pose_matrix, transform_shape, get_transformed_points, get_shape_vertex_array, get_convex_part_index_array
+
+# default maximum number of convex parts of the decomposition of a shape used to calculate its no-fit polygons, beyond which (or for shapes with holes) the sums of pairs of edges are used instead
+NO_FIT_POLYGON_MAX_CONVEX_PART_NUM = 32
+
+# default distance by which the positions touching a placed item are separated from it, since shapes that touch are considered intersecting
+TOUCHING_GAP = 1e-6
+
+# relative difference between the area of a polygon and the area of its convex hull under which the polygon is considered convex
+CONVEXITY_TOLERANCE = 1e-9
+
+
+def get_shape_core(shape):
+
+    """Return the (core, radius) pair describing the passed shape as the set of points at a distance no greater than the radius from the core, which is a point for circles and the (approximate) polygon itself, with null radius, for the rest of shapes"""
+
+    if type(shape) == Circle:
+
+        return shape.center, shape.radius
+
+    # for the ellipse, use the approximate polygon
+    if type(shape) == Ellipse:
+
+        return shape.polygon, 0.
+
+    return shape, 0.
+
+
+def get_polygons(shape):
+
+    """Return the list of polygons composing the passed polygon or multi-polygon"""
+
+    if type(shape) == MultiPolygon:
+
+        return list(shape.geoms)
+
+    return [shape]
+
+
+def is_convex(shape):
+
+    """Return whether the passed shape is a convex polygon without holes"""
+
+    return type(shape) == Polygon and not shape.interiors and shape.convex_hull.area - shape.area <= shape.convex_hull.area * CONVEXITY_TOLERANCE
+
+
+def get_convex_parts(shape, max_part_num=NO_FIT_POLYGON_MAX_CONVEX_PART_NUM):
+
+    """Return a list with (n, 2) arrays of the counter-clockwise points of the parts of a convex decomposition of the passed (multi-)polygon, or None if it has holes or cannot be decomposed in the passed maximum number of parts"""
+
+    part_indices = get_convex_part_index_array(shape, max_part_num)
+    if part_indices is None:
+        return None
+
+    # the padding of the parts repeats their last point, which adds no edge
+    vertex_array = get_shape_vertex_array(shape)
+
+    return [vertex_array[indices] for indices in part_indices]
+
+
+def get_convex_sum(points0, points1):
+
+    """Return an (n, 2) array with the points of the Minkowski sum of the two convex polygons with the passed (n0, 2) and (n1, 2) arrays of counter-clockwise points, found by merging their edges sorted by angle, in O(n0 + n1) time after sorting"""
+
+    point_lists, edge_angle_lists = list(), list()
+    for points in (points0, points1):
+
+        # each polygon is traversed from its lowest (and then leftmost) point, from where the angles of its edges grow in [0, 2 * pi); repeated points are skipped
+        points = points[np.any(points != np.roll(points, -1, axis=0), axis=1)]
+        points = np.roll(points, -np.lexsort((points[:, 0], points[:, 1]))[0], axis=0)
+        edges = np.roll(points, -1, axis=0) - points
+        point_lists.append(points)
+        edge_angle_lists.append(np.arctan2(edges[:, 1], edges[:, 0]) % (2 * math.pi))
+
+    # each point of the sum adds the points of both polygons reached after following the edges merged so far, so that it is an exact sum of their points
+    is_first_edge = np.concatenate((np.ones(len(edge_angle_lists[0]), dtype=bool), np.zeros(len(edge_angle_lists[1]), dtype=bool)))[np.argsort(np.concatenate(edge_angle_lists), kind="stable")][:-1]
+    indices0 = np.concatenate(([0], np.cumsum(is_first_edge)))
+    indices1 = np.concatenate(([0], np.cumsum(~is_first_edge)))
+
+    # a polygon whose edges have all been followed is back at its first point
+    return point_lists[0][indices0 % len(point_lists[0])] + point_lists[1][indices1 % len(point_lists[1])]
+
+
+def get_shape_key(shape):
+
+    """Return a hashable key of the passed shape, equal for shapes with the same type and geometry"""
+
+    core, radius = get_shape_core(shape)
+
+    return type(shape), core.wkb, radius
+
+
+def get_shape_indices(items):
+
+    """Return a dictionary with the index of the first of the passed items (by index) with the same canonical shape as each item, so that the regions calculated for an item can be shared with the equal ones"""
+
+    first_indices = dict()
+
+    return {item_index: first_indices.setdefault(get_shape_key(item.canonical_shape), item_index) for item_index, item in items.items()}
+
+
+def get_minkowski_sum(shape0, shape1, parts0=None, parts1=None):
+
+    """Return the Minkowski sum of the two passed shapes, each of them either a point or a (multi-)polygon, possibly with holes, using the passed convex parts of their decompositions, if any, instead of decomposing them"""
+
+    # the sum with a point is a translation
+    if type(shape0) == Point:
+
+        return affinity.translate(shape1, shape0.x, shape0.y)
+
+    if type(shape1) == Point:
+
+        return affinity.translate(shape0, shape1.x, shape1.y)
+
+    # the sum distributes over unions, so it is the union of the sums of every pair of convex parts of the shapes, each found in linear time
+    if parts0 is None:
+        parts0 = get_convex_parts(shape0)
+    if parts1 is None and parts0 is not None:
+        parts1 = get_convex_parts(shape1)
+    if parts0 is not None and parts1 is not None:
+
+        # the convex hull of the points of each sum drops the nearly repeated points that parallel edges of both parts leave, which make unions unreliable
+        part_sums = [MultiPoint(get_convex_sum(points0, points1).tolist()).convex_hull for points0 in parts0 for points1 in parts1]
+
+        return part_sums[0] if len(part_sums) == 1 else unary_union(part_sums)
+
+    return get_edge_minkowski_sum(shape0, shape1)
+
+
+def get_edge_minkowski_sum(shape0, shape1):
+
+    """Return the Minkowski sum of the two passed (multi-)polygons, possibly with holes, as the union of the sums of every pair of their edges, which takes O(n0 * n1) polygons"""
+
+    # the sum of convex polygons is the convex hull of the sums of their vertices
+    if is_convex(shape0) and is_convex(shape1):
+
+        return MultiPoint([(x0 + x1, y0 + y1) for x0, y0 in shape0.exterior.coords[:-1] for x1, y1 in shape1.exterior.coords[:-1]]).convex_hull
+
+    # otherwise, the sum is made of the sums of every pair of boundary edges (parallelograms), where the boundaries meet, plus the translations of each shape to a vertex of each polygon of the other shape, where a polygon contains the other shape without boundary intersections
+    edges0 = [(ring.coords[i], ring.coords[i + 1]) for polygon in get_polygons(shape0) for ring in [polygon.exterior] + list(polygon.interiors) for i in range(len(ring.coords) - 1)]
+    edges1 = [(ring.coords[i], ring.coords[i + 1]) for polygon in get_polygons(shape1) for ring in [polygon.exterior] + list(polygon.interiors) for i in range(len(ring.coords) - 1)]
+
+    parts = list()
+    for (a0, a1) in edges0:
+        for (b0, b1) in edges1:
+            parallelogram = MultiPoint([(a0[0] + b0[0], a0[1] + b0[1]), (a1[0] + b0[0], a1[1] + b0[1]), (a1[0] + b1[0], a1[1] + b1[1]), (a0[0] + b1[0], a0[1] + b1[1])]).convex_hull
+            if parallelogram.area > 0:
+                parts.append(parallelogram)
+    parts.extend(affinity.translate(shape0, polygon.exterior.coords[0][0], polygon.exterior.coords[0][1]) for polygon in get_polygons(shape1))
+    parts.extend(affinity.translate(shape1, polygon.exterior.coords[0][0], polygon.exterior.coords[0][1]) for polygon in get_polygons(shape0))
+
+    return unary_union(parts)
+
+
+def get_no_fit_polygon(fixed_shape, moving_shape, fixed_parts=None, moving_parts=None):
+
+    """Return the no-fit polygon of the passed moving shape around the passed fixed shape, i.e. the set of translations of the moving shape that make it intersect (or touch) the fixed shape, using the passed convex parts of their decompositions, if any; circles are approximated with polygons inscribed in them, so the result never includes translations without intersection"""
+
+    fixed_core, fixed_radius = get_shape_core(fixed_shape)
+    moving_core, moving_radius = get_shape_core(moving_shape)
+
+    # the translations of the moving shape are found as the sum of the fixed shape and the moving shape reflected through the origin
+    no_fit_polygon = get_minkowski_sum(fixed_core, affinity.scale(moving_core, -1., -1., origin=(0., 0.)), fixed_parts, [-points for points in moving_parts] if moving_parts is not None else None)
+
+    # the radii of the circles grow the sum of the cores
+    if fixed_radius + moving_radius > 0:
+        no_fit_polygon = no_fit_polygon.buffer(fixed_radius + moving_radius)
+
+    return no_fit_polygon
+
+
+class NoFitPolygonEngine(object):
+
+    """Class representing an engine that calculates on demand and caches the no-fit polygons of the items of a problem for each pair of item shapes and discrete rotations, so that the positions where an item would overlap a placed item can be found with point-in-polygon queries"""
+
+    __slots__ = ("items", "rotation_bucket_num", "shape_indices", "convex_parts", "no_fit_polygons", "touching_points")
+
+    def __init__(self, items, rotation_bucket_num, cache_size=None):
+
+        """Constructor"""
+
+        self.items = items
+        self.rotation_bucket_num = rotation_bucket_num
+
+        # index of the first item with the same canonical shape as each item, so that equal items share their no-fit polygons
+        self.shape_indices = get_shape_indices(items)
+
+        # convex parts of the decomposition of the canonical shape of each shape index (None if it is not decomposed), only calculated when needed, and rotated for each bucket
+        self.convex_parts = dict()
+
+        # cached (no-fit polygon, prepared no-fit polygon) pairs, by (fixed shape index, fixed rotation bucket, moving shape index, moving rotation bucket); by default, the cache can keep the no-fit polygons of all the pairs
+        if cache_size is None:
+            cache_size = sum(1 if type(self.items[shape_index].shape) == Circle else rotation_bucket_num for shape_index in set(self.shape_indices.values())) ** 2
+        self.no_fit_polygons = LRUCache(cache_size)
+
+        # cached (n, 2) arrays of the vertices of the no-fit polygons grown by a gap, i.e. the relative positions where the moving item touches the fixed one, by (no-fit polygon key, gap)
+        self.touching_points = LRUCache(cache_size)
+
+    def get_rotation_bucket(self, item_index, rotation_bucket):
+
+        """Return the rotation bucket to use for the item with the passed index, which is always the first one for circles, since they are not affected by rotations"""
+
+        if type(self.items[item_index].shape) == Circle:
+            return 0
+
+        return rotation_bucket % self.rotation_bucket_num
+
+    def get_rotated_shape(self, item_index, rotation_bucket):
+
+        """Return the canonical shape of the item with the passed index (i.e. with its reference position in the origin), rotated to the passed rotation bucket"""
+
+        return transform_shape(self.items[item_index].canonical_shape, get_pose_matrix((0., 0.), rotation_bucket * 360. / self.rotation_bucket_num))
+
+    def get_rotated_convex_parts(self, item_index, rotation_bucket):
+
+        """Return a list with (n, 2) arrays of the points of the convex parts of the decomposition of the canonical shape of the item with the passed index, rotated to the passed rotation bucket, or None if the shape is not decomposed"""
+
+        shape_index = self.shape_indices[item_index]
+        if shape_index not in self.convex_parts:
+            self.convex_parts[shape_index] = get_convex_parts(self.items[shape_index].canonical_shape)
+
+        if self.convex_parts[shape_index] is None:
+            return None
+
+        matrix = get_pose_matrix((0., 0.), rotation_bucket * 360. / self.rotation_bucket_num)
+
+        return [get_transformed_points(points, matrix) for points in self.convex_parts[shape_index]]
+
+    def get_key(self, fixed_item_index, fixed_rotation_bucket, moving_item_index, moving_rotation_bucket):
+
+        """Return the key of the no-fit polygon of the item with the passed moving index around the item with the passed fixed index, both in the passed rotation buckets, which is shared by the items with equal shapes"""
+
+        return self.shape_indices[fixed_item_index], self.get_rotation_bucket(fixed_item_index, fixed_rotation_bucket), self.shape_indices[moving_item_index], self.get_rotation_bucket(moving_item_index, moving_rotation_bucket)
+
+    def get_no_fit_polygon(self, fixed_item_index, fixed_rotation_bucket, moving_item_index, moving_rotation_bucket):
+
+        """Return a (no-fit polygon, prepared no-fit polygon) pair for the item with the passed moving index around the item with the passed fixed index, with their reference positions relative to each other, both in the passed rotation buckets, calculating and caching it if needed"""
+
+        key = self.get_key(fixed_item_index, fixed_rotation_bucket, moving_item_index, moving_rotation_bucket)
+        _, fixed_rotation_bucket, _, moving_rotation_bucket = key
+
+        no_fit_polygon = self.no_fit_polygons.get(key)
+
+        if no_fit_polygon is None:
+            shape = get_no_fit_polygon(self.get_rotated_shape(fixed_item_index, fixed_rotation_bucket), self.get_rotated_shape(moving_item_index, moving_rotation_bucket), self.get_rotated_convex_parts(fixed_item_index, fixed_rotation_bucket), self.get_rotated_convex_parts(moving_item_index, moving_rotation_bucket))
+            no_fit_polygon = (shape, prep(shape))
+            self.no_fit_polygons.put(key, no_fit_polygon)
+
+        return no_fit_polygon
+
+    def precompute(self, item_indices=None):
+
+        """Calculate in advance the no-fit polygons of all the pairs of the items with the passed indices (all the items if not passed), including pairs of equal items, for all the rotation buckets; the cache should be big enough to keep them"""
+
+        if item_indices is None:
+            item_indices = self.items.keys()
+
+        # the items with equal shapes share their no-fit polygons, so only one of them is needed
+        shape_indices = sorted({self.shape_indices[item_index] for item_index in item_indices})
+
+        for fixed_shape_index in shape_indices:
+            for fixed_rotation_bucket in range(1 if type(self.items[fixed_shape_index].shape) == Circle else self.rotation_bucket_num):
+                for moving_shape_index in shape_indices:
+                    for moving_rotation_bucket in range(1 if type(self.items[moving_shape_index].shape) == Circle else self.rotation_bucket_num):
+                        self.get_no_fit_polygon(fixed_shape_index, fixed_rotation_bucket, moving_shape_index, moving_rotation_bucket)
+
+    def get_placed_item_rotation_bucket(self, solution, item_index):
+
+        """Return the rotation bucket of the item with the passed index placed in the passed solution"""
+
+        rotation = solution.placed_items[item_index].rotation
+
+        # the rotation of circles is undefined
+        if math.isnan(rotation):
+            return 0
+
+        return int(round(rotation * self.rotation_bucket_num / 360.)) % self.rotation_bucket_num
+
+    def get_nearby_placed_item_indices(self, solution, item_index, position):
+
+        """Return the indices of the items placed in the passed solution whose bounds overlap with those of the bounding circle of the item with the passed index if placed in the passed position"""
+
+        radius = self.items[item_index].bounding_radius
+
+        return solution.placed_item_grid.get_neighbor_indices((position[0] - radius, position[1] - radius, position[0] + radius, position[1] + radius), item_index)
+
+    def is_position_blocked(self, solution, item_index, position, rotation_bucket, placed_item_indices=None):
+
+        """Return whether placing the item with the passed index in the passed position, with the passed rotation bucket, would make it intersect with any item placed in the passed solution (only the passed placed items, if any), according to their no-fit polygons"""
+
+        if placed_item_indices is None:
+            placed_item_indices = self.get_nearby_placed_item_indices(solution, item_index, position)
+
+        for placed_item_index in placed_item_indices:
+
+            placed_position = solution.placed_items[placed_item_index].position
+            _, prepared_no_fit_polygon = self.get_no_fit_polygon(placed_item_index, self.get_placed_item_rotation_bucket(solution, placed_item_index), item_index, rotation_bucket)
+
+            if prepared_no_fit_polygon.intersects(Point(position[0] - placed_position[0], position[1] - placed_position[1])):
+
+                return True
+
+        return False
+
+    def get_touching_points(self, fixed_item_index, fixed_rotation_bucket, moving_item_index, moving_rotation_bucket, gap):
+
+        """Return an (n, 2) array with the vertices of the no-fit polygon of the item with the passed moving index around the item with the passed fixed index (both in the passed rotation buckets) grown by the passed gap, which are the relative positions where the moving item is next to the fixed one, calculating and caching it if needed"""
+
+        key = (self.get_key(fixed_item_index, fixed_rotation_bucket, moving_item_index, moving_rotation_bucket), gap)
+
+        points = self.touching_points.get(key)
+
+        if points is None:
+            no_fit_polygon, _ = self.get_no_fit_polygon(fixed_item_index, fixed_rotation_bucket, moving_item_index, moving_rotation_bucket)
+            grown_no_fit_polygon = no_fit_polygon.buffer(gap, join_style=JOIN_STYLE.mitre)
+            points = np.array([point for polygon in get_polygons(grown_no_fit_polygon) for ring in [polygon.exterior] + list(polygon.interiors) for point in ring.coords[:-1]], dtype=np.float64).reshape(-1, 2)
+            self.touching_points.put(key, points)
+
+        return points
+
+    def get_touching_positions(self, solution, item_index, rotation_bucket, gap=TOUCHING_GAP):
+
+        """Return a list of (x, y) positions where the item with the passed index, with the passed rotation bucket, would be next to (at the passed gap from) an item placed in the passed solution without intersecting any placed item, according to their no-fit polygons; containment in the container is not checked"""
+
+        positions = list()
+
+        for placed_item_index, placed_shape in solution.placed_items.items():
+
+            if placed_item_index == item_index:
+                continue
+
+            # the vertices of the no-fit polygon grown by the gap are positions next to the placed item
+            points = self.get_touching_points(placed_item_index, self.get_placed_item_rotation_bucket(solution, placed_item_index), item_index, rotation_bucket, gap) + placed_shape.position
+            for position in map(tuple, points.tolist()):
+                if not self.is_position_blocked(solution, item_index, position, rotation_bucket):
+                    positions.append(position)
+
+        return positions
+
+    def get_stats(self):
+
+        """Return a dictionary with the statistics of the cache of no-fit polygons"""
+
+        return self.no_fit_polygons.get_stats()
@@ -0,0 +1,213 @@
+import math
+import numpy as np
+from circle import Circle
+from ellipse import Ellipse
+from no_fit_polygon import get_polygons
+
+# default number of cells per side of the occupancy bitmap of the container
+OCCUPANCY_CELLS_PER_SIDE = 32
+
+# proportion of the cell size by which the bounds of the boundary edges of a shape are grown to find the cells that the boundary passes through, so that cells that the boundary barely touches are never considered fully covered
+EDGE_MARGIN_PROPORTION = 1e-6
+
+# state of a cell not covered by the bounds of any placed item
+FREE_CELL = 0
+
+# state of a cell covered by the bounds of some placed item, but not fully covered by the shape of any
+PARTIAL_CELL = 1
+
+# state of a cell fully covered by the shape of some placed item
+FULL_CELL = 2
+
+
+def are_points_inside(points, edges):
+
+    """Return a boolean array indicating which of the points of the passed (n, 2) array are inside of the shape with the passed (m, 4) array of boundary edges, according to the even-odd rule of a horizontal ray cast from each point; points on the boundary may be classified either way"""
+
+    x0, y0, x1, y1 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+    xs, ys = points[:, 0:1], points[:, 1:2]
+
+    # an edge is crossed by the ray if it spans the height of the point, and it is to the right of the point at that height
+    is_spanning = (y0 > ys) != (y1 > ys)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing_xs = x0 + (ys - y0) * (x1 - x0) / (y1 - y0)
+    is_crossed = is_spanning & (xs < crossing_xs)
+
+    return np.count_nonzero(is_crossed, axis=1) % 2 == 1
+
+
+class OccupancyGrid(object):
+
+    """Class representing a bitmap over the bounding rectangle of a container, where each cell is free, partially covered or fully covered by the placed items, so that placements overlapping a fully covered cell can be rejected without exact geometric checks"""
+
+    __slots__ = ("min_x", "min_y", "cell_width", "cell_height", "column_num", "row_num", "full_counts", "covered_counts", "item_cells", "changed_indices")
+
+    def __init__(self, container_bounds, cells_per_side=OCCUPANCY_CELLS_PER_SIDE):
+
+        """Constructor"""
+
+        min_x, min_y, max_x, max_y = container_bounds
+
+        self.min_x = min_x
+        self.min_y = min_y
+        self.column_num = cells_per_side
+        self.row_num = cells_per_side
+        self.cell_width = max(max_x - min_x, 1e-12) / self.column_num
+        self.cell_height = max(max_y - min_y, 1e-12) / self.row_num
+
+        # number of placed items fully covering each cell, and number of placed items whose bounds cover each cell, by (row, column)
+        self.full_counts = np.zeros((self.row_num, self.column_num), dtype=np.int32)
+        self.covered_counts = np.zeros((self.row_num, self.column_num), dtype=np.int32)
+
+        # rasterized (cell range, rows of full cells, columns of full cells) of each item
+        self.item_cells = dict()
+
+        # indices of the items whose placement changed since they were rasterized, which are rasterized again only when a check needs it, so that tentative placements that get undone are never rasterized
+        self.changed_indices = set()
+
+    def __deepcopy__(self, memo=None):
+
+        """Return a deep copy"""
+
+        # the grid resolution is shared, and the rasterized cells of each item are immutable
+        grid_copy = OccupancyGrid.__new__(OccupancyGrid)
+        grid_copy.min_x, grid_copy.min_y, grid_copy.cell_width, grid_copy.cell_height, grid_copy.column_num, grid_copy.row_num = self.min_x, self.min_y, self.cell_width, self.cell_height, self.column_num, self.row_num
+        grid_copy.full_counts = self.full_counts.copy()
+        grid_copy.covered_counts = self.covered_counts.copy()
+        grid_copy.item_cells = dict(self.item_cells)
+        grid_copy.changed_indices = set(self.changed_indices)
+
+        return grid_copy
+
+    def get_cell_range(self, bounds):
+
+        """Return the (min_column, min_row, max_column, max_row) range of cells covered by the passed bounds, clamped to the grid"""
+
+        min_x, min_y, max_x, max_y = bounds
+        max_column = self.column_num - 1
+        max_row = self.row_num - 1
+
+        return (min(max(int(math.floor((min_x - self.min_x) / self.cell_width)), 0), max_column),
+                min(max(int(math.floor((min_y - self.min_y) / self.cell_height)), 0), max_row),
+                min(max(int(math.floor((max_x - self.min_x) / self.cell_width)), 0), max_column),
+                min(max(int(math.floor((max_y - self.min_y) / self.cell_height)), 0), max_row))
+
+    def get_full_cells(self, placed_shape, cell_range):
+
+        """Return the (rows, columns) arrays of the cells of the passed range that are fully covered by the passed placed shape"""
+
+        min_column, min_row, max_column, max_row = cell_range
+
+        # a circle (which is convex) covers a cell if it contains its four corners
+        if type(placed_shape.shape) == Circle:
+
+            columns, rows = np.meshgrid(np.arange(min_column, max_column + 1), np.arange(min_row, max_row + 1))
+            columns, rows = columns.ravel(), rows.ravel()
+            center_x, center_y, radius = placed_shape.get_bounding_circle()
+            is_full = np.ones(len(columns), dtype=bool)
+            for column_offset, row_offset in ((0, 0), (1, 0), (0, 1), (1, 1)):
+                x_differences = self.min_x + (columns + column_offset) * self.cell_width - center_x
+                y_differences = self.min_y + (rows + row_offset) * self.cell_height - center_y
+                is_full &= np.sqrt(x_differences * x_differences + y_differences * y_differences) < radius
+
+            return rows[is_full], columns[is_full]
+
+        # for the ellipse, use the approximate polygon, as the rest of checks do
+        shape = placed_shape.shape
+        if type(shape) == Ellipse:
+            shape = shape.polygon
+
+        # boundary edges of the shape, as an (n, 4) array of (x0, y0, x1, y1) rows
+        edges = np.concatenate([np.hstack((coords[:-1], coords[1:])) for coords in (np.array(ring.coords)[:, :2] for polygon in get_polygons(shape) for ring in [polygon.exterior] + list(polygon.interiors))])
+
+        corner_xs = self.min_x + np.arange(min_column, max_column + 2) * self.cell_width
+        corner_ys = self.min_y + np.arange(min_row, max_row + 2) * self.cell_height
+
+        # a cell that an edge passes through (or nearly touches) is not fully covered; such cells are among those covered by the slightly grown bounds of the edge, and have corners on both sides of the line of the edge (or near it)
+        is_crossed = np.zeros((max_row - min_row + 1, max_column - min_column + 1), dtype=bool)
+        margin = min(self.cell_width, self.cell_height) * EDGE_MARGIN_PROPORTION
+        for x0, y0, x1, y1 in edges:
+            edge_min_column, edge_min_row, edge_max_column, edge_max_row = self.get_cell_range((min(x0, x1) - margin, min(y0, y1) - margin, max(x0, x1) + margin, max(y0, y1) + margin))
+            edge_min_column, edge_min_row = max(edge_min_column, min_column) - min_column, max(edge_min_row, min_row) - min_row
+            edge_max_column, edge_max_row = min(edge_max_column, max_column) - min_column, min(edge_max_row, max_row) - min_row
+            side_distances = ((x1 - x0) * (corner_ys[edge_min_row:edge_max_row + 2, None] - y0) - (y1 - y0) * (corner_xs[None, edge_min_column:edge_max_column + 2] - x0)) / max(math.hypot(x1 - x0, y1 - y0), 1e-12)
+            is_left = side_distances > margin
+            is_right = side_distances < -margin
+            is_crossed[edge_min_row:edge_max_row + 1, edge_min_column:edge_max_column + 1] |= ~((is_left[:-1, :-1] & is_left[1:, :-1] & is_left[:-1, 1:] & is_left[1:, 1:]) | (is_right[:-1, :-1] & is_right[1:, :-1] & is_right[:-1, 1:] & is_right[1:, 1:]))
+
+        # a cell not crossed by the boundary is fully covered if its corners are inside of the shape, i.e. if a ray from them crosses the boundary an odd number of times
+        corners = np.stack(np.meshgrid(corner_xs, corner_ys), axis=-1).reshape(-1, 2)
+        is_corner_inside = are_points_inside(corners, edges).reshape(len(corner_ys), len(corner_xs))
+        is_full = ~is_crossed & is_corner_inside[:-1, :-1] & is_corner_inside[1:, :-1] & is_corner_inside[:-1, 1:] & is_corner_inside[1:, 1:]
+
+        full_rows, full_columns = np.nonzero(is_full)
+
+        return full_rows + min_row, full_columns + min_column
+
+    def rasterize(self, item_index, placed_shape):
+
+        """Mark the cells covered by the passed placed shape of the item with the passed index"""
+
+        cell_range = self.get_cell_range(placed_shape.get_current_bounds())
+        full_rows, full_columns = self.get_full_cells(placed_shape, cell_range)
+        self.item_cells[item_index] = (cell_range, full_rows, full_columns)
+
+        min_column, min_row, max_column, max_row = cell_range
+        self.covered_counts[min_row:max_row + 1, min_column:max_column + 1] += 1
+        self.full_counts[full_rows, full_columns] += 1
+
+    def unrasterize(self, item_index):
+
+        """Unmark the cells covered by the item with the passed index, if it was rasterized"""
+
+        if item_index in self.item_cells:
+
+            (min_column, min_row, max_column, max_row), full_rows, full_columns = self.item_cells.pop(item_index)
+            self.covered_counts[min_row:max_row + 1, min_column:max_column + 1] -= 1
+            self.full_counts[full_rows, full_columns] -= 1
+
+    def mark_changed(self, item_index):
+
+        """Register that the placement of the item with the passed index was added or changed, so that its cells are updated when needed"""
+
+        self.unrasterize(item_index)
+        self.changed_indices.add(item_index)
+
+    def remove(self, item_index):
+
+        """Stop considering the item with the passed index"""
+
+        self.unrasterize(item_index)
+        self.changed_indices.discard(item_index)
+
+    def refresh(self, placed_items, item_index_to_ignore=None):
+
+        """Rasterize the passed placed items (by index) that changed since they were last rasterized, except the one with the passed index to ignore"""
+
+        for item_index in [index for index in self.changed_indices if index != item_index_to_ignore]:
+            self.rasterize(item_index, placed_items[item_index])
+            self.changed_indices.discard(item_index)
+
+    def is_any_point_in_full_cell(self, points):
+
+        """Return whether any of the points of the passed (n, 2) array is in a cell fully covered by a rasterized item, in which case a shape including the points intersects with that item"""
+
+        columns = np.floor((points[:, 0] - self.min_x) / self.cell_width).astype(int)
+        rows = np.floor((points[:, 1] - self.min_y) / self.cell_height).astype(int)
+
+        # points in the far edges of the grid belong to the last cells, and points outside of the grid are ignored
+        columns[points[:, 0] == self.min_x + self.column_num * self.cell_width] = self.column_num - 1
+        rows[points[:, 1] == self.min_y + self.row_num * self.cell_height] = self.row_num - 1
+        is_inside = (columns >= 0) & (columns < self.column_num) & (rows >= 0) & (rows < self.row_num)
+
+        return bool((self.full_counts[rows[is_inside], columns[is_inside]] > 0).any())
+
+    def get_cell_states(self):
+
+        """Return a (row_num, column_num) array with the state of each cell: free, partially covered or fully covered by the rasterized items"""
+
+        states = np.full((self.row_num, self.column_num), FREE_CELL, dtype=np.int8)
+        states[self.covered_counts > 0] = PARTIAL_CELL
+        states[self.full_counts > 0] = FULL_CELL
+
+        return states
@@ -0,0 +1,67 @@
+import numpy as np
+from shapely.geometry import MultiPolygon
+from shapely.prepared import prep
+
+
+class PreparedShape(object):
+
+    """Class representing a polygon or multi-polygon prepared once to act as the container of many other shapes: it keeps a prepared geometry for the standard containment checks, and an index of the bounds of its holes for the circle-specific checks"""
+
+    __slots__ = ("shape", "prepared_shape", "prepared_first_polygon", "first_exterior", "holes", "hole_bounds")
+
+    def __init__(self, shape):
+
+        """Constructor"""
+
+        self.shape = shape
+        self.prepared_shape = prep(shape)
+
+        # circles are only checked against the first polygon of a multi-polygon, whose holes (and those of the rest of polygons) should not intersect with the circle
+        if type(shape) == MultiPolygon:
+            first_polygon = shape.geoms[0]
+            self.holes = [hole for geom in shape.geoms for hole in geom.interiors]
+            self.prepared_first_polygon = prep(first_polygon)
+
+        # the holes of a simple polygon are not considered for circles
+        else:
+            first_polygon = shape
+            self.holes = list()
+            self.prepared_first_polygon = self.prepared_shape
+
+        self.first_exterior = first_polygon.exterior
+        self.hole_bounds = np.array([hole.bounds for hole in self.holes]).reshape((len(self.holes), 4))
+
+    def contains(self, shape):
+
+        """Returns True if the prepared shape contains the passed (standard Shapely) shape, else False"""
+
+        return self.prepared_shape.contains(shape)
+
+    def get_holes_near_circle(self, center_x, center_y, radius):
+
+        """Return the holes whose bounds overlap (or touch) with the bounds of the circle defined by the passed center and radius"""
+
+        if not self.holes:
+            return list()
+
+        near_mask = (self.hole_bounds[:, 0] <= center_x + radius) & (self.hole_bounds[:, 2] >= center_x - radius) & (self.hole_bounds[:, 1] <= center_y + radius) & (self.hole_bounds[:, 3] >= center_y - radius)
+
+        return [self.holes[index] for index in np.flatnonzero(near_mask)]
+
+    def contains_circle(self, center, radius):
+
+        """Returns True if the prepared shape contains the circle defined by the passed center point and radius, else False"""
+
+        # the center must be inside the (first) polygon, far enough from its boundary
+        if self.prepared_first_polygon.contains(center) and self.first_exterior.distance(center) > radius:
+
+            # the circle cannot intersect with any hole, and only those near the circle can do so
+            for hole in self.get_holes_near_circle(center.x, center.y, radius):
+
+                if hole.distance(center) <= radius:
+
+                    return False
+
+            return True
+
+        return False
@@ -86,7 +86,8 @@ def execute_algorithm_with_params(params):
     if solution and (show_solution_plot or solution_plot_save_path):
         solution.visualize(show_plot=show_solution_plot, save_path=solution_plot_save_path)
 
-    return solution, solution.value, value_evolution, elapsed_time, times_dict
+    # return the solution packed, which is much cheaper to transfer from a worker process
+    return solution.pack(), solution.value, value_evolution, elapsed_time, times_dict
 
 
 def execute_algorithm(algorithm, algorithm_name, problem, show_solution_plot=False, solution_plot_save_path=None, calculate_times=False, calculate_fitness_stats=False, execution_num=1, process_num=1):
@@ -102,7 +103,7 @@ def execute_algorithm(algorithm, algorithm_name, problem, show_solution_plot=Fal
         batch_num = ceil(execution_num / process_num)
         for batch in range(batch_num):
             results = process_pool.map(execute_algorithm_with_params, param_tuples[batch * process_num: batch * process_num + process_num])
-            batch_solutions, batch_values, batch_value_evolutions, batch_times, batch_time_divisions = [result[0] for result in results], [result[1] for result in results], [result[2] for result in results], [result[3] for result in results], [result[4] for result in results]
+            batch_solutions, batch_values, batch_value_evolutions, batch_times, batch_time_divisions = [result[0].unpack(problem) for result in results], [result[1] for result in results], [result[2] for result in results], [result[3] for result in results], [result[4] for result in results]
             solutions.extend(batch_solutions)
             values.extend(batch_values)
             value_evolutions.extend(batch_value_evolutions)
@@ -116,8 +117,8 @@ def execute_algorithm(algorithm, algorithm_name, problem, show_solution_plot=Fal
 
         for i in range(execution_num):
 
-            solution, value, value_evolution, elapsed_time, time_division = execute_algorithm_with_params(param_tuples[i])
-            solutions.append(solution)
+            packed_solution, value, value_evolution, elapsed_time, time_division = execute_algorithm_with_params(param_tuples[i])
+            solutions.append(packed_solution.unpack(problem))
             values.append(value)
             value_evolutions.append(value_evolution)
             times.append(elapsed_time)
@@ -1,10 +1,19 @@
+import copy
 from matplotlib import colors, colorbar
 from matplotlib.colors import LinearSegmentedColormap
 from scipy.interpolate import interpolate
 from shapely import affinity
 import matplotlib.pyplot as plt
-from shapely.geometry import LineString
 from shape_functions import *
+from spatial_index import PlacedItemGrid
+from occupancy_grid import OccupancyGrid
+from containment_tree import ContainmentTree, has_holes
+from caching import LRUCache
+from circle_kernel import get_circle_intersection_mask, is_any_point_in_circle
+from ray_casting import get_nearest_ray_hit_proportion, get_ray_box_crossing_mask
+from angular_sweep import get_max_sweep_angle
+from no_fit_polygon import NoFitPolygonEngine, get_shape_indices, TOUCHING_GAP
+from inner_fit_region import InnerFitRegion, can_calculate_inner_fit_regions, get_inner_fit_region_shape, INNER_FIT_REGION_ROTATION_BUCKET_NUM
 
 
 # set plotting font and sizes
@@ -14,38 +23,179 @@ plt.rcParams["figure.titlesize"] = 16
 plt.rcParams["xtick.labelsize"] = 14
 plt.rcParams["ytick.labelsize"] = 14
 
+# default maximum number of pre-rotated shapes cached per item, when rotations are quantized
+ROTATION_TEMPLATE_CACHE_SIZE = 64
+
+# precision to which the coordinates of the pose of placed items are rounded to calculate the fingerprint of a solution, so that solutions with practically equal placements are identified
+FINGERPRINT_POSITION_PRECISION = 1e-6
+
+# precision (in degrees) to which the rotation of the pose of placed items is rounded to calculate the fingerprint of a solution
+FINGERPRINT_ROTATION_PRECISION = 1e-6
+
+# default maximum number of solution evaluations (validity and fitness) memoized per problem, by solution fingerprint
+SOLUTION_EVALUATION_MEMO_SIZE = 4096
+
+# default maximum number of results of placement checks (containment of an item in the container, or intersection of two items) cached per problem, by quantized pose
+PLACEMENT_CHECK_CACHE_SIZE = 65536
+
+# precision to which the coordinates of the pose of placed items are rounded to identify their placement checks, fine enough to only match placements that are equal except for rounding errors
+PLACEMENT_CHECK_POSITION_PRECISION = 1e-9
+
+# precision (in degrees) to which the rotation of the pose of placed items is rounded to identify their placement checks
+PLACEMENT_CHECK_ROTATION_PRECISION = 1e-9
+
+# if enabled (for debugging), the incrementally maintained aggregate statistics of solutions (total area and global bounds of the placed items) are checked against a full recalculation whenever they are queried
+CHECK_AGGREGATE_STATS = False
+
+# relative tolerance of the check of the total area of the placed items of solutions, which accumulates rounding errors as items are added and removed
+AGGREGATE_AREA_TOLERANCE = 1e-9
+
+# if enabled, the intersections of an item with the nearby items that have a convex decomposition are checked at once with separating axis tests on their convex parts, instead of with Shapely; with few small shapes, the per-pair checks of Shapely are faster than the array operations
+USE_CONVEX_PART_CHECKS = False
+
+# if enabled, the intersection checks between lazy placements are settled with the conservative approximations of the shapes (bounding and inscribed circles, and outer and inner simplified polygons) when their result is certain, and only refined to the exact geometry otherwise; container checks do not use them, since the prepared geometry of the container makes the exact check cheaper than creating the approximate polygons; with simple shapes, settling the checks does not make up for calculating the approximations
+USE_SHAPE_APPROXIMATIONS = False
+
+# default number of equally distributed angles to which rotations are quantized, so that items are placed by translating cached pre-rotated templates; 0 keeps rotations continuous
+ROTATION_BUCKET_NUM = 0
+
+# default choice of placing items as lazy shapes, whose geometry is only created when an exact check needs it
+LAZY_PLACEMENTS = False
+
+# default choice of discarding the positions where an item to add would overlap with a placed item using no-fit polygons, when rotations are quantized
+USE_NO_FIT_POLYGONS = False
+
+# default choice of drawing the random positions of items from their inner-fit regions, discarding the items that cannot fit in the container
+USE_INNER_FIT_REGIONS = False
+
+# default choice of keeping a bitmap of the cells of the container covered by the placed items, to reject placements over fully covered cells without exact checks
+USE_OCCUPANCY_GRID = False
+
+# default choice of caching the results of the containment and intersection checks of placements in the problem, by quantized pose, to reuse them in later checks of any solution
+USE_PLACEMENT_CHECK_CACHE = False
+
+# default number of random placements drawn at once when trying to place an item randomly, of which only those whose bounds are within the container are validated, in turn; with 1, a single placement is drawn per attempt
+PLACEMENT_CANDIDATE_NUM = 1
+
+# default value of whether rotate-until-intersection operations find the feasible incremental rotations with an angular sweep, validating the placement once, instead of validating each rotation in turn
+USE_ANGULAR_SWEEP = False
+
+
+def get_solution_options(rotation_bucket_num=ROTATION_BUCKET_NUM, lazy_placements=LAZY_PLACEMENTS, use_no_fit_polygons=USE_NO_FIT_POLYGONS, use_inner_fit_regions=USE_INNER_FIT_REGIONS, use_occupancy_grid=USE_OCCUPANCY_GRID, use_placement_check_cache=USE_PLACEMENT_CHECK_CACHE, placement_candidate_num=PLACEMENT_CANDIDATE_NUM):
+
+    """Return a dictionary with the passed options of the placements of solutions, which the solvers pass on as keyword arguments to the constructor of their solutions or to other solvers"""
+
+    return dict(rotation_bucket_num=rotation_bucket_num, lazy_placements=lazy_placements, use_no_fit_polygons=use_no_fit_polygons, use_inner_fit_regions=use_inner_fit_regions, use_occupancy_grid=use_occupancy_grid, use_placement_check_cache=use_placement_check_cache, placement_candidate_num=placement_candidate_num)
+
 
 class PlacedShape(object):
 
     """Class representing a geometric shape placed in a container with a reference position and rotation"""
 
-    __slots__ = ("shape", "position", "rotation")
+    __slots__ = ("shape", "position", "rotation", "pose_rotation", "bounds", "bounding_center", "bounding_radius")
 
-    def __init__(self, shape, position=(0., 0.), rotation=0., move_and_rotate=True):
+    def __init__(self, shape, position=(0., 0.), rotation=0., move_and_rotate=True, bounding_radius=None, bounding_center=None):
 
         """Constructor"""
 
-        # the original shape should remain unchanged, while this version is moved and rotated in the 2D space
+        # the original shape remains unchanged, since moving and rotating this version in the 2D space replaces it with new shapes
         self.shape = copy_shape(shape)
 
+        # the bounding circle is centered in a point that follows the shape in every movement and rotation, so its (rotation-invariant) radius can be cached
+        self.bounding_radius = bounding_radius if bounding_radius is not None else get_bounding_radius(self.shape)
+        self.bounding_center = bounding_center
+
+        # the bounding box is only calculated when needed, and kept until the shape changes
+        self.bounds = None
+
         # the original points of the shape only represented distances among them, now the center of the bounding rectangle of the shape should be found in the reference position
         self.position = position
         if move_and_rotate:
             self.update_position(position)
             bounding_rectangle_center = get_bounding_rectangle_center(self.shape)
+            self.bounding_center = bounding_rectangle_center
             self.move((position[0] - bounding_rectangle_center[0], position[1] - bounding_rectangle_center[1]), False)
+        elif self.bounding_center is None:
+            self.bounding_center = get_bounding_rectangle_center(self.shape)
 
-        # rotate accordingly to the specified angle
+        # rotate accordingly to the specified angle; the rotation of the pose accumulates every rotation of the geometry, including those around the origin of another shape, which the reference rotation does not reflect
         self.rotation = rotation
         if move_and_rotate:
+            self.pose_rotation = 0.
             self.rotate(rotation, False)
+        else:
+            self.pose_rotation = 0. if np.isnan(rotation) else rotation
+
+    def __copy__(self):
+
+        """Return a shallow copy"""
+
+        # shapes are immutable values, so the copy shares the geometry (as well as the position, bounds and bounding data, which are immutable tuples) until a change replaces it
+        placed_shape_copy = PlacedShape.__new__(PlacedShape)
+        placed_shape_copy.shape = self.shape
+        placed_shape_copy.position = self.position
+        placed_shape_copy.rotation = self.rotation
+        placed_shape_copy.pose_rotation = self.pose_rotation
+        placed_shape_copy.bounds = self.bounds
+        placed_shape_copy.bounding_center = self.bounding_center
+        placed_shape_copy.bounding_radius = self.bounding_radius
+
+        return placed_shape_copy
 
     def __deepcopy__(self, memo=None):
 
-        """Return a deep copy"""
+        """Return a deep copy, which is as independent as a shallow copy, since every change replaces the shared immutable values"""
+
+        return self.__copy__()
+
+    def get_current_bounds(self):
+
+        """Return the (min_x, min_y, max_x, max_y) bounds of the shape, only calculating them if the shape has changed since the last call"""
+
+        if self.bounds is None:
+            self.bounds = get_bounds(self.shape)
+
+        return self.bounds
+
+    def get_current_vertices(self):
+
+        """Return an (n, 2) array with the current exterior points of the shape, or None for a circle"""
+
+        return get_shape_vertex_array(self.shape)
+
+    def get_current_segments(self):
+
+        """Return an (n, 4) array with the current (x0, y0, x1, y1) segments of the boundary of the shape used to find intersection points"""
+
+        return get_boundary_segment_array(self.shape)
+
+    def get_moved_copy(self, new_position):
+
+        """Return a copy of the placed shape moved to the passed position, where the geometry is only translated (the shape is shared until the translation creates a new one)"""
+
+        moved_copy = copy.copy(self)
+        moved_copy.move_to(new_position)
 
-        # the constructor already deep-copies the shape
-        return PlacedShape(self.shape, copy.deepcopy(self.position), self.rotation, False)
+        return moved_copy
+
+    def get_bounding_circle(self):
+
+        """Return a (center_x, center_y, radius) tuple describing a circle that contains the shape"""
+
+        # the circle is its own bounding circle, and its center is always kept in the reference position (reading the position is cheaper than reading the center point)
+        if type(self.shape) == Circle:
+            return self.position[0], self.position[1], self.shape.radius
+
+        return self.bounding_center[0], self.bounding_center[1], self.bounding_radius
+
+    def get_pose(self):
+
+        """Return the (position, rotation) pose that moves the canonical shape of the item (with the center of its bounding rectangle in the origin) to the current shape"""
+
+        if type(self.shape) == Circle:
+            return self.position, 0.
+
+        return self.bounding_center, self.pose_rotation
 
     def update_position(self, new_position):
 
@@ -53,9 +203,9 @@ class PlacedShape(object):
 
         self.position = new_position
 
-        # update the center for the circle or ellipse
+        # update the center for the circle or ellipse, in a new shape
         if type(self.shape) == Circle or type(self.shape) == Ellipse:
-            self.shape.center = Point(new_position[0], new_position[1])
+            self.shape = get_modified_copy(self.shape, center=Point(new_position[0], new_position[1]))
 
     def move(self, displacement, update_reference_position=True):
 
@@ -75,7 +225,7 @@ class PlacedShape(object):
             shape_to_move = affinity.translate(shape_to_move, displacement[0], displacement[1])
 
             if type(self.shape) == Ellipse:
-                self.shape.polygon = shape_to_move
+                self.shape = get_modified_copy(self.shape, polygon=shape_to_move)
 
             else:
                 self.shape = shape_to_move
@@ -83,11 +233,14 @@ class PlacedShape(object):
             if update_reference_position:
                 self.update_position((self.position[0] + displacement[0], self.position[1] + displacement[1]))
 
+            self.bounding_center = (self.bounding_center[0] + displacement[0], self.bounding_center[1] + displacement[1])
+            self.bounds = None
+
         # for the circle, update the support approximate polygon
         if type(self.shape) == Circle:
             center_displacement = self.shape.center.x - self.shape.polygon.centroid.x, self.shape.center.y - self.shape.polygon.centroid.y
             if center_displacement != (0, 0):
-                self.shape.polygon = affinity.translate(self.shape.polygon, center_displacement[0], center_displacement[1])
+                self.shape = get_modified_copy(self.shape, polygon=affinity.translate(self.shape.polygon, center_displacement[0], center_displacement[1]))
 
     def move_to(self, new_position):
 
@@ -115,11 +268,182 @@ class PlacedShape(object):
             shape_to_rotate = affinity.rotate(shape_to_rotate, angle, origin)
 
             if type(self.shape) == Ellipse:
-                self.shape.polygon = shape_to_rotate
+                self.shape = get_modified_copy(self.shape, polygon=shape_to_rotate)
 
             else:
                 self.shape = shape_to_rotate
 
+            # the circle is not affected by rotations, but other shapes need their bounding data and pose to be rotated too
+            if type(self.shape) != Circle:
+                self.bounding_center = rotate_point(self.bounding_center, angle, origin)
+                self.pose_rotation += angle
+                self.bounds = None
+
+            if update_reference_rotation:
+                self.rotation += angle
+
+    def rotate_to(self, new_rotation):
+
+        """Rotate the shape around its reference position so that it ends up having the passed new rotation"""
+
+        self.rotate(new_rotation - self.rotation)
+
+
+class LazyPlacedShape(object):
+
+    """Class representing a geometric shape placed in a container with a reference position and rotation, like a placed shape, but only storing the pose (position and rotation) of the canonical shape of the item, whose geometry is only created when an exact check needs it"""
+
+    __slots__ = ("canonical_shape", "vertex_array", "position", "rotation", "pose_position", "pose_rotation", "materialized_shape", "bounds", "bounding_radius")
+
+    def __init__(self, canonical_shape, vertex_array, position=(0., 0.), rotation=0., bounding_radius=None):
+
+        """Constructor"""
+
+        # the canonical shape has the center of its bounding rectangle in the origin, and it is shared (never modified) by all the placements of the item, like its array of exterior points
+        self.canonical_shape = canonical_shape
+        self.vertex_array = vertex_array
+        self.bounding_radius = bounding_radius if bounding_radius is not None else get_bounding_radius(canonical_shape)
+
+        self.position = position
+        self.rotation = rotation
+
+        # the pose moves the origin of the canonical shape to the reference position, with the reference rotation (not applicable to circles, and ignored if undefined); it may diverge from the reference data when the shape is rotated around another origin
+        self.pose_position = position
+        self.pose_rotation = 0. if type(canonical_shape) == Circle or np.isnan(rotation) else rotation
+
+        # the geometry and bounding box are only calculated when needed, and kept until the pose changes
+        self.materialized_shape = None
+        self.bounds = None
+
+    def __copy__(self):
+
+        """Return a shallow copy"""
+
+        # the geometry is never modified once created, so it can be shared with the copy
+        placed_shape_copy = LazyPlacedShape.__new__(LazyPlacedShape)
+        placed_shape_copy.canonical_shape = self.canonical_shape
+        placed_shape_copy.vertex_array = self.vertex_array
+        placed_shape_copy.bounding_radius = self.bounding_radius
+        placed_shape_copy.position = self.position
+        placed_shape_copy.rotation = self.rotation
+        placed_shape_copy.pose_position = self.pose_position
+        placed_shape_copy.pose_rotation = self.pose_rotation
+        placed_shape_copy.materialized_shape = self.materialized_shape
+        placed_shape_copy.bounds = self.bounds
+
+        return placed_shape_copy
+
+    def __deepcopy__(self, memo=None):
+
+        """Return a deep copy, which is as independent as a shallow copy, since every change replaces the shared immutable values"""
+
+        return self.__copy__()
+
+    @property
+    def shape(self):
+
+        """Return the geometry of the shape in its current pose, only creating it if the pose has changed since the last access"""
+
+        if self.materialized_shape is None:
+            self.materialized_shape = transform_shape(self.canonical_shape, get_pose_matrix(self.pose_position, self.pose_rotation))
+
+        return self.materialized_shape
+
+    def get_current_bounds(self):
+
+        """Return the (min_x, min_y, max_x, max_y) bounds of the shape, calculated from the pose without creating the geometry, and only if the pose has changed since the last call"""
+
+        if self.bounds is None:
+
+            # the circle bounds can be found with the center and radius
+            if self.vertex_array is None:
+                radius = self.canonical_shape.radius
+                self.bounds = self.pose_position[0] - radius, self.pose_position[1] - radius, self.pose_position[0] + radius, self.pose_position[1] + radius
+
+            else:
+                self.bounds = get_transformed_bounds(self.vertex_array, get_pose_matrix(self.pose_position, self.pose_rotation))
+
+        return self.bounds
+
+    def get_current_vertices(self):
+
+        """Return an (n, 2) array with the current exterior points of the shape, calculated from the pose without creating the geometry, or None for a circle"""
+
+        if self.vertex_array is None:
+            return None
+
+        return get_transformed_points(self.vertex_array, get_pose_matrix(self.pose_position, self.pose_rotation))
+
+    def get_current_segments(self):
+
+        """Return an (n, 4) array with the current (x0, y0, x1, y1) segments of the boundary of the shape used to find intersection points, calculated from the pose without creating the geometry"""
+
+        return get_transformed_points(get_boundary_segment_array(self.canonical_shape).reshape(-1, 2), get_pose_matrix(self.pose_position, self.pose_rotation)).reshape(-1, 4)
+
+    def get_moved_copy(self, new_position):
+
+        """Return a copy of the placed shape moved to the passed position"""
+
+        moved_copy = copy.copy(self)
+        moved_copy.move_to(new_position)
+
+        return moved_copy
+
+    def get_bounding_circle(self):
+
+        """Return a (center_x, center_y, radius) tuple describing a circle that contains the shape"""
+
+        # the center of the bounding rectangle of the canonical shape is always in the pose position
+        if type(self.canonical_shape) == Circle:
+            return self.pose_position[0], self.pose_position[1], self.canonical_shape.radius
+
+        return self.pose_position[0], self.pose_position[1], self.bounding_radius
+
+    def get_pose(self):
+
+        """Return the (position, rotation) pose that moves the canonical shape of the item (with the center of its bounding rectangle in the origin) to the current shape"""
+
+        return self.pose_position, self.pose_rotation
+
+    def move(self, displacement, update_reference_position=True):
+
+        """Move the shape as much as indicated by the displacement, only updating its pose"""
+
+        # only move when it makes sense
+        if displacement != (0., 0.):
+
+            self.pose_position = (self.pose_position[0] + displacement[0], self.pose_position[1] + displacement[1])
+
+            if update_reference_position:
+                self.position = (self.position[0] + displacement[0], self.position[1] + displacement[1])
+
+            self.materialized_shape = None
+            self.bounds = None
+
+    def move_to(self, new_position):
+
+        """Move the shape to a new position, only updating its pose"""
+
+        self.move((new_position[0] - self.position[0], new_position[1] - self.position[1]))
+
+    def rotate(self, angle, update_reference_rotation=True, origin=None):
+
+        """Rotate the shape around its reference position (or the passed origin) according to the passed rotation angle, expressed in degrees, only updating its pose"""
+
+        # only rotate when it makes sense
+        if not np.isnan(angle) and angle != 0 and (type(self.canonical_shape) != Circle or origin is not None):
+
+            # the circle is not affected by rotations
+            if type(self.canonical_shape) != Circle:
+
+                if not origin:
+                    origin = self.position
+                self.pose_position = rotate_point(self.pose_position, angle, origin)
+                self.pose_rotation += angle
+
+                self.materialized_shape = None
+                self.bounds = None
+
             if update_reference_rotation:
                 self.rotation += angle
 
@@ -130,13 +454,38 @@ class PlacedShape(object):
         self.rotate(new_rotation - self.rotation)
 
 
+def get_quantized_pose(placed_shape, position_precision, rotation_precision):
+
+    """Return an (x, y, rotation) tuple of integers with the pose of the passed placed shape rounded to the passed precisions, with the rotation normalized to [0, 360) degrees"""
+
+    pose_position, pose_rotation = placed_shape.get_pose()
+    if np.isnan(pose_rotation):
+        pose_rotation = 0.
+
+    return round(pose_position[0] / position_precision), round(pose_position[1] / position_precision), round((pose_rotation % 360.) / rotation_precision)
+
+
+def get_compactness_score(solution, item_index):
+
+    """Return a score of the placement of the item with the passed index in the passed solution that is higher the smaller the global bounding rectangle of the placed items is, to be used to choose among candidate placements"""
+
+    return -solution.get_global_bounding_rectangle_area()
+
+
+def get_placed_shape_memory_size(placed_shape):
+
+    """Return an estimation of the memory used by the geometry of the passed placed shape, in bytes"""
+
+    return get_shape_memory_size(placed_shape.shape)
+
+
 class Item(object):
 
     """Class representing an item that can be added to the container of a problem"""
 
-    __slots__ = ("shape", "weight", "value")
+    __slots__ = ("shape", "weight", "value", "area", "bounding_radius", "canonical_shape", "vertex_array", "convex_part_indices", "has_convex_part_indices", "approximation", "has_approximation", "rotation_templates")
 
-    def __init__(self, shape, weight, value):
+    def __init__(self, shape, weight, value, rotation_template_cache_size=ROTATION_TEMPLATE_CACHE_SIZE):
 
         """Constructor"""
 
@@ -144,18 +493,89 @@ class Item(object):
         self.weight = weight
         self.value = value
 
+        # the area, which placements do not change, and the radius of the rotation-invariant bounding circle are calculated only once per item
+        self.area = shape.area
+        self.bounding_radius = get_bounding_radius(shape)
+
+        # version of the shape with the center of its bounding rectangle in the origin, along with its exterior points, used to create lazy placements defined only by their pose
+        center_x, center_y = get_bounding_rectangle_center(shape)
+        self.canonical_shape = transform_shape(shape, [1., 0., 0., 1., -center_x, -center_y])
+        self.vertex_array = get_shape_vertex_array(self.canonical_shape)
+
+        # indices of the exterior points of each part of a convex decomposition of the shape, which are the same for every placement, or None if the shape is not decomposed; only calculated when the convex parts are first needed
+        self.convex_part_indices = None
+        self.has_convex_part_indices = False
+
+        # conservative approximations of the canonical shape, placed with the pose of each placement, or None for a circle or an invalid shape; only calculated when the approximations are first needed
+        self.approximation = None
+        self.has_approximation = False
+
+        # placed shapes of the item at the origin with discrete rotations, used as templates that only need to be translated when rotations are quantized
+        self.rotation_templates = LRUCache(rotation_template_cache_size, get_placed_shape_memory_size)
+
+    def get_relative_bounds(self, rotations):
+
+        """Return an (n, 4) array with the (min_x, min_y, max_x, max_y) bounds of the item relative to its reference position for each of the passed n rotations, expressed in degrees, calculated at once without creating any geometry"""
+
+        rotations = np.asarray(rotations, dtype=np.float64)
+
+        # the circle bounds do not depend on the rotation
+        if self.vertex_array is None:
+            radius = self.shape.radius
+            return np.tile([-radius, -radius, radius, radius], (len(rotations), 1))
+
+        # rotate the canonical points (with the reference position in the origin) as the pose matrix does
+        angles = np.radians(rotations)[:, None]
+        cos, sin = np.cos(angles), np.sin(angles)
+        xs = cos * self.vertex_array[:, 0] - sin * self.vertex_array[:, 1]
+        ys = sin * self.vertex_array[:, 0] + cos * self.vertex_array[:, 1]
+
+        return np.column_stack((xs.min(axis=1), ys.min(axis=1), xs.max(axis=1), ys.max(axis=1)))
+
+    def get_convex_part_indices(self):
+
+        """Return the (p, k) array with the indices of the exterior points of each part of the convex decomposition of the shape, or None if the shape is not decomposed, calculating it if needed"""
+
+        if not self.has_convex_part_indices:
+            self.convex_part_indices = get_convex_part_index_array(self.canonical_shape)
+            self.has_convex_part_indices = True
+
+        return self.convex_part_indices
+
+    def get_approximation(self):
+
+        """Return the hierarchy of conservative approximations of the canonical shape, or None if the shape has none, calculating it if needed"""
+
+        if not self.has_approximation:
+            self.approximation = get_shape_approximation(self.canonical_shape, self.bounding_radius)
+            self.has_approximation = True
+
+        return self.approximation
+
+    def get_rotation_template(self, rotation_bucket, rotation_bucket_num):
+
+        """Return the placed shape of the item with the reference position in the origin and the rotation of the passed bucket (out of the passed number of equally distributed angles of the 360 degrees), creating and caching it if needed"""
+
+        template = self.rotation_templates.get((rotation_bucket_num, rotation_bucket))
+
+        if template is None:
+            template = PlacedShape(self.shape, (0., 0.), rotation_bucket * 360. / rotation_bucket_num, bounding_radius=self.bounding_radius)
+            self.rotation_templates.put((rotation_bucket_num, rotation_bucket), template)
+
+        return template
+
     def __deepcopy__(self, memo=None):
 
         """Deep copy"""
 
-        return Item(copy_shape(self.shape), self.weight, self.value)
+        return Item(copy_shape(self.shape), self.weight, self.value, self.rotation_templates.max_size)
 
 
 class Container(object):
 
     """Class representing a container in a problem, defined by its shape and maximum allowed weight"""
 
-    __slots__ = ("max_weight", "shape")
+    __slots__ = ("max_weight", "shape", "prepared_shape", "bounds", "segment_array")
 
     def __init__(self, max_weight, shape):
 
@@ -164,28 +584,134 @@ class Container(object):
         self.max_weight = max_weight
         self.shape = shape
 
+        # the shape is prepared only once for the containment checks of all placements; circles and ellipses are used as they are
+        if type(shape) == Polygon or type(shape) == MultiPolygon:
+            self.prepared_shape = PreparedShape(shape)
+        else:
+            self.prepared_shape = shape
+
+        # the bounds are used to discard placements without checking their geometry
+        self.bounds = get_bounds(shape)
+
+        # the segments of the boundary are used to cast rays against it
+        self.segment_array = get_boundary_segment_array(shape)
+
+    def __reduce__(self):
+
+        """Return the constructor and arguments with which the container is recreated when unpickled"""
+
+        # prepared geometries cannot be serialized, so they are rebuilt from the shape
+        return Container, (self.max_weight, self.shape)
+
 
 class Problem(object):
 
     """Class representing an instance of the Two-Dimensional Irregular Shape Packing Problem combined with the Knapsack Problem"""
 
-    __slots__ = ("container", "items")
+    __slots__ = ("container", "items", "holed_item_indices", "shape_indices", "no_fit_polygon_engines", "can_use_inner_fit_regions", "inner_fit_regions", "placement_checks", "solution_evaluations")
 
-    def __init__(self, container, items):
+    def __init__(self, container, items, placement_check_cache_size=PLACEMENT_CHECK_CACHE_SIZE, solution_evaluation_memo_size=SOLUTION_EVALUATION_MEMO_SIZE):
 
         """Constructor"""
 
         self.container = container
         self.items = {index: item for index, item in enumerate(items)}
 
+        # indices of the items with holes, where other items can be placed
+        self.holed_item_indices = frozenset(index for index, item in self.items.items() if has_holes(item.shape))
+
+        # index of the first item with the same canonical shape as each item, so that equal items share their inner-fit regions
+        self.shape_indices = get_shape_indices(self.items)
+
+        # engines caching the no-fit polygons of pairs of items, by number of rotation buckets, only created when needed
+        self.no_fit_polygon_engines = dict()
+
+        # inner-fit regions of the items in the container, by (number of rotation buckets, shape index, rotation bucket), only calculated when needed, and only for convex containers
+        self.can_use_inner_fit_regions = can_calculate_inner_fit_regions(container.shape)
+        self.inner_fit_regions = dict()
+
+        # cached results of placement checks of items, by quantized pose, valid for any solution of the problem: containment in the container, by (item index, pose), and intersection of two items, by (item index, pose, other item index, other pose), with the lowest index first
+        self.placement_checks = LRUCache(placement_check_cache_size)
+
+        # memoized evaluations of solutions, by solution fingerprint, so that they are not recalculated for solutions with practically equal placements (e.g. duplicated offspring)
+        self.solution_evaluations = LRUCache(solution_evaluation_memo_size)
+
+    def get_no_fit_polygon_engine(self, rotation_bucket_num):
+
+        """Return the engine of no-fit polygons of the items for the passed number of equally distributed rotation angles, creating it if needed"""
+
+        if rotation_bucket_num not in self.no_fit_polygon_engines:
+            self.no_fit_polygon_engines[rotation_bucket_num] = NoFitPolygonEngine(self.items, rotation_bucket_num)
+
+        return self.no_fit_polygon_engines[rotation_bucket_num]
+
+    def get_inner_fit_region(self, item_index, rotation, rotation_bucket_num=0):
+
+        """Return the inner-fit region of the item with the passed index in the container, i.e. the region of reference positions where the item fits, for the discrete angle nearest to the passed rotation (expressed in degrees) out of the passed number of equally distributed angles; with continuous rotations (no buckets), a default number of angles is used, and the region is an approximation; each region is calculated only once"""
+
+        if rotation_bucket_num <= 0:
+            rotation_bucket_num = INNER_FIT_REGION_ROTATION_BUCKET_NUM
+
+        # circles are not affected by rotations
+        item = self.items[item_index]
+        rotation_bucket = 0 if type(item.shape) == Circle or np.isnan(rotation) else int(round(rotation * rotation_bucket_num / 360.)) % rotation_bucket_num
+
+        key = (rotation_bucket_num, self.shape_indices[item_index], rotation_bucket)
+        if key not in self.inner_fit_regions:
+            self.inner_fit_regions[key] = InnerFitRegion(get_inner_fit_region_shape(self.container.shape, transform_shape(item.canonical_shape, get_pose_matrix((0., 0.), rotation_bucket * 360. / rotation_bucket_num))))
+
+        return self.inner_fit_regions[key]
+
+    def can_item_fit(self, item_index, rotation_bucket_num=0):
+
+        """Return whether the item with the passed index fits in the container with any of the passed number of equally distributed angles (or a default number, with continuous rotations), according to its inner-fit regions; without them (in a non-convex container), any item may fit"""
+
+        if not self.can_use_inner_fit_regions:
+            return True
+
+        if rotation_bucket_num <= 0:
+            rotation_bucket_num = INNER_FIT_REGION_ROTATION_BUCKET_NUM
+
+        rotation_num = 1 if type(self.items[item_index].shape) == Circle else rotation_bucket_num
+
+        return any(not self.get_inner_fit_region(item_index, rotation_bucket * 360. / rotation_bucket_num, rotation_bucket_num).is_empty() for rotation_bucket in range(rotation_num))
+
+    def get_rotation_template_stats(self):
+
+        """Return a dictionary with the aggregated statistics of the rotation template caches of all items: hits, misses, hit rate, number of cached templates and their estimated memory use, in bytes"""
+
+        item_stats = [item.rotation_templates.get_stats() for item in self.items.values()]
+        hits = sum(stats["hits"] for stats in item_stats)
+        misses = sum(stats["misses"] for stats in item_stats)
+
+        return {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses) if hits + misses else 0., "size": sum(stats["size"] for stats in item_stats), "memory": sum(stats["memory"] for stats in item_stats)}
+
+    def get_placement_check_stats(self):
+
+        """Return a dictionary with the statistics of the cache of placement checks since they were last reset: hits, misses, hit rate and number of cached results"""
+
+        return self.placement_checks.get_stats()
+
+    def reset_placement_check_stats(self):
+
+        """Reset the statistics of the cache of placement checks, e.g. at the start of a run, keeping the cached results"""
+
+        self.placement_checks.reset_stats()
+
+    def get_solution_evaluation_stats(self):
+
+        """Return a dictionary with the statistics of the memo of solution evaluations: hits, misses, hit rate and number of memoized evaluations"""
+
+        return self.solution_evaluations.get_stats()
+
 
 class Solution(object):
 
     """Class representing a feasible solution to a problem, specified with a set of item placements, with their position and rotation in the container"""
 
-    __slots__ = ("problem", "placed_items", "weight", "value")
+    __slots__ = ("problem", "placed_items", "weight", "value", "placed_item_grid", "rotation_bucket_num", "lazy_placements", "use_no_fit_polygons", "use_inner_fit_regions", "occupancy_grid", "journal", "placement_orders", "next_placement_order", "placement_hashes", "fingerprint", "use_placement_check_cache", "placement_candidate_num", "area", "global_bounds", "containment_tree")
 
-    def __init__(self, problem, placed_items=None, weight=0., value=0.):
+    def __init__(self, problem, placed_items=None, weight=0., value=0., placed_item_grid=None, rotation_bucket_num=ROTATION_BUCKET_NUM, lazy_placements=LAZY_PLACEMENTS, use_no_fit_polygons=USE_NO_FIT_POLYGONS, use_inner_fit_regions=USE_INNER_FIT_REGIONS, use_occupancy_grid=USE_OCCUPANCY_GRID, occupancy_grid=None, placement_hashes=None, fingerprint=0, use_placement_check_cache=USE_PLACEMENT_CHECK_CACHE, placement_candidate_num=PLACEMENT_CANDIDATE_NUM, area=None, global_bounds=None, containment_tree=None, placement_orders=None):
 
         """Constructor"""
 
@@ -194,12 +720,351 @@ class Solution(object):
         self.weight = weight
         self.value = value
 
+        # if positive, rotations are quantized to this number of equally distributed angles, so that items are placed by translating cached pre-rotated templates
+        self.rotation_bucket_num = rotation_bucket_num
+
+        # if enabled, items are placed as lazy shapes whose geometry is only created when an exact check needs it (rotation templates, if used, take precedence)
+        self.lazy_placements = lazy_placements
+
+        # if enabled (and rotations are quantized), the positions where an item to add would overlap with a placed item are discarded with point-in-polygon queries on their no-fit polygon, before creating any geometry
+        self.use_no_fit_polygons = use_no_fit_polygons
+
+        # if enabled, the results of the containment and intersection checks of placements are cached in the problem, by quantized pose, and shared by all its solutions
+        self.use_placement_check_cache = use_placement_check_cache
+
+        # number of random placements drawn at once when trying to place an item randomly, of which only those whose bounds are within the container are validated, in turn
+        self.placement_candidate_num = placement_candidate_num
+
+        # if enabled (and the container is convex), random positions for an item are drawn from its inner-fit region, instead of the bounding rectangle of the container, and the items that cannot fit are discarded
+        self.use_inner_fit_regions = use_inner_fit_regions and problem.can_use_inner_fit_regions
+
+        # spatial index of the bounds of the placed items, to only check intersections with nearby items; if not provided, build it from the placed items
+        if placed_item_grid is None:
+            placed_item_grid = PlacedItemGrid(get_bounds(problem.container.shape), len(problem.items))
+            for index, placed_item in self.placed_items.items():
+                placed_item_grid.insert(index, placed_item.get_current_bounds())
+        self.placed_item_grid = placed_item_grid
+
+        # if enabled, bitmap of the cells of the container covered by the placed items, to reject the placements that overlap a fully covered cell without exact checks; if not provided, build it from the placed items
+        if use_occupancy_grid and occupancy_grid is None:
+            occupancy_grid = OccupancyGrid(problem.container.bounds)
+            for index in self.placed_items.keys():
+                occupancy_grid.mark_changed(index)
+        self.occupancy_grid = occupancy_grid
+
+        # tree of the placed items inside the holes of other placed items, updated with the changes of placements when the items inside an item are queried; if not provided, build it from the placed items
+        if containment_tree is None:
+            containment_tree = ContainmentTree(problem.holed_item_indices)
+            for index in self.placed_items.keys():
+                containment_tree.mark_changed(index)
+        self.containment_tree = containment_tree
+
+        # hash of the placement of each placed item, and fingerprint of the solution combining them (in an order-independent way), kept up to date with every change; if not provided, calculate them from the placed items
+        self.placement_hashes = placement_hashes
+        self.fingerprint = fingerprint
+        if placement_hashes is None:
+            self.placement_hashes = dict()
+            for index in self.placed_items.keys():
+                self.update_placement_hash(index)
+
+        # total area of the placed items, and (min_x, min_y, max_x, max_y) bounds of all of them, kept up to date with every change from the bounds of each item indexed in the spatial index; the global bounds are None when a change may have shrunk them, until they are recalculated when needed
+        self.area = area
+        if area is None:
+            self.area = sum(self.problem.items[index].area for index in self.placed_items.keys())
+        self.global_bounds = global_bounds
+
+        # if a transaction is active, log of the (operation, item index, previous placement, previous order stamp) entries of the changes applied to the placements, so that they can be reverted
+        self.journal = None
+
+        # increasing stamp of the order in which each placed item was placed, which is that of the placed items, so that a reverted removal restores the order (which some random selections depend on) without searching it; if not provided, number the placed items in order
+        self.placement_orders = placement_orders
+        if placement_orders is None:
+            self.placement_orders = {index: order for order, index in enumerate(self.placed_items.keys())}
+        self.next_placement_order = max(self.placement_orders.values(), default=-1) + 1
+
     def __deepcopy__(self, memo=None):
 
         """Return a deep copy"""
 
-        # deep-copy the placed items
-        return Solution(self.problem, {index: copy.deepcopy(placed_item) for index, placed_item in self.placed_items.items()}, self.weight, self.value)
+        # deep-copy the placed items, and copy the spatial index, the occupancy grid (if any) and the containment tree instead of rebuilding them
+        return Solution(self.problem, {index: copy.deepcopy(placed_item) for index, placed_item in self.placed_items.items()}, self.weight, self.value, copy.deepcopy(self.placed_item_grid), self.rotation_bucket_num, self.lazy_placements, self.use_no_fit_polygons, self.use_inner_fit_regions, self.occupancy_grid is not None, copy.deepcopy(self.occupancy_grid), dict(self.placement_hashes), self.fingerprint, self.use_placement_check_cache, self.placement_candidate_num, self.area, self.global_bounds, copy.deepcopy(self.containment_tree), dict(self.placement_orders))
+
+    def begin_transaction(self):
+
+        """Start logging the changes applied to the placements, so that they can be reverted with a rollback until the transaction is committed, and return the checkpoint of the start"""
+
+        self.journal = list()
+
+        return self.checkpoint()
+
+    def checkpoint(self):
+
+        """Return a checkpoint of the active transaction, i.e. a point of its log to which the solution can be reverted with a rollback"""
+
+        return len(self.journal), self.weight, self.value, self.area
+
+    def rollback(self, checkpoint):
+
+        """Revert the changes logged in the active transaction after the passed checkpoint, applying the inverse operations in reverse order; the transaction remains active"""
+
+        journal_length, weight, value, area = checkpoint
+
+        while len(self.journal) > journal_length:
+
+            operation, item_index, previous_placed_shape, previous_order = self.journal.pop()
+
+            # an addition is reverted by removing the item, which is the last placed one
+            if operation == "add":
+                del self.placed_items[item_index]
+                del self.placement_orders[item_index]
+                self.update_aggregate_stats(item_index, self.placed_item_grid.item_bounds[item_index], None)
+                self.placed_item_grid.remove(item_index)
+                if self.occupancy_grid is not None:
+                    self.occupancy_grid.remove(item_index)
+                self.containment_tree.mark_changed(item_index)
+                self.weight -= self.problem.items[item_index].weight
+                self.value -= self.problem.items[item_index].value
+                self.update_placement_hash(item_index)
+                continue
+
+            # a removal is reverted by placing the item again in its previous order among the placed items, which some random selections depend on; only if it was not the last placed one, the rest need to be sorted again
+            if operation == "remove":
+                is_last = not self.placed_items or self.placement_orders[next(reversed(self.placed_items))] < previous_order
+                self.placed_items[item_index] = previous_placed_shape
+                self.placement_orders[item_index] = previous_order
+                if not is_last:
+                    self.placed_items = {index: self.placed_items[index] for index in sorted(self.placed_items.keys(), key=self.placement_orders.__getitem__)}
+                self.update_aggregate_stats(item_index, None, previous_placed_shape.get_current_bounds())
+                self.placed_item_grid.insert(item_index, previous_placed_shape.get_current_bounds())
+                self.weight += self.problem.items[item_index].weight
+                self.value += self.problem.items[item_index].value
+
+            # movements and rotations are reverted by restoring the previous placement, which was never changed
+            else:
+                self.placed_items[item_index] = previous_placed_shape
+                self.update_aggregate_stats(item_index, self.placed_item_grid.item_bounds[item_index], previous_placed_shape.get_current_bounds())
+                self.placed_item_grid.update(item_index, previous_placed_shape.get_current_bounds())
+
+            if self.occupancy_grid is not None:
+                self.occupancy_grid.mark_changed(item_index)
+            self.containment_tree.mark_changed(item_index)
+            self.update_placement_hash(item_index)
+
+        # restore the exact weight, value and area of the checkpoint, free of accumulated rounding errors
+        self.weight = weight
+        self.value = value
+        self.area = area
+
+    def commit_transaction(self):
+
+        """Accept the changes of the active transaction, which stops logging changes"""
+
+        self.journal = None
+
+    def _log_placement_change(self, operation, item_index):
+
+        """If a transaction is active, log the passed operation (movement or rotation) about to be applied to the placed item with the passed index, and replace its placement with a shallow copy to change, so that the logged one is never changed"""
+
+        if self.journal is not None:
+            placed_shape = self.placed_items[item_index]
+            self.journal.append((operation, item_index, placed_shape, None))
+            self.placed_items[item_index] = copy.copy(placed_shape)
+
+    def _get_undo_checkpoint(self):
+
+        """Return a checkpoint of the active transaction from which a tentative change can be undone with a rollback, which drops its log entries and restores the exact previous placements, or None if no transaction is active"""
+
+        return self.checkpoint() if self.journal is not None else None
+
+    def get_rotation_bucket(self, rotation):
+
+        """Return the bucket (index of the discrete angle) nearest to the passed rotation, expressed in degrees, when rotations are quantized"""
+
+        return int(round(rotation * self.rotation_bucket_num / 360.)) % self.rotation_bucket_num
+
+    def can_use_rotation_templates(self, rotation):
+
+        """Return whether a placement with the passed rotation can be created from a rotation template"""
+
+        return self.rotation_bucket_num > 0 and not np.isnan(rotation)
+
+    def _place_from_rotation_template(self, item_index, position, rotation):
+
+        """Place the item with the passed index in the passed position, with the discrete rotation nearest to the passed one, translating a cached rotation template"""
+
+        template = self.problem.items[item_index].get_rotation_template(self.get_rotation_bucket(rotation), self.rotation_bucket_num)
+        self.placed_items[item_index] = template.get_moved_copy(position)
+
+    def can_item_fit(self, item_index):
+
+        """Return whether the item with the passed index may fit in the container, which is only checked if inner-fit regions are used"""
+
+        return not self.use_inner_fit_regions or self.problem.can_item_fit(item_index, self.rotation_bucket_num)
+
+    def get_random_placement(self, item_index):
+
+        """Return a random (position, rotation) placement for the item with the passed index, with a uniformly distributed rotation and a position uniformly distributed in the inner-fit region of the item for the rotation, if inner-fit regions are used, or in the bounding rectangle of the container otherwise"""
+
+        if self.use_inner_fit_regions:
+            rotation = random.uniform(0, 360)
+            return self.problem.get_inner_fit_region(item_index, rotation, self.rotation_bucket_num).sample_position(), rotation
+
+        min_x, min_y, max_x, max_y = self.problem.container.bounds
+        position = (random.uniform(min_x, max_x), random.uniform(min_y, max_y))
+
+        return position, random.uniform(0, 360)
+
+    def get_random_placements(self, item_index, placement_num):
+
+        """Return a pair of arrays with the (x, y) positions and rotations of the passed number of random placements for the item with the passed index, distributed as those of get_random_placement, drawn at once (unless inner-fit regions are used); rotations are quantized if needed, and undefined for circles"""
+
+        if self.use_inner_fit_regions:
+            placements = [self.get_random_placement(item_index) for _ in range(placement_num)]
+            positions = np.array([position for position, _ in placements], dtype=np.float64).reshape(-1, 2)
+            rotations = np.array([rotation for _, rotation in placements], dtype=np.float64)
+
+        else:
+            min_x, min_y, max_x, max_y = self.problem.container.bounds
+            samples = np.random.random((placement_num, 3))
+            positions = np.column_stack((min_x + samples[:, 0] * (max_x - min_x), min_y + samples[:, 1] * (max_y - min_y)))
+            rotations = samples[:, 2] * 360.
+
+        if type(self.problem.items[item_index].shape) == Circle:
+            rotations[:] = np.nan
+        elif self.rotation_bucket_num > 0:
+            rotations = np.round(rotations * self.rotation_bucket_num / 360.) % self.rotation_bucket_num * 360. / self.rotation_bucket_num
+
+        return positions, rotations
+
+    def get_bottom_left_placements(self, item_index, rotation_num, gap=TOUCHING_GAP):
+
+        """Return a list of candidate (position, rotation) placements for the item with the passed index, with the passed number of equally distributed rotations, that put the bottom-left corner of its bounds (at the passed gap) on the bottom-left corner of the container's bounds, a vertex of the container (or its approximate polygon, if curved), or next to the bottom-right or top-left corner of the bounds of a placed item, sorted in bottom-left order; if no-fit polygons are used, the positions next to a placed item (at the passed gap) where the item does not overlap any placed item are candidates too, with the discrete angle nearest to each rotation; only the bounds of the placements are checked to be within those of the container"""
+
+        item = self.problem.items[item_index]
+        container_min_x, container_min_y, container_max_x, container_max_y = self.problem.container.bounds
+
+        # corners where the bottom-left corner of the bounds of the item may be placed, with those of the placed items projected to the bottom and left sides of the container too, like the steps of a skyline
+        corners = {(container_min_x, container_min_y)}
+        container_shape = self.problem.container.shape
+        corners.update(map(tuple, get_shape_vertex_array(container_shape.polygon if type(container_shape) == Circle else container_shape).tolist()))
+        for min_x, min_y, max_x, max_y in self.placed_item_grid.item_bounds.values():
+            corners.update(((max_x, min_y), (min_x, max_y), (max_x, container_min_y), (container_min_x, max_y)))
+
+        # circles are not affected by rotations
+        rotations = [np.nan] if type(item.shape) == Circle else [i * 360. / rotation_num for i in range(rotation_num)]
+
+        # no-fit polygons are only available for the discrete angles of quantized rotations
+        use_no_fit_polygons = self.use_no_fit_polygons and self.rotation_bucket_num > 0
+        if use_no_fit_polygons:
+            rotations = list(dict.fromkeys(rotation if np.isnan(rotation) else self.get_rotation_bucket(rotation) * 360. / self.rotation_bucket_num for rotation in rotations))
+
+        placements = list()
+        for rotation, (relative_min_x, relative_min_y, relative_max_x, relative_max_y) in zip(rotations, item.get_relative_bounds(rotations).tolist()):
+
+            for corner_x, corner_y in corners:
+                min_x, min_y = corner_x + gap, corner_y + gap
+                if min_x + relative_max_x - relative_min_x <= container_max_x and min_y + relative_max_y - relative_min_y <= container_max_y:
+                    placements.append((min_y, min_x, (min_x - relative_min_x, min_y - relative_min_y), rotation))
+
+            if use_no_fit_polygons:
+                for x, y in self.problem.get_no_fit_polygon_engine(self.rotation_bucket_num).get_touching_positions(self, item_index, 0 if np.isnan(rotation) else self.get_rotation_bucket(rotation), gap):
+                    min_x, min_y = x + relative_min_x, y + relative_min_y
+                    if min_x >= container_min_x and min_y >= container_min_y and x + relative_max_x <= container_max_x and y + relative_max_y <= container_max_y:
+                        placements.append((min_y, min_x, (x, y), rotation))
+
+        # the lowest placements go first, and the leftmost ones among them
+        placements.sort(key=lambda placement: (placement[0], placement[1]))
+
+        return [(position, rotation) for _, _, position, rotation in placements]
+
+    def update_placed_item_bounds(self, item_index):
+
+        """Update the spatial index with the current bounds of the placed item with the passed index, after its shape has changed"""
+
+        self.update_aggregate_stats(item_index, self.placed_item_grid.item_bounds[item_index], self.placed_items[item_index].get_current_bounds())
+        self.placed_item_grid.update(item_index, self.placed_items[item_index].get_current_bounds())
+        if self.occupancy_grid is not None:
+            self.occupancy_grid.mark_changed(item_index)
+        self.containment_tree.mark_changed(item_index)
+        self.update_placement_hash(item_index)
+
+    def update_aggregate_stats(self, item_index, previous_bounds, bounds):
+
+        """Update the total area and global bounds of the placed items after the item with the passed index changed from the passed previous bounds to the passed bounds, either of them None if the item was not (or is no longer) placed; must be called before the spatial index is updated"""
+
+        if previous_bounds is None:
+            self.area += self.problem.items[item_index].area
+        elif bounds is None:
+            self.area = self.area - self.problem.items[item_index].area if self.placed_items else 0.
+
+        if self.global_bounds is not None:
+
+            global_min_x, global_min_y, global_max_x, global_max_y = self.global_bounds
+
+            # if the item defined some extreme of the global bounds, they may shrink, so they are recalculated when needed
+            if previous_bounds is not None and (previous_bounds[0] <= global_min_x or previous_bounds[1] <= global_min_y or previous_bounds[2] >= global_max_x or previous_bounds[3] >= global_max_y):
+                self.global_bounds = None
+
+            # otherwise, they can only grow to include the new bounds
+            elif bounds is not None:
+                min_x, min_y, max_x, max_y = bounds
+                self.global_bounds = min(min_x, global_min_x), min(min_y, global_min_y), max(max_x, global_max_x), max(max_y, global_max_y)
+
+    def check_aggregate_stats(self):
+
+        """Check that the incrementally maintained aggregate statistics (total area and global bounds of the placed items) match a full recalculation from the placed shapes, raising an error otherwise"""
+
+        area = sum(placed_shape.shape.area for placed_shape in self.placed_items.values())
+        if abs(self.area - area) > AGGREGATE_AREA_TOLERANCE * max(abs(area), 1.):
+            raise ValueError("The area of the placed items is {}, but {} was maintained".format(area, self.area))
+
+        if set(self.placed_item_grid.item_bounds.keys()) != set(self.placed_items.keys()):
+            raise ValueError("The placed items {} do not match the items with bounds {}".format(sorted(self.placed_items.keys()), sorted(self.placed_item_grid.item_bounds.keys())))
+
+        for index, placed_shape in self.placed_items.items():
+            if self.placed_item_grid.item_bounds[index] != placed_shape.get_current_bounds():
+                raise ValueError("The bounds of placed item {} are {}, but {} were maintained".format(index, placed_shape.get_current_bounds(), self.placed_item_grid.item_bounds[index]))
+
+        if self.global_bounds is not None and self.global_bounds != self._get_global_bounds():
+            raise ValueError("The global bounds of the placed items are {}, but {} were maintained".format(self._get_global_bounds(), self.global_bounds))
+
+    def update_placement_hash(self, item_index):
+
+        """Update the fingerprint of the solution with the current placement of the item with the passed index (or its absence), based on the index and the pose, rounded to a given precision"""
+
+        # the fingerprint combines the hashes of the placements with exclusive-or, so a hash can be replaced without recalculating the rest
+        if item_index in self.placement_hashes:
+            self.fingerprint ^= self.placement_hashes.pop(item_index)
+
+        if item_index in self.placed_items:
+            placement_hash = hash((item_index,) + get_quantized_pose(self.placed_items[item_index], FINGERPRINT_POSITION_PRECISION, FINGERPRINT_ROTATION_PRECISION))
+            self.placement_hashes[item_index] = placement_hash
+            self.fingerprint ^= placement_hash
+
+    def get_fingerprint(self):
+
+        """Return the fingerprint of the solution, a hash of its placements (item indices and poses) that does not depend on their order, which is equal for solutions with practically equal placements"""
+
+        return self.fingerprint
+
+    def get_evaluation(self):
+
+        """Return the validity of the solution (whether all its placements are valid) and its fitness (its value if valid, or zero otherwise), memoized in the problem by fingerprint, so that they are only calculated once for solutions with practically equal placements"""
+
+        evaluation = self.problem.solution_evaluations.get(self.fingerprint)
+
+        if evaluation is None:
+            is_valid = all(self.is_valid_placement(item_index) for item_index in self.placed_items)
+            evaluation = (is_valid, self.value if is_valid else 0.)
+            self.problem.solution_evaluations.put(self.fingerprint, evaluation)
+
+        return evaluation
+
+    def is_valid(self):
+
+        """Return whether all the placements of the solution are valid, using the memoized evaluation of the solution if any"""
+
+        return self.get_evaluation()[0]
 
     def is_valid_placement(self, item_index):
 
@@ -208,40 +1073,195 @@ class Solution(object):
         # the weight of the item must not cause an exceed of the container's capacity
         if self.weight <= self.problem.container.max_weight:
 
-            shape = self.placed_items[item_index].shape
+            placed_shape = self.placed_items[item_index]
+            bounds = placed_shape.get_current_bounds()
+
+            # the item must be completely contained in the container, which is impossible if its bounds are not within the container's bounds (a check that does not need the item's geometry); if any point of the item is in a cell fully covered by another item, they intersect, and no exact check is needed
+            if are_bounds_within(bounds, self.problem.container.bounds) and not self.is_in_occupied_cell(item_index) and self.is_item_in_container(item_index):
 
-            # the item must be completely contained in the container
-            if does_shape_contain_other(self.problem.container.shape, shape):
+                # the item's shape is not allowed to intersect with any other placed item's shape; only the items whose bounds overlap with the item's bounds need an exact check, unless their bounding circles are disjoint
+                neighbor_indices = self.placed_item_grid.get_neighbor_indices(bounds, item_index)
 
-                # the item's shape is not allowed to intersect with any other placed item's shape
-                for other_index, other_placed_shape in self.placed_items.items():
+                # a circle is checked at once against all the nearby circles, and against the vertices of the rest of nearby shapes, so that only the latter may need exact checks
+                if type(self.problem.items[item_index].shape) == Circle:
 
-                    if item_index != other_index:
+                    has_intersection, neighbor_indices = self.find_circle_intersection(item_index, neighbor_indices)
 
-                        if do_shapes_intersect(shape, other_placed_shape.shape):
+                    if has_intersection:
 
-                            return False
+                        return False
 
-                return True
+                return not self.does_item_intersect_any(item_index, neighbor_indices)
 
         return False
 
+    def is_item_in_container(self, item_index):
+
+        """Return whether the placed item with the passed index is completely contained in the container, using the cached result for its pose if the cache of placement checks is used"""
+
+        placed_shape = self.placed_items[item_index]
+
+        if not self.use_placement_check_cache:
+            return does_shape_contain_other(self.problem.container.prepared_shape, placed_shape.shape)
+
+        key = (item_index, get_quantized_pose(placed_shape, PLACEMENT_CHECK_POSITION_PRECISION, PLACEMENT_CHECK_ROTATION_PRECISION))
+        is_contained = self.problem.placement_checks.get(key)
+
+        if is_contained is None:
+            is_contained = does_shape_contain_other(self.problem.container.prepared_shape, placed_shape.shape)
+            self.problem.placement_checks.put(key, is_contained)
+
+        return is_contained
+
+    def does_item_intersect_any(self, item_index, other_indices):
+
+        """Return whether the placed item with the passed index intersects with any of the placed items with the passed indices, using the cached results for their poses if the cache of placement checks is used, and only checking the rest"""
+
+        placed_shape = self.placed_items[item_index]
+
+        if self.use_placement_check_cache:
+
+            pose = get_quantized_pose(placed_shape, PLACEMENT_CHECK_POSITION_PRECISION, PLACEMENT_CHECK_ROTATION_PRECISION)
+
+            unchecked_indices = list()
+            unchecked_keys = list()
+            for other_index in other_indices:
+                other_pose = get_quantized_pose(self.placed_items[other_index], PLACEMENT_CHECK_POSITION_PRECISION, PLACEMENT_CHECK_ROTATION_PRECISION)
+                key = (item_index, pose, other_index, other_pose) if item_index < other_index else (other_index, other_pose, item_index, pose)
+                has_intersection = self.problem.placement_checks.get(key)
+                if has_intersection:
+                    return True
+                if has_intersection is None:
+                    unchecked_indices.append(other_index)
+                    unchecked_keys.append(key)
+
+            other_placed_shapes = [self.placed_items[other_index] for other_index in unchecked_indices]
+            intersections = get_shape_intersections(placed_shape.shape, [other_placed_shape.shape for other_placed_shape in other_placed_shapes], placed_shape.get_current_bounds(), [other_placed_shape.get_current_bounds() for other_placed_shape in other_placed_shapes], placed_shape.get_bounding_circle(), [other_placed_shape.get_bounding_circle() for other_placed_shape in other_placed_shapes], *self.get_convex_part_arguments(item_index, unchecked_indices), *self.get_approximation_arguments(item_index, unchecked_indices)) if other_placed_shapes else list()
+            for key, has_intersection in zip(unchecked_keys, intersections):
+                self.problem.placement_checks.put(key, has_intersection)
+
+            return any(intersections)
+
+        other_placed_shapes = [self.placed_items[other_index] for other_index in other_indices]
+
+        return does_shape_intersect_any(placed_shape.shape, [other_placed_shape.shape for other_placed_shape in other_placed_shapes], placed_shape.get_current_bounds(), [other_placed_shape.get_current_bounds() for other_placed_shape in other_placed_shapes], placed_shape.get_bounding_circle(), [other_placed_shape.get_bounding_circle() for other_placed_shape in other_placed_shapes], *self.get_convex_part_arguments(item_index, other_indices), *self.get_approximation_arguments(item_index, other_indices))
+
+    def get_convex_part_arguments(self, item_index, other_indices):
+
+        """Return the convex parts of the placed item with the passed index and the list of those of the placed items with the passed other indices, to check their intersections with separating axis tests, or a pair of None if such tests are not used"""
+
+        if not USE_CONVEX_PART_CHECKS:
+            return None, None
+
+        return self.get_convex_parts(item_index), [self.get_convex_parts(other_index) for other_index in other_indices]
+
+    def get_convex_parts(self, item_index):
+
+        """Return a (p, k, 2) array with the points of the convex parts of the current placement of the item with the passed index, taken from its exterior points, or None if the item is not decomposed"""
+
+        convex_part_indices = self.problem.items[item_index].get_convex_part_indices()
+
+        if convex_part_indices is None:
+            return None
+
+        return self.placed_items[item_index].get_current_vertices()[convex_part_indices]
+
+    def get_approximation_arguments(self, item_index, other_indices):
+
+        """Return the placed approximations of the placed item with the passed index and the list of those of the placed items with the passed other indices, to settle their intersection checks when possible, or a pair of None if approximations are not used"""
+
+        if not USE_SHAPE_APPROXIMATIONS or not self.lazy_placements:
+            return None, None
+
+        return self.get_approximation(item_index), [self.get_approximation(other_index) for other_index in other_indices]
+
+    def get_approximation(self, item_index):
+
+        """Return the approximations of the item with the passed index placed with the pose of its current placement, or None if approximations are not used or the item has none; only lazy placements are supported, since their pose defines their geometry exactly"""
+
+        if not USE_SHAPE_APPROXIMATIONS or not self.lazy_placements:
+            return None
+
+        approximation = self.problem.items[item_index].get_approximation()
+        if approximation is None:
+            return None
+
+        return approximation.get_placement(*self.placed_items[item_index].get_pose())
+
+    def is_in_occupied_cell(self, item_index):
+
+        """Return whether any vertex (or the center, for a circle) of the placed item with the passed index is in a cell of the occupancy grid fully covered by another placed item, which proves an intersection; always false if the occupancy grid is not used"""
+
+        if self.occupancy_grid is None:
+            return False
+
+        # the checked item is excluded from the grid until the next check of another item, and the rest of changed items are rasterized
+        self.occupancy_grid.mark_changed(item_index)
+        self.occupancy_grid.refresh(self.placed_items, item_index)
+
+        points = self.placed_items[item_index].get_current_vertices()
+        if points is None:
+            points = np.array([self.placed_items[item_index].get_bounding_circle()[:2]])
+
+        return self.occupancy_grid.is_any_point_in_full_cell(points)
+
+    def find_circle_intersection(self, item_index, neighbor_indices):
+
+        """For the placed circle with the passed index, check in array operations whether it intersects with the placed circles with the passed indices (an exact check) or contains any vertex of the rest of placed shapes with the passed indices (which can only prove an intersection); return whether an intersection was found, and the indices of the non-circle shapes, which need an exact check otherwise"""
+
+        center_x, center_y, radius = self.placed_items[item_index].get_bounding_circle()
+
+        circle_indices = list()
+        other_indices = list()
+        for index in neighbor_indices:
+            if type(self.problem.items[index].shape) == Circle:
+                circle_indices.append(index)
+            else:
+                other_indices.append(index)
+
+        # the bounding circle of a circle is the circle itself
+        if circle_indices:
+            circles = np.array([self.placed_items[index].get_bounding_circle() for index in circle_indices])
+            if get_circle_intersection_mask(center_x, center_y, radius, circles[:, :2], circles[:, 2]).any():
+                return True, other_indices
+
+        # a vertex inside the circle is enough to prove an intersection, since it belongs to the boundary of its shape
+        if other_indices:
+            if is_any_point_in_circle(center_x, center_y, radius, np.concatenate([self.placed_items[index].get_current_vertices() for index in other_indices])):
+                return True, other_indices
+
+        return False, other_indices
+
     def get_area(self):
 
         """Return the sum of the area of the placed items"""
 
-        return sum(placed_shape.shape.area for _, placed_shape in self.placed_items.items())
+        if CHECK_AGGREGATE_STATS:
+            self.check_aggregate_stats()
+
+        return self.area
 
     def get_global_bounds(self):
 
         """Return the extreme points of the shape defining the global bounding rectangle"""
 
+        if CHECK_AGGREGATE_STATS:
+            self.check_aggregate_stats()
+
+        # the bounds are only recalculated if a change may have shrunk them
+        if self.global_bounds is None:
+            self.global_bounds = self._get_global_bounds()
+
+        return self.global_bounds
+
+    def _get_global_bounds(self):
+
+        """Calculate and return the extreme points of the shape defining the global bounding rectangle, from the bounds of the placed items in the spatial index"""
+
         global_min_x = global_min_y = np.inf
         global_max_x = global_max_y = -np.inf
 
-        for _, placed_shape in self.placed_items.items():
-
-            min_x, min_y, max_x, max_y = get_bounds(placed_shape.shape)
+        for min_x, min_y, max_x, max_y in self.placed_item_grid.item_bounds.values():
 
             if min_x < global_min_x:
                 global_min_x = min_x
@@ -265,7 +1285,7 @@ class Solution(object):
         min_x, min_y, max_x, max_y = self.get_global_bounds()
 
         # return the area of the bounding rectangle
-        return abs(min_x - max_x) * abs(min_x - max_y)
+        return abs(min_x - max_x) * abs(min_y - max_y)
 
     def get_random_placed_item_index(self, indices_to_ignore=None):
 
@@ -288,8 +1308,25 @@ class Solution(object):
 
         """Place the problem's item with the specified index in the container in the passed position and having the specified rotation, without checking if it leads to an invalid solution"""
 
+        if self.journal is not None:
+            self.journal.append(("add", item_index, None, None))
+        self.placement_orders[item_index] = self.next_placement_order
+        self.next_placement_order += 1
+
         # the item is marked as placed, storing information about the position and rotation of the shape
-        self.placed_items[item_index] = PlacedShape(self.problem.items[item_index].shape, position, rotation)
+        if self.can_use_rotation_templates(rotation):
+            self._place_from_rotation_template(item_index, position, rotation)
+        elif self.lazy_placements:
+            item = self.problem.items[item_index]
+            self.placed_items[item_index] = LazyPlacedShape(item.canonical_shape, item.vertex_array, position, rotation, item.bounding_radius)
+        else:
+            self.placed_items[item_index] = PlacedShape(self.problem.items[item_index].shape, position, rotation, bounding_radius=self.problem.items[item_index].bounding_radius)
+        self.update_aggregate_stats(item_index, None, self.placed_items[item_index].get_current_bounds())
+        self.placed_item_grid.insert(item_index, self.placed_items[item_index].get_current_bounds())
+        if self.occupancy_grid is not None:
+            self.occupancy_grid.mark_changed(item_index)
+        self.containment_tree.mark_changed(item_index)
+        self.update_placement_hash(item_index)
 
         # update the weight and value of the container in the current solution
         self.weight += self.problem.items[item_index].weight
@@ -311,7 +1348,13 @@ class Solution(object):
                 if not np.isnan(rotation) and type(item.shape) == Circle:
                     rotation = np.nan
 
+                # discard the positions known to cause an overlap with a placed item
+                if self.use_no_fit_polygons and self.rotation_bucket_num > 0 and self.problem.get_no_fit_polygon_engine(self.rotation_bucket_num).is_position_blocked(self, item_index, position, 0 if np.isnan(rotation) else self.get_rotation_bucket(rotation)):
+
+                    return False
+
                 # temporarily insert the item in the container, before intersection checks
+                undo_checkpoint = self._get_undo_checkpoint()
                 self._add_item(item_index, position, rotation)
 
                 # ensure that the solution is valid with the new placement, i.e. it causes no intersections
@@ -320,24 +1363,91 @@ class Solution(object):
                     return True
 
                 # undo the placement if it makes the solution unfeasible
+                elif undo_checkpoint is not None:
+
+                    self.rollback(undo_checkpoint)
+
                 else:
 
                     self.remove_item(item_index)
 
         return False
 
+    def add_item_best_of(self, item_index, placement_num, get_placement_score=None):
+
+        """Attempt to place the problem's item with the specified index in one of the passed number of random placements, drawn at once, and return whether it was possible; the placements whose bounds would exceed those of the container are discarded without creating any geometry, and the rest are checked in turn, adopting the first valid one or, if a function scoring the placement of an item in a solution is passed, the valid one with the highest score"""
+
+        if not 0 <= item_index < len(self.problem.items) or item_index in self.placed_items or self.weight + self.problem.items[item_index].weight > self.problem.container.max_weight:
+            return False
+
+        positions, rotations = self.get_random_placements(item_index, placement_num)
+
+        # discard the placements whose bounds are not within those of the container, all at once
+        bounds = self.problem.items[item_index].get_relative_bounds(np.nan_to_num(rotations)) + np.tile(positions, 2)
+        container_min_x, container_min_y, container_max_x, container_max_y = self.problem.container.bounds
+        are_within = (bounds[:, 0] >= container_min_x) & (bounds[:, 1] >= container_min_y) & (bounds[:, 2] <= container_max_x) & (bounds[:, 3] <= container_max_y)
+
+        best_placement = None
+        best_score = -np.inf
+
+        for position, rotation in zip(map(tuple, positions[are_within].tolist()), rotations[are_within].tolist()):
+
+            undo_checkpoint = self._get_undo_checkpoint()
+            if self.add_item(item_index, position, rotation):
+
+                if get_placement_score is None:
+                    return True
+
+                # keep the best placement, and undo it to try the rest
+                score = get_placement_score(self, item_index)
+                if best_placement is None or score > best_score:
+                    best_placement = (position, rotation)
+                    best_score = score
+                if undo_checkpoint is not None:
+                    self.rollback(undo_checkpoint)
+                else:
+                    self.remove_item(item_index)
+
+        # the best placement was already validated
+        if best_placement is not None:
+            self._add_item(item_index, best_placement[0], best_placement[1])
+            return True
+
+        return False
+
+    def add_item_randomly(self, item_index):
+
+        """Attempt to place the problem's item with the specified index in a random placement, or in the first valid one of several random placements drawn at once, if configured, and return whether it was possible"""
+
+        if self.placement_candidate_num > 1:
+            return self.add_item_best_of(item_index, self.placement_candidate_num)
+
+        position, rotation = self.get_random_placement(item_index)
+
+        return self.add_item(item_index, position, rotation)
+
     def remove_item(self, item_index):
 
         """Attempt to remove the item with the passed index from the container, and return whether it was possible, i.e. whether the item was present in the container before removal"""
 
         if item_index in self.placed_items:
 
+            placement_order = self.placement_orders.pop(item_index)
+            if self.journal is not None:
+                self.journal.append(("remove", item_index, self.placed_items[item_index], placement_order))
+
             # stop considering the weight and value of the item to remove
             self.weight -= self.problem.items[item_index].weight
             self.value -= self.problem.items[item_index].value
 
             # the item stops being placed
             del self.placed_items[item_index]
+            self.update_aggregate_stats(item_index, self.placed_item_grid.item_bounds[item_index], None)
+            self.placed_item_grid.remove(item_index)
+            if self.occupancy_grid is not None:
+                self.occupancy_grid.remove(item_index)
+            self.containment_tree.mark_changed(item_index)
+            self.update_placement_hash(item_index)
 
             return True
 
@@ -359,15 +1469,27 @@ class Solution(object):
 
         return .1
 
-    def _move_item(self, item_index, displacement, has_checked_item_in_container=False):
+    def _move_item(self, item_index, displacement, has_checked_item_in_container=False, move_internal_items=False):
 
         """Move the item with the passed index as much as indicated by the displacement, without checking if it leads to an invalid solution"""
 
         if has_checked_item_in_container or item_index in self.placed_items:
 
+            # the items inside the item are found before it changes
+            internal_item_indices = self.get_items_inside_item(item_index) if move_internal_items else list()
+
+            self._log_placement_change("move", item_index)
             self.placed_items[item_index].move(displacement)
+            self.update_placed_item_bounds(item_index)
+
+            # if needed, also move any items contained in the item of the passed index
+            for internal_index in internal_item_indices:
+
+                self._log_placement_change("move", internal_index)
+                self.placed_items[internal_index].move(displacement)
+                self.update_placed_item_bounds(internal_index)
 
-    def move_item(self, item_index, displacement):
+    def move_item(self, item_index, displacement, move_internal_items=False):
 
         """Attempt to move the item with the passed index as much as indicated by the displacement, and return whether it was possible"""
 
@@ -376,7 +1498,8 @@ class Solution(object):
             old_position = self.placed_items[item_index].position
 
             # temporarily move the item, before intersection checks
-            self._move_item(item_index, displacement, True)
+            undo_checkpoint = self._get_undo_checkpoint()
+            self._move_item(item_index, displacement, True, move_internal_items)
 
             # ensure that the solution is valid with the new movement, i.e. it causes no intersections
             if self.is_valid_placement(item_index):
@@ -384,21 +1507,38 @@ class Solution(object):
                 return True
 
             # undo the movement if it makes the solution unfeasible
+            elif undo_checkpoint is not None:
+
+                self.rollback(undo_checkpoint)
+
             else:
 
-                self._move_item_to(item_index, old_position, True)
+                self._move_item_to(item_index, old_position, True, move_internal_items)
 
         return False
 
-    def _move_item_to(self, item_index, new_position, has_checked_item_in_container=False):
+    def _move_item_to(self, item_index, new_position, has_checked_item_in_container=False, move_internal_items=False):
 
         """Move the item with the passed index to the indicated new position, without checking if it leads to an invalid solution"""
 
         if has_checked_item_in_container or item_index in self.placed_items:
 
+            # the items inside the item are found before it changes, and follow its displacement
+            internal_item_indices = self.get_items_inside_item(item_index) if move_internal_items else list()
+            old_position = self.placed_items[item_index].position
+
+            self._log_placement_change("move", item_index)
             self.placed_items[item_index].move_to(new_position)
+            self.update_placed_item_bounds(item_index)
+
+            # if needed, also move any items contained in the item of the passed index
+            for internal_index in internal_item_indices:
 
-    def move_item_to(self, item_index, new_position):
+                self._log_placement_change("move", internal_index)
+                self.placed_items[internal_index].move((new_position[0] - old_position[0], new_position[1] - old_position[1]))
+                self.update_placed_item_bounds(internal_index)
+
+    def move_item_to(self, item_index, new_position, move_internal_items=False):
 
         """Attempt to move the item with the passed index to the indicated new position, and return whether it was possible"""
 
@@ -407,7 +1547,8 @@ class Solution(object):
             old_position = self.placed_items[item_index].position
 
             # temporarily move the item, before intersection checks
-            self._move_item_to(item_index, new_position)
+            undo_checkpoint = self._get_undo_checkpoint()
+            self._move_item_to(item_index, new_position, move_internal_items=move_internal_items)
 
             # ensure that the solution is valid with the new movement, i.e. it causes no intersections
             if self.is_valid_placement(item_index):
@@ -415,12 +1556,32 @@ class Solution(object):
                 return True
 
             # undo the movement if it makes the solution unfeasible
+            elif undo_checkpoint is not None:
+
+                self.rollback(undo_checkpoint)
+
             else:
 
-                self._move_item_to(item_index, old_position)
+                self._move_item_to(item_index, old_position, move_internal_items=move_internal_items)
 
         return False
 
+    def get_ray_hit_proportion(self, item_index, displacement):
+
+        """Return the smallest proportion of the passed (x, y) displacement from the reference position of the placed item with the passed index at which the ray hits the boundary of the container or of another placed item, or None if it hits none"""
+
+        position = self.placed_items[item_index].position
+        ray_bounds = (min(position[0], position[0] + displacement[0]), min(position[1], position[1] + displacement[1]), max(position[0], position[0] + displacement[0]), max(position[1], position[1] + displacement[1]))
+
+        # only the other placed items whose bounds the ray crosses can be hit, and their boundary segments are checked along with those of the container in a single pass
+        candidate_indices = self.placed_item_grid.get_neighbor_indices(ray_bounds, item_index)
+        segment_arrays = [self.problem.container.segment_array]
+        if candidate_indices:
+            is_crossed = get_ray_box_crossing_mask(position, displacement, np.array([self.placed_item_grid.item_bounds[index] for index in candidate_indices]))
+            segment_arrays.extend(self.placed_items[index].get_current_segments() for index, is_index_crossed in zip(candidate_indices, is_crossed) if is_index_crossed)
+
+        return get_nearest_ray_hit_proportion(position, displacement, np.concatenate(segment_arrays))
+
     def move_item_in_direction(self, item_index, direction, point_num, min_dist_to_check, max_dist_to_check, has_checked_item_in_container=False):
 
         """Try to move the item with the passed index in the passed (x, y) direction, as far as possible without intersecting, checking as many points as indicated"""
@@ -436,21 +1597,16 @@ class Solution(object):
                 norm = np.linalg.norm(direction)
                 direction = (direction[0] / norm, direction[1] / norm)
 
-                # create a line that goes through the reference position of the item and has the passed direction
-                line = LineString([placed_item.position, (placed_item.position[0] + direction[0] * max_dist_to_check, placed_item.position[1] + direction[1] * max_dist_to_check)])
-
-                # find the intersection points of the line with other placed items or the container
-                intersection_points = list()
-                intersection_points.extend(get_intersection_points_between_shapes(line, self.problem.container.shape))
-                for other_index, other_placed_shape in self.placed_items.items():
-                    if item_index != other_index:
-                        intersection_points.extend(get_intersection_points_between_shapes(line, other_placed_shape.shape))
+                # cast a ray from the reference position of the item in the passed direction
+                displacement = (direction[0] * max_dist_to_check, direction[1] * max_dist_to_check)
+                hit_proportion = self.get_ray_hit_proportion(item_index, displacement)
 
                 # at least an intersection should exist
-                if intersection_points:
+                if hit_proportion is not None:
 
-                    # find the smallest euclidean distance from the item's reference position to the first point of intersection
-                    intersection_point, min_dist = min([(p, np.linalg.norm((placed_item.position[0] - p[0], placed_item.position[1] - p[1]))) for p in intersection_points], key=lambda t: t[1])
+                    # find the first point of intersection, and its euclidean distance from the item's reference position
+                    intersection_point = (placed_item.position[0] + displacement[0] * hit_proportion, placed_item.position[1] + displacement[1] * hit_proportion)
+                    min_dist = hit_proportion * max_dist_to_check
 
                     # only proceed if the two points are not too near
                     if min_dist >= min_dist_to_check:
@@ -488,16 +1644,26 @@ class Solution(object):
 
         if has_checked_item_in_container or item_index in self.placed_items:
 
+            # with quantized rotations, rotate to the resulting discrete angle using a template
+            if self.can_use_rotation_templates(self.placed_items[item_index].rotation):
+                self._rotate_item_to(item_index, self.placed_items[item_index].rotation + angle, True, rotate_internal_items)
+                return
+
+            # the items inside the item are found before it changes
+            internal_item_indices = self.get_items_inside_item(item_index) if rotate_internal_items else list()
+
+            self._log_placement_change("rotate", item_index)
             self.placed_items[item_index].rotate(angle)
+            self.update_placed_item_bounds(item_index)
 
             # if needed, also rotate any items contained in the item of the passed index, with the origin of the shape containing them
             if rotate_internal_items:
 
-                internal_item_indices = self.get_items_inside_item(item_index)
-
                 for internal_index in internal_item_indices:
 
+                    self._log_placement_change("rotate", internal_index)
                     self.placed_items[internal_index].rotate(angle, False, self.placed_items[item_index].position)
+                    self.update_placed_item_bounds(internal_index)
 
     def rotate_item(self, item_index, angle, rotate_internal_items=False):
 
@@ -508,6 +1674,7 @@ class Solution(object):
             old_rotation = self.placed_items[item_index].rotation
 
             # temporarily rotate the item, before intersection checks
+            undo_checkpoint = self._get_undo_checkpoint()
             self._rotate_item(item_index, angle, True, rotate_internal_items)
 
             # ensure that the solution is valid with the new rotation, i.e. it causes no intersections
@@ -516,6 +1683,10 @@ class Solution(object):
                 return True
 
             # undo the rotation if it makes the solution unfeasible
+            elif undo_checkpoint is not None:
+
+                self.rollback(undo_checkpoint)
+
             else:
 
                 self._rotate_item_to(item_index, old_rotation, True, rotate_internal_items)
@@ -529,17 +1700,31 @@ class Solution(object):
         if has_checked_item_in_container or item_index in self.placed_items:
 
             old_rotation = self.placed_items[item_index].rotation
+            angle = new_rotation - old_rotation
+
+            # the items inside the item are found before it changes
+            internal_item_indices = self.get_items_inside_item(item_index) if rotate_internal_items else list()
+
+            self._log_placement_change("rotate", item_index)
+
+            # with quantized rotations, replace the placement with a translated template of the nearest discrete angle
+            if self.can_use_rotation_templates(old_rotation) and self.can_use_rotation_templates(new_rotation):
+                self._place_from_rotation_template(item_index, self.placed_items[item_index].position, new_rotation)
+                angle = self.placed_items[item_index].rotation - old_rotation
+
+            else:
+                self.placed_items[item_index].rotate_to(new_rotation)
 
-            self.placed_items[item_index].rotate_to(new_rotation)
+            self.update_placed_item_bounds(item_index)
 
             # if needed, also rotate any items contained in the item of the passed index, with the origin of the shape containing them
             if rotate_internal_items:
 
-                internal_item_indices = self.get_items_inside_item(item_index)
-
                 for internal_index in internal_item_indices:
 
-                    self.placed_items[internal_index].rotate(new_rotation - old_rotation, False, self.placed_items[item_index].position)
+                    self._log_placement_change("rotate", internal_index)
+                    self.placed_items[internal_index].rotate(angle, False, self.placed_items[item_index].position)
+                    self.update_placed_item_bounds(internal_index)
 
     def rotate_item_to(self, item_index, new_rotation, rotate_internal_items=False):
 
@@ -550,6 +1735,7 @@ class Solution(object):
             old_rotation = self.placed_items[item_index].rotation
 
             # temporarily rotate the item, before intersection checks
+            undo_checkpoint = self._get_undo_checkpoint()
             self._rotate_item_to(item_index, new_rotation, rotate_internal_items)
 
             # ensure that the solution is valid with the new rotation, i.e. it causes no intersections
@@ -558,15 +1744,41 @@ class Solution(object):
                 return True
 
             # undo the rotation if it makes the solution unfeasible
+            elif undo_checkpoint is not None:
+
+                self.rollback(undo_checkpoint)
+
             else:
 
                 self._rotate_item_to(item_index, old_rotation, rotate_internal_items)
 
         return False
 
-    def rotate_item_in_direction(self, item_index, clockwise, angle_num):
+    def get_free_rotation_angle(self, item_index, angle_sign, max_angle):
+
+        """Return the largest angle (in degrees, up to the passed maximum) by which the item with the passed index can continuously rotate around its reference position, in the direction of the passed angle sign, before its boundary touches that of the container or another placed item, found with an angular sweep of the arcs traced by the vertices against the nearby edges"""
+
+        placed_item = self.placed_items[item_index]
+
+        # a circle rotating around its center keeps covering the same region; the type is taken from the item, since the geometry of a lazy placement is not created for the sweep
+        if type(self.problem.items[item_index].shape) == Circle:
+            return max_angle
 
-        """Try to rotate the item with the passed index in clockwise or counter-clockwise direction (as specified), checking the maximum number of equally distributed angles as indicated"""
+        # during the rotation the item remains in the circle around its reference position that reaches its furthest vertex, so only the other placed items whose bounds overlap it can be touched
+        moving_segments = placed_item.get_current_segments()
+        radius = np.sqrt(((moving_segments[:, :2] - placed_item.position) ** 2).sum(axis=1).max())
+        x, y = placed_item.position
+        segment_arrays = [self.problem.container.segment_array]
+        segment_arrays.extend(self.placed_items[index].get_current_segments() for index in self.placed_item_grid.get_neighbor_indices((x - radius, y - radius, x + radius, y + radius), item_index))
+
+        return min(max_angle, math.degrees(get_max_sweep_angle(placed_item.position, angle_sign, moving_segments, np.concatenate(segment_arrays))))
+
+    def rotate_item_in_direction(self, item_index, clockwise, angle_num, use_angular_sweep=None):
+
+        """Try to rotate the item with the passed index in clockwise or counter-clockwise direction (as specified), checking the maximum number of equally distributed angles as indicated, with an angular sweep if so indicated or, by default, if enabled in the module"""
+
+        if use_angular_sweep is None:
+            use_angular_sweep = USE_ANGULAR_SWEEP
 
         has_rotated = False
 
@@ -574,6 +1786,14 @@ class Solution(object):
 
             # calculate the increment in the angle to perform each iteration, to progressively go from an angle greater than 0 to another smaller than 360 (same, and not worth checking since it is the initial state)
             iter_angle = (1 if clockwise else -1) * 360 / (angle_num + 2)
+
+            # with an angular sweep, apply at once all the incremental rotations that can be performed before the item touches anything, which only needs one validation
+            if use_angular_sweep:
+                step_num = min(angle_num, int(self.get_free_rotation_angle(item_index, 1 if clockwise else -1, angle_num * abs(iter_angle)) / abs(iter_angle)))
+                if step_num > 0 and self.rotate_item(item_index, step_num * iter_angle):
+                    return True
+
+            # near contacts (or if the sweep, which uses the approximate polygons of circles and ellipses, disagrees with the exact checks), validate each incremental rotation in turn
             for _ in range(angle_num):
 
                 # stop as soon as one of the incremental rotations fail; the operation is considered successful if at least one rotation was applied
@@ -593,6 +1813,7 @@ class Solution(object):
             old_rotation = self.placed_items[item_index].rotation
 
             # temporarily move and rotate the item, before intersection checks
+            undo_checkpoint = self._get_undo_checkpoint()
             self._move_item(item_index, displacement, True)
             self._rotate_item(item_index, angle, True)
 
@@ -602,6 +1823,10 @@ class Solution(object):
                 return True
 
             # undo the movement and rotation if it makes the solution unfeasible
+            elif undo_checkpoint is not None:
+
+                self.rollback(undo_checkpoint)
+
             else:
 
                 self._move_item_to(item_index, old_position, True)
@@ -619,6 +1844,7 @@ class Solution(object):
             old_rotation = self.placed_items[item_index].rotation
 
             # temporarily move and rotate the item, before intersection checks
+            undo_checkpoint = self._get_undo_checkpoint()
             self._move_item_to(item_index, new_position, True)
             self._rotate_item_to(item_index, new_rotation, True)
 
@@ -628,6 +1854,10 @@ class Solution(object):
                 return True
 
             # undo the movement and rotation if it makes the solution unfeasible
+            elif undo_checkpoint is not None:
+
+                self.rollback(undo_checkpoint)
+
             else:
 
                 self._move_item_to(item_index, old_position, True)
@@ -650,6 +1880,7 @@ class Solution(object):
                 item1_position = self.placed_items[item_index1].position
                 item0_rotation = self.placed_items[item_index0].rotation
                 item1_rotation = self.placed_items[item_index1].rotation
+                undo_checkpoint = self._get_undo_checkpoint()
 
                 # swap position if needed, without checking for validity
                 if swap_position:
@@ -669,6 +1900,10 @@ class Solution(object):
                     return True
 
                 # undo the movement and rotation if it makes the solution unfeasible
+                elif undo_checkpoint is not None:
+
+                    self.rollback(undo_checkpoint)
+
                 else:
 
                     # restore position if it was changed
@@ -689,31 +1924,19 @@ class Solution(object):
 
         """Return the indices of the items that are inside the item with the passed index"""
 
-        inside_item_indices = list()
-
-        if item_index in self.placed_items:
+        if item_index not in self.placed_items:
+            return list()
 
-            item = self.placed_items[item_index]
+        # only the placements changed since the last query are checked against the holes of the items that may contain them
+        self.containment_tree.refresh(self.placed_items, self.placed_item_grid)
 
-            # only multi-polygons can contain other items
-            if type(item.shape) == MultiPolygon:
+        return self.containment_tree.get_descendant_indices(item_index)
 
-                holes = list()
-                for geom in item.shape.geoms:
-                    holes.extend(Polygon(hole) for hole in geom.interiors)
+    def pack(self):
 
-                for other_index, placed_shape in self.placed_items.items():
+        """Return a packed version of the solution, with the placements stored in arrays and without geometry, which is cheap to keep and to transfer between processes"""
 
-                    if other_index != item_index:
-
-                        for hole in holes:
-
-                            if does_shape_contain_other(hole, self.placed_items[other_index].shape):
-
-                                inside_item_indices.append(other_index)
-                                break
-
-        return inside_item_indices
+        return PackedSolution(self)
 
     def visualize(self, title_override=None, show_title=True, show_container_value_and_weight=True, show_outside_value_and_weight=True, show_outside_items=True, color_items_by_profit_ratio=True, show_item_value_and_weight=True, show_value_and_weight_for_container_items=False, show_reference_positions=False, show_bounding_boxes=False, show_value_weight_ratio_bar=True, force_show_color_bar_min_max=False, show_plot=True, save_path=None):
 
@@ -932,3 +2155,54 @@ class Solution(object):
         # show the reference position if required
         if show_reference_position and placed_shape:
             ax.plot(placed_shape.position[0], placed_shape.position[1], "b+")
+
+
+class PackedSolution(object):
+
+    """Class representing a solution in a compact form, with the indices, reference positions and rotations, and poses of the placed items stored in arrays, and without geometry nor reference to the problem; the geometry is rebuilt from the items of the problem when unpacked"""
+
+    __slots__ = ("item_indices", "positions", "rotations", "pose_positions", "pose_rotations", "weight", "value", "rotation_bucket_num", "lazy_placements", "use_no_fit_polygons", "use_inner_fit_regions", "use_occupancy_grid", "use_placement_check_cache", "placement_candidate_num")
+
+    def __init__(self, solution):
+
+        """Constructor"""
+
+        poses = [placed_shape.get_pose() for placed_shape in solution.placed_items.values()]
+
+        # the placements keep the order of the solution, which some random selections depend on
+        self.item_indices = np.array(list(solution.placed_items.keys()), dtype=np.int32)
+        self.positions = np.array([placed_shape.position for placed_shape in solution.placed_items.values()], dtype=np.float64).reshape(-1, 2)
+        self.rotations = np.array([placed_shape.rotation for placed_shape in solution.placed_items.values()], dtype=np.float64)
+        self.pose_positions = np.array([pose_position for pose_position, _ in poses], dtype=np.float64).reshape(-1, 2)
+        self.pose_rotations = np.array([pose_rotation for _, pose_rotation in poses], dtype=np.float64)
+
+        self.weight = solution.weight
+        self.value = solution.value
+
+        # options of the solution, restored when unpacked
+        self.rotation_bucket_num = solution.rotation_bucket_num
+        self.lazy_placements = solution.lazy_placements
+        self.use_no_fit_polygons = solution.use_no_fit_polygons
+        self.use_inner_fit_regions = solution.use_inner_fit_regions
+        self.use_occupancy_grid = solution.occupancy_grid is not None
+        self.use_placement_check_cache = solution.use_placement_check_cache
+        self.placement_candidate_num = solution.placement_candidate_num
+
+    def unpack(self, problem):
+
+        """Return the solution of the passed problem represented by this packed solution, whose placed items are of the same kind as those of the packed one: lazy placements only create their geometry (from the canonical shape of the item) when needed, and the rest have it created from their pose"""
+
+        placed_items = dict()
+        for item_index, position, rotation, pose_position, pose_rotation in zip(self.item_indices.tolist(), self.positions.tolist(), self.rotations.tolist(), self.pose_positions.tolist(), self.pose_rotations.tolist()):
+            item = problem.items[item_index]
+            pose_position = tuple(pose_position)
+            pose_rotation = 0. if np.isnan(pose_rotation) else pose_rotation
+            if self.lazy_placements:
+                placed_shape = LazyPlacedShape(item.canonical_shape, item.vertex_array, tuple(position), rotation, item.bounding_radius)
+                placed_shape.pose_position = pose_position
+            else:
+                placed_shape = PlacedShape(transform_shape(item.canonical_shape, get_pose_matrix(pose_position, pose_rotation)), tuple(position), rotation, False, item.bounding_radius, pose_position)
+            placed_shape.pose_rotation = pose_rotation
+            placed_items[item_index] = placed_shape
+
+        return Solution(problem, placed_items, self.weight, self.value, None, self.rotation_bucket_num, self.lazy_placements, self.use_no_fit_polygons, self.use_inner_fit_regions, self.use_occupancy_grid, use_placement_check_cache=self.use_placement_check_cache, placement_candidate_num=self.placement_candidate_num)
@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def get_ray_hit_proportions(origin, displacement, segments):
+
+    """Return an array with, for each (x0, y0, x1, y1) segment of the passed (n, 4) array, the proportion of the passed (x, y) displacement from the passed origin at which the ray (the segment between the origin and the displaced origin) crosses or touches it, or infinity if it does not; collinear segments are not considered hit, as their intersection is not a finite number of points"""
+
+    origin_x, origin_y = origin
+    displacement_x, displacement_y = displacement
+    segment_x_differences = segments[:, 2] - segments[:, 0]
+    segment_y_differences = segments[:, 3] - segments[:, 1]
+    start_x_differences = segments[:, 0] - origin_x
+    start_y_differences = segments[:, 1] - origin_y
+
+    # the ray point (origin + t * displacement) and the segment point (start + u * segment difference) are the same where both proportions are found with cross products
+    denominators = displacement_x * segment_y_differences - displacement_y * segment_x_differences
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ray_proportions = (start_x_differences * segment_y_differences - start_y_differences * segment_x_differences) / denominators
+        segment_proportions = (start_x_differences * displacement_y - start_y_differences * displacement_x) / denominators
+    is_hit = (denominators != 0) & (ray_proportions >= 0) & (ray_proportions <= 1) & (segment_proportions >= 0) & (segment_proportions <= 1)
+
+    return np.where(is_hit, ray_proportions, np.inf)
+
+
+def get_nearest_ray_hit_proportion(origin, displacement, segments):
+
+    """Return the smallest proportion of the passed (x, y) displacement from the passed origin at which the ray crosses or touches any of the segments of the passed (n, 4) array, or None if it hits none"""
+
+    if not len(segments):
+        return None
+
+    nearest_proportion = get_ray_hit_proportions(origin, displacement, segments).min()
+
+    return float(nearest_proportion) if np.isfinite(nearest_proportion) else None
+
+
+def get_ray_box_crossing_mask(origin, displacement, bounds):
+
+    """Return a boolean array indicating which of the (min_x, min_y, max_x, max_y) boxes of the passed (n, 4) array are crossed or touched by the ray from the passed origin with the passed (x, y) displacement, using the slab method"""
+
+    entry_proportions = np.zeros(len(bounds))
+    exit_proportions = np.ones(len(bounds))
+
+    for axis in range(2):
+
+        # the ray is within the slab of the boxes for the proportions between those where it reaches each side
+        if displacement[axis] != 0:
+            side_proportions0 = (bounds[:, axis] - origin[axis]) / displacement[axis]
+            side_proportions1 = (bounds[:, axis + 2] - origin[axis]) / displacement[axis]
+            entry_proportions = np.maximum(entry_proportions, np.minimum(side_proportions0, side_proportions1))
+            exit_proportions = np.minimum(exit_proportions, np.maximum(side_proportions0, side_proportions1))
+
+        # a ray parallel to the slab is either always or never within it
+        else:
+            exit_proportions[(origin[axis] < bounds[:, axis]) | (origin[axis] > bounds[:, axis + 2])] = -1.
+
+    return entry_proportions <= exit_proportions
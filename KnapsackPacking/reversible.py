@@ -1,7 +1,6 @@
-import copy
 import random
 import time
-from problem_solution import Solution, get_bounds
+from problem_solution import Solution, get_bounds, get_solution_options, ROTATION_BUCKET_NUM, LAZY_PLACEMENTS, USE_NO_FIT_POLYGONS, USE_INNER_FIT_REGIONS, USE_OCCUPANCY_GRID, USE_PLACEMENT_CHECK_CACHE, PLACEMENT_CANDIDATE_NUM
 from common_algorithm_functions import get_index_after_weight_limit, get_time_since
 
 # default maximum number of iterations for the reversible algorithm
@@ -35,12 +34,12 @@ def select_item(items_by_weight):
     return list_index, item_index
 
 
-def solve_problem(problem, max_iter_num=MAX_ITER_NUM, max_iter_num_without_adding=MAX_ITER_NUM_WITHOUT_ADDITIONS, iter_num_to_revert_removal=ITER_NUM_TO_REVERT_REMOVAL, remove_prob=ITEM_REMOVAL_PROBABILITY, consec_remove_prob=CONSECUTIVE_ITEM_REMOVAL_PROBABILITY, ignore_removed_item_prob=IGNORE_REMOVED_ITEM_PROBABILITY, modify_prob=PLACEMENT_MODIFICATION_PROBABILITY, calculate_times=False, return_value_evolution=False):
+def solve_problem(problem, max_iter_num=MAX_ITER_NUM, max_iter_num_without_adding=MAX_ITER_NUM_WITHOUT_ADDITIONS, iter_num_to_revert_removal=ITER_NUM_TO_REVERT_REMOVAL, remove_prob=ITEM_REMOVAL_PROBABILITY, consec_remove_prob=CONSECUTIVE_ITEM_REMOVAL_PROBABILITY, ignore_removed_item_prob=IGNORE_REMOVED_ITEM_PROBABILITY, modify_prob=PLACEMENT_MODIFICATION_PROBABILITY, rotation_bucket_num=ROTATION_BUCKET_NUM, lazy_placements=LAZY_PLACEMENTS, use_no_fit_polygons=USE_NO_FIT_POLYGONS, use_inner_fit_regions=USE_INNER_FIT_REGIONS, use_occupancy_grid=USE_OCCUPANCY_GRID, use_placement_check_cache=USE_PLACEMENT_CHECK_CACHE, placement_candidate_num=PLACEMENT_CANDIDATE_NUM, calculate_times=False, return_value_evolution=False):
 
     """Find and return a solution to the passed problem, using an reversible strategy"""
 
     # create an initial solution with no item placed in the container
-    solution = Solution(problem)
+    solution = Solution(problem, **get_solution_options(rotation_bucket_num, lazy_placements, use_no_fit_polygons, use_inner_fit_regions, use_occupancy_grid, use_placement_check_cache, placement_candidate_num))
 
     # determine the bounds of the container
     min_x, min_y, max_x, max_y = get_bounds(problem.container.shape)
@@ -76,7 +75,8 @@ def solve_problem(problem, max_iter_num=MAX_ITER_NUM, max_iter_num_without_addin
 
     iter_count_since_addition = 0
     iter_count_since_removal = 0
-    solution_before_removal = None
+    removal_checkpoint = None
+    value_before_removal = 0
 
     if calculate_times:
         start_time = time.time()
@@ -84,6 +84,10 @@ def solve_problem(problem, max_iter_num=MAX_ITER_NUM, max_iter_num_without_addin
     # discard the items that would make the capacity of the container to be exceeded
     items_by_weight = items_by_weight[:get_index_after_weight_limit(items_by_weight, problem.container.max_weight)]
 
+    # if inner-fit regions are used, discard the items that cannot fit in the container
+    if use_inner_fit_regions:
+        items_by_weight = [(index, item) for (index, item) in items_by_weight if problem.can_item_fit(index, rotation_bucket_num)]
+
     ignored_item_index = -1
 
     if calculate_times:
@@ -108,7 +112,7 @@ def solve_problem(problem, max_iter_num=MAX_ITER_NUM, max_iter_num_without_addin
                 start_time = time.time()
 
             # try to add the item in a random position and with a random rotation; if it is valid, remove the item from the pending list
-            if solution.add_item(item_index, (random.uniform(min_x, max_x), random.uniform(min_y, max_y)), random.uniform(0, 360)):
+            if solution.add_item_randomly(item_index):
 
                 if calculate_times:
                     addition_time += get_time_since(start_time)
@@ -155,13 +159,14 @@ def solve_problem(problem, max_iter_num=MAX_ITER_NUM, max_iter_num_without_addin
                 start_time = time.time()
 
             # if there are items in the container, try to remove an item with a certain probability (different if there was a recent removal)
-            if solution.weight > 0 and random.uniform(0., 1.) < (consec_remove_prob if solution_before_removal else remove_prob):
+            if solution.weight > 0 and random.uniform(0., 1.) < (consec_remove_prob if removal_checkpoint else remove_prob):
 
-                # if there is no solution prior to a removal with pending re-examination
-                if not solution_before_removal:
+                # if there is no removal with pending re-examination
+                if not removal_checkpoint:
 
-                    # save the current solution before removing, just in case in needs to be restored later
-                    solution_before_removal = copy.deepcopy(solution)
+                    # start logging the changes of the solution from the current state, just in case it needs to be restored later
+                    removal_checkpoint = solution.begin_transaction()
+                    value_before_removal = solution.value
 
                     # reset the counter of iterations since removal, to avoid reverting earlier than needed
                     iter_count_since_removal = 0
@@ -178,27 +183,28 @@ def solve_problem(problem, max_iter_num=MAX_ITER_NUM, max_iter_num_without_addin
                     items_by_weight.insert(get_index_after_weight_limit(items_by_weight, problem.items[removed_index].weight), (removed_index, problem.items[removed_index]))
 
             # if there is a recent removal to be confirmed or discarded after some time
-            if solution_before_removal:
+            if removal_checkpoint:
 
                 # re-examine a removal after a certain number of iterations
                 if iter_count_since_removal == iter_num_to_revert_removal:
 
                     # if the value in the container has improved since removal, accept the operation in a definitive way
-                    if solution.value > solution_before_removal.value:
+                    if solution.value > value_before_removal:
 
                         # if an item had been ignored, make it available for placement again
                         if ignored_item_index >= 0:
                             items_by_weight.insert(get_index_after_weight_limit(items_by_weight, problem.items[ignored_item_index].weight), (ignored_item_index, problem.items[ignored_item_index]))
 
-                    # otherwise, revert the solution to the pre-removal state
+                    # otherwise, revert the solution to the pre-removal state, undoing the logged changes
                     else:
-                        solution = solution_before_removal
+                        solution.rollback(removal_checkpoint)
 
                         # after reverting a removal, have some margin to try to add items
                         iter_count_since_addition = 0
 
-                    # reset removal data
-                    solution_before_removal = None
+                    # reset removal data, no longer logging changes
+                    solution.commit_transaction()
+                    removal_checkpoint = None
                     iter_count_since_removal = 0
                     ignored_item_index = -1
 
@@ -240,8 +246,8 @@ def solve_problem(problem, max_iter_num=MAX_ITER_NUM, max_iter_num_without_addin
                     value_evolution_time += get_time_since(start_time)
 
         # in the end, revert the last unconfirmed removal if it did not improve the container's value
-        if solution_before_removal and solution.value < solution_before_removal.value:
-            solution = solution_before_removal
+        if removal_checkpoint and solution.value < value_before_removal:
+            solution.rollback(removal_checkpoint)
 
             if return_value_evolution:
 
@@ -253,6 +259,9 @@ def solve_problem(problem, max_iter_num=MAX_ITER_NUM, max_iter_num_without_addin
                 if calculate_times:
                     value_evolution_time += get_time_since(start_time)
 
+        # stop logging changes of the returned solution
+        solution.commit_transaction()
+
     # encapsulate all times informatively in a dictionary
     if calculate_times:
         approx_total_time = sort_time + item_selection_time + item_discarding_time + addition_time + removal_time + modification_time + value_evolution_time
@@ -0,0 +1,197 @@
+import math
+import numpy as np
+from shapely.geometry import JOIN_STYLE, MultiPolygon, Polygon
+from caching import LRUCache
+
+# default simplification tolerances of the levels of approximations of a shape, from the coarsest to the finest, as proportions of its bounding radius
+APPROXIMATION_LEVEL_TOLERANCES = (0.1, 0.02)
+
+# relative margin by which the inscribed circle of a shape is shrunk, so that floating-point errors in its placements never make it exceed the shape
+INNER_CIRCLE_MARGIN = 1e-6
+
+# default minimum number of exterior points of a shape for its approximations to include levels of simplified polygons, which are only cheaper to check than the exact geometry (given the cost of creating their placements) for complex shapes; simpler shapes only have an inscribed circle
+APPROXIMATION_MIN_VERTEX_NUM = 256
+
+# default maximum number of placements of the approximations of each shape whose polygons are cached, so that those of the placed items that are checked many times are not recreated
+APPROXIMATION_PLACEMENT_CACHE_SIZE = 64
+
+
+def get_largest_polygon(shape):
+
+    """Return the passed polygon, or the polygon with the greatest area of the passed multi-polygon, or None if there is none"""
+
+    if type(shape) == MultiPolygon:
+        return max(shape.geoms, key=lambda geom: geom.area) if shape.geoms else None
+
+    if type(shape) == Polygon and not shape.is_empty:
+        return shape
+
+    return None
+
+
+def get_ring_point_array(polygon):
+
+    """Return an (n, 2) array with the points of the exterior of the passed polygon, without the closing point"""
+
+    return np.array(polygon.exterior.coords)[:-1, :2]
+
+
+def get_inner_circle(shape):
+
+    """Return a (center_x, center_y, radius) tuple describing a circle contained by the passed polygon or multi-polygon, centered in the point of its largest polygon farthest from the boundary among its centroid and its representative point (which is always inside), or None if no such circle is found"""
+
+    polygon = get_largest_polygon(shape)
+    if polygon is None:
+        return None
+
+    # the distance to the boundary includes that to the holes
+    inner_circle = None
+    for center in (polygon.centroid, polygon.representative_point()):
+        if polygon.contains(center):
+            radius = polygon.boundary.distance(center) * (1 - INNER_CIRCLE_MARGIN)
+            if radius > 0 and (inner_circle is None or radius > inner_circle[2]):
+                inner_circle = center.x, center.y, radius
+
+    return inner_circle
+
+
+def get_outer_ring(shape, tolerance):
+
+    """Return an (n, 2) array with the points of a convex polygon that contains the passed polygon or multi-polygon, simplifying its convex hull with the passed tolerance, or None if the simplification fails"""
+
+    # every point of the hull is within the tolerance of the simplified hull, so growing the latter by the tolerance (with mitred corners, which do not add points) covers the former
+    outer_polygon = shape.convex_hull.simplify(tolerance).buffer(tolerance, join_style=JOIN_STYLE.mitre)
+    if type(outer_polygon) != Polygon or outer_polygon.is_empty or not outer_polygon.contains(shape):
+        return None
+
+    return get_ring_point_array(outer_polygon)
+
+
+def get_inner_ring(shape, tolerance):
+
+    """Return an (n, 2) array with the points of a polygon without holes that is contained by the passed polygon or multi-polygon, simplifying the exterior of the largest part of the shape shrunk by the passed tolerance, or None if none is found"""
+
+    # the shrunk shape is away from the boundary by the tolerance, which is the most that the simplification moves it
+    inner_polygon = get_largest_polygon(shape.buffer(-tolerance).simplify(tolerance))
+    if inner_polygon is None:
+        return None
+
+    # the holes of the shape must not overlap with the exterior of the shrunk shape
+    inner_polygon = Polygon(inner_polygon.exterior)
+    if not inner_polygon.is_valid or not shape.contains(inner_polygon):
+        return None
+
+    return get_ring_point_array(inner_polygon)
+
+
+class ShapeApproximation(object):
+
+    """Class representing a hierarchy of conservative approximations of a shape in its canonical placement (with the center of its bounding rectangle in the origin): the coarsest level has a circle that contains the shape and a circle contained by it, and the next levels have simplified polygons, from the coarsest to the finest, each with an outer polygon that contains the shape and an inner polygon contained by it"""
+
+    __slots__ = ("bounding_radius", "inner_circle", "outer_rings", "inner_rings", "placements")
+
+    def __init__(self, shape, bounding_radius, level_tolerances=APPROXIMATION_LEVEL_TOLERANCES, min_vertex_num=APPROXIMATION_MIN_VERTEX_NUM, placement_cache_size=APPROXIMATION_PLACEMENT_CACHE_SIZE):
+
+        """Constructor"""
+
+        # the bounding circle is centered in the origin
+        self.bounding_radius = bounding_radius
+        self.inner_circle = get_inner_circle(shape)
+
+        # the rings of each level (None where no valid polygon is found) are only kept if they are simpler than the shape, since otherwise the exact check is as cheap
+        vertex_num = sum(len(geom.exterior.coords) for geom in (shape.geoms if type(shape) == MultiPolygon else [shape]))
+        self.outer_rings = list()
+        self.inner_rings = list()
+        for tolerance in (level_tolerances if vertex_num >= min_vertex_num else ()):
+            outer_ring = get_outer_ring(shape, tolerance * bounding_radius)
+            inner_ring = get_inner_ring(shape, tolerance * bounding_radius)
+            self.outer_rings.append(outer_ring if outer_ring is not None and len(outer_ring) < vertex_num else None)
+            self.inner_rings.append(inner_ring if inner_ring is not None and len(inner_ring) < vertex_num else None)
+
+        # placements of the approximations, by pose, shared by all the solutions
+        self.placements = LRUCache(placement_cache_size)
+
+    def get_level_num(self):
+
+        """Return the number of levels of simplified polygons"""
+
+        return len(self.outer_rings)
+
+    def get_placement(self, position, rotation):
+
+        """Return the placement of the approximations with the passed pose (moving the origin to the passed position, with the passed rotation, expressed in degrees), reusing a cached one if available"""
+
+        key = (position[0], position[1], rotation)
+        placement = self.placements.get(key)
+
+        if placement is None:
+            placement = PlacedShapeApproximation(self, position, rotation)
+            self.placements.put(key, placement)
+
+        return placement
+
+
+class PlacedShapeApproximation(object):
+
+    """Class representing the approximations of a shape in a pose, whose polygons are only created when a check needs them"""
+
+    __slots__ = ("approximation", "matrix", "outer_circle", "inner_circle", "outer_polygons", "inner_polygons")
+
+    def __init__(self, approximation, position, rotation):
+
+        """Constructor"""
+
+        # the transformation is the same applied to the canonical shape in its placements
+        angle = math.radians(rotation)
+        cos, sin = math.cos(angle), math.sin(angle)
+        self.approximation = approximation
+        self.matrix = cos, -sin, sin, cos, position[0], position[1]
+
+        self.outer_circle = position[0], position[1], approximation.bounding_radius
+        if approximation.inner_circle is not None:
+            x, y, radius = approximation.inner_circle
+            self.inner_circle = cos * x - sin * y + position[0], sin * x + cos * y + position[1], radius
+        else:
+            self.inner_circle = None
+
+        self.outer_polygons = [None] * approximation.get_level_num()
+        self.inner_polygons = [None] * approximation.get_level_num()
+
+    def get_level_num(self):
+
+        """Return the number of levels of simplified polygons"""
+
+        return len(self.outer_polygons)
+
+    def get_polygon(self, ring):
+
+        """Return the polygon with the points of the passed (n, 2) canonical ring, transformed to the pose"""
+
+        a, b, d, e, x_offset, y_offset = self.matrix
+
+        return Polygon(np.column_stack((a * ring[:, 0] + b * ring[:, 1] + x_offset, d * ring[:, 0] + e * ring[:, 1] + y_offset)).tolist())
+
+    def get_outer_polygon(self, level):
+
+        """Return the polygon of the passed level that contains the shape, or None if the level has none"""
+
+        if self.outer_polygons[level] is None and self.approximation.outer_rings[level] is not None:
+            self.outer_polygons[level] = self.get_polygon(self.approximation.outer_rings[level])
+
+        return self.outer_polygons[level]
+
+    def get_inner_polygon(self, level):
+
+        """Return the polygon of the passed level contained by the shape, or None if the level has none"""
+
+        if self.inner_polygons[level] is None and self.approximation.inner_rings[level] is not None:
+            self.inner_polygons[level] = self.get_polygon(self.approximation.inner_rings[level])
+
+        return self.inner_polygons[level]
+
+
+def do_circles_intersect(circle0, circle1):
+
+    """Return whether the two passed (center_x, center_y, radius) circles intersect (or touch); the shapes containing intersecting inner circles intersect too, and the shapes contained by disjoint outer circles are disjoint"""
+
+    return math.hypot(circle0[0] - circle1[0], circle0[1] - circle1[1]) <= circle0[2] + circle1[2]
@@ -1,10 +1,25 @@
-import copy
 import math
 import random
 import numpy as np
+from shapely import affinity
 from shapely.geometry import LinearRing, MultiPolygon, Point, Polygon, MultiPoint, MultiLineString
 from circle import Circle, VISUALIZATION_RESOLUTION
 from ellipse import Ellipse
+from prepared_shape import PreparedShape
+from convex_decomposition import get_ring_convex_parts, get_padded_part_index_array, do_convex_parts_intersect, get_convex_part_set_intersections
+from shape_approximation import ShapeApproximation, do_circles_intersect
+
+# default maximum number of convex parts of the decomposition of a shape, beyond which the shape is not decomposed, and its checks are left to Shapely
+MAX_CONVEX_PART_NUM = 8
+
+# relative margin added to bounding radii, so that floating-point errors accumulated in movements and rotations never make a bounding circle smaller than the shape
+BOUNDING_RADIUS_TOLERANCE = 1e-9
+
+# counters of the intersection checks resolved by the bounds-based prefilter without an exact geometric test (hits) and of those that needed the exact test (misses)
+intersection_prefilter_stats = {"hits": 0, "misses": 0}
+
+# counters of the intersection and containment checks settled by each level of the approximations of the shapes (the bounding and inner circles, only used for intersections, and each level of simplified polygons), and of those that needed the exact check
+approximation_stats = {"intersection": {"circles": 0, "levels": list(), "exact": 0}, "containment": {"levels": list(), "exact": 0}}
 
 
 def get_bounds(shape):
@@ -36,7 +51,9 @@ def get_bounding_rectangle_center(shape):
     if type(shape) == Ellipse:
         shape = shape.polygon
 
-    return (shape.bounds[0] + shape.bounds[2]) / 2, (shape.bounds[1] + shape.bounds[3]) / 2
+    min_x, min_y, max_x, max_y = shape.bounds
+
+    return (min_x + max_x) / 2, (min_y + max_y) / 2
 
 
 def get_centroid(shape):
@@ -55,6 +72,161 @@ def get_centroid(shape):
     return shape.centroid
 
 
+def get_bounding_radius(shape):
+
+    """Return the radius of a circle centered in the center of the bounding rectangle of the shape that contains the whole shape, which remains valid for any rotation around that center"""
+
+    # the circle is its own bounding circle
+    if type(shape) == Circle:
+
+        return shape.radius
+
+    # for an ellipse, use the approximate polygon
+    if type(shape) == Ellipse:
+        shape = shape.polygon
+
+    center_x, center_y = get_bounding_rectangle_center(shape)
+
+    # the furthest point of the shape from the center is one of the points of the exterior
+    if type(shape) == MultiPolygon:
+        coords = [coord for geom in shape.geoms for coord in geom.exterior.coords]
+    else:
+        coords = shape.exterior.coords
+
+    return max(math.hypot(x - center_x, y - center_y) for x, y in coords) * (1. + BOUNDING_RADIUS_TOLERANCE)
+
+
+def rotate_point(point, angle, origin):
+
+    """Return the (x, y) point resulting from rotating the passed point around the passed origin according to the passed angle, expressed in degrees, with the same convention as Shapely's rotation"""
+
+    angle = math.radians(angle)
+    cos, sin = math.cos(angle), math.sin(angle)
+    x, y = point[0] - origin[0], point[1] - origin[1]
+
+    return origin[0] + cos * x - sin * y, origin[1] + sin * x + cos * y
+
+
+def get_pose_matrix(position, rotation):
+
+    """Return the [a, b, d, e, x_offset, y_offset] affine transformation matrix, in Shapely's format, that rotates points around the origin according to the passed angle, expressed in degrees, and then moves the origin to the passed position"""
+
+    angle = math.radians(rotation)
+    cos, sin = math.cos(angle), math.sin(angle)
+
+    return [cos, -sin, sin, cos, position[0], position[1]]
+
+
+def transform_shape(shape, matrix):
+
+    """Return a new shape resulting from applying the passed affine transformation matrix, in Shapely's format, to the passed shape"""
+
+    # the circle is defined by its center, and the radius is not affected by rigid transformations
+    if type(shape) == Circle:
+
+        a, b, d, e, x_offset, y_offset = matrix
+
+        return Circle((a * shape.center.x + b * shape.center.y + x_offset, d * shape.center.x + e * shape.center.y + y_offset), shape.radius)
+
+    # for the ellipse, transform the approximate polygon, along with the center
+    if type(shape) == Ellipse:
+
+        return Ellipse(affinity.affine_transform(shape.center, matrix), shape.half_width, shape.half_height, affinity.affine_transform(shape.polygon, matrix))
+
+    return affinity.affine_transform(shape, matrix)
+
+
+def get_shape_vertex_array(shape):
+
+    """Return an (n, 2) array with the exterior points of the shape (of all of its polygons, for a multi-polygon), which determine its bounds, or None for a circle, which has no finite points"""
+
+    if type(shape) == Circle:
+
+        return None
+
+    # for the ellipse, use the approximate polygon
+    if type(shape) == Ellipse:
+        shape = shape.polygon
+
+    if type(shape) == MultiPolygon:
+        return np.array([coord[:2] for geom in shape.geoms for coord in geom.exterior.coords])
+
+    return np.array([coord[:2] for coord in shape.exterior.coords])
+
+
+def get_convex_part_index_array(shape, max_part_num=MAX_CONVEX_PART_NUM):
+
+    """Return a (p, k) array with the indices of the points (in the exterior points of get_shape_vertex_array, of the passed shape or any of its placements) of the p convex parts of a decomposition of the shape, each part padded to k indices by repeating its last one, or None if the shape is a circle, has holes, or needs more than the passed maximum number of parts"""
+
+    if type(shape) == Circle:
+
+        return None
+
+    # for the ellipse, decompose the approximate polygon
+    if type(shape) == Ellipse:
+        shape = shape.polygon
+
+    # the exterior points of each polygon (with the closing point repeated) follow those of the previous one
+    parts = list()
+    offset = 0
+    for polygon in (shape.geoms if type(shape) == MultiPolygon else [shape]):
+
+        if polygon.interiors:
+            return None
+
+        ring_points = np.array(polygon.exterior.coords)[:, :2]
+        ring_parts = get_ring_convex_parts(ring_points[:-1], offset)
+        if ring_parts is None:
+            return None
+
+        parts.extend(ring_parts)
+        offset += len(ring_points)
+
+    if not parts or len(parts) > max_part_num:
+        return None
+
+    return get_padded_part_index_array(parts)
+
+
+def get_shape_approximation(shape, bounding_radius):
+
+    """Return the hierarchy of conservative approximations of the passed shape (with the passed bounding radius), or None if the shape is a circle, whose checks are already cheap, or an invalid shape, whose approximations could not be guaranteed to be conservative"""
+
+    if type(shape) == Circle:
+
+        return None
+
+    # for the ellipse, approximate the approximate polygon, which is the one used in the exact checks
+    if type(shape) == Ellipse:
+        shape = shape.polygon
+
+    if not shape.is_valid:
+
+        return None
+
+    return ShapeApproximation(shape, bounding_radius)
+
+
+def get_transformed_points(vertex_array, matrix):
+
+    """Return an (n, 2) array with the points of the passed (n, 2) array after applying the passed affine transformation matrix, in Shapely's format, without creating any geometry; the operations are the same as Shapely's, so the points match those of the transformed shape"""
+
+    a, b, d, e, x_offset, y_offset = matrix
+
+    return np.column_stack((a * vertex_array[:, 0] + b * vertex_array[:, 1] + x_offset, d * vertex_array[:, 0] + e * vertex_array[:, 1] + y_offset))
+
+
+def get_transformed_bounds(vertex_array, matrix):
+
+    """Return the (min_x, min_y, max_x, max_y) bounds of the points of the passed (n, 2) array after applying the passed affine transformation matrix, in Shapely's format, without creating any geometry"""
+
+    points = get_transformed_points(vertex_array, matrix)
+    min_x, min_y = points.min(axis=0)
+    max_x, max_y = points.max(axis=0)
+
+    return min_x, min_y, max_x, max_y
+
+
 def get_shape_exterior_points(shape, is_for_visualization=False):
 
     """Return the exterior points of a shape"""
@@ -84,9 +256,179 @@ def get_shape_exterior_points(shape, is_for_visualization=False):
     return shape.exterior.xy
 
 
-def do_shapes_intersect(shape0, shape1):
+def are_bounds_disjoint(bounds0, bounds1):
+
+    """Return whether the two passed (min_x, min_y, max_x, max_y) bounding boxes are disjoint, i.e. they neither overlap nor touch"""
+
+    return bounds0[0] > bounds1[2] or bounds1[0] > bounds0[2] or bounds0[1] > bounds1[3] or bounds1[1] > bounds0[3]
+
+
+def are_bounds_within(bounds0, bounds1):
+
+    """Return whether the first passed (min_x, min_y, max_x, max_y) bounding box is within the second one, which is necessary for a shape to be within another one"""
+
+    return bounds0[0] >= bounds1[0] and bounds0[1] >= bounds1[1] and bounds0[2] <= bounds1[2] and bounds0[3] <= bounds1[3]
+
+
+def are_bounding_circles_disjoint(bounding_circle0, bounding_circle1):
+
+    """Return whether the two passed (center_x, center_y, radius) bounding circles are disjoint, i.e. they neither overlap nor touch"""
+
+    return math.hypot(bounding_circle0[0] - bounding_circle1[0], bounding_circle0[1] - bounding_circle1[1]) > bounding_circle0[2] + bounding_circle1[2]
+
+
+def get_intersection_prefilter_stats():
+
+    """Return a dictionary with the number of intersection checks resolved by the prefilter (hits), the number of those that needed an exact check (misses), and the proportion of hits"""
+
+    check_num = intersection_prefilter_stats["hits"] + intersection_prefilter_stats["misses"]
+
+    return {"hits": intersection_prefilter_stats["hits"], "misses": intersection_prefilter_stats["misses"], "hit_rate": intersection_prefilter_stats["hits"] / check_num if check_num else 0.}
+
+
+def reset_intersection_prefilter_stats():
+
+    """Reset the counters of the intersection prefilter"""
+
+    intersection_prefilter_stats["hits"] = 0
+    intersection_prefilter_stats["misses"] = 0
+
+
+def count_approximation_result(check_type, level=None):
+
+    """Count a check of the passed type ("intersection" or "containment") settled by the passed level of approximations (-1 for the circles, and the index of the level of simplified polygons for the rest), or by the exact check if no level is passed"""
 
-    """Return whether the two passed shapes intersect with one another"""
+    stats = approximation_stats[check_type]
+
+    if level is None:
+        stats["exact"] += 1
+
+    # only intersection checks use the circles
+    elif level < 0:
+        stats["circles"] += 1
+
+    else:
+        stats["levels"].extend([0] * (level + 1 - len(stats["levels"])))
+        stats["levels"][level] += 1
+
+
+def get_approximation_stats():
+
+    """Return a dictionary with, for intersection and containment checks, the number of checks settled by each level of the approximations of the shapes (the circles and each level of simplified polygons, from the coarsest) and by the exact check, and the proportion settled without the exact check"""
+
+    result = dict()
+    for check_type, stats in approximation_stats.items():
+        settled_num = stats.get("circles", 0) + sum(stats["levels"])
+        check_num = settled_num + stats["exact"]
+        result[check_type] = {key: list(value) if type(value) == list else value for key, value in stats.items()}
+        result[check_type]["settled_rate"] = settled_num / check_num if check_num else 0.
+
+    return result
+
+
+def reset_approximation_stats():
+
+    """Reset the counters of the checks settled by the approximations of the shapes"""
+
+    approximation_stats["intersection"]["circles"] = 0
+    for stats in approximation_stats.values():
+        stats["levels"] = list()
+        stats["exact"] = 0
+
+
+def get_approximate_intersection(approximation0, approximation1):
+
+    """Return whether the two shapes with the passed placed approximations intersect, if the approximations settle it (from the cheapest level to the finest), or None if an exact check is needed; the shapes intersect if their inner approximations do, and are disjoint if their outer ones are"""
+
+    if not do_circles_intersect(approximation0.outer_circle, approximation1.outer_circle):
+
+        count_approximation_result("intersection", -1)
+        return False
+
+    if approximation0.inner_circle is not None and approximation1.inner_circle is not None and do_circles_intersect(approximation0.inner_circle, approximation1.inner_circle):
+
+        count_approximation_result("intersection", -1)
+        return True
+
+    for level in range(min(approximation0.get_level_num(), approximation1.get_level_num())):
+
+        outer_polygon0, outer_polygon1 = approximation0.get_outer_polygon(level), approximation1.get_outer_polygon(level)
+        if outer_polygon0 is not None and outer_polygon1 is not None and not outer_polygon0.intersects(outer_polygon1):
+
+            count_approximation_result("intersection", level)
+            return False
+
+        inner_polygon0, inner_polygon1 = approximation0.get_inner_polygon(level), approximation1.get_inner_polygon(level)
+        if inner_polygon0 is not None and inner_polygon1 is not None and inner_polygon0.intersects(inner_polygon1):
+
+            count_approximation_result("intersection", level)
+            return True
+
+    count_approximation_result("intersection")
+
+    return None
+
+
+def get_approximate_containment(container_shape, content_approximation):
+
+    """Return whether the passed container shape contains the shape with the passed placed approximations, if the approximations settle it (from the coarsest level to the finest), or None if an exact check is needed; the shape is contained if its outer approximation is, and is not if its inner one is not"""
+
+    for level in range(content_approximation.get_level_num()):
+
+        outer_polygon = content_approximation.get_outer_polygon(level)
+        if outer_polygon is not None and does_shape_contain_other(container_shape, outer_polygon):
+
+            count_approximation_result("containment", level)
+            return True
+
+        inner_polygon = content_approximation.get_inner_polygon(level)
+        if inner_polygon is not None and not does_shape_contain_other(container_shape, inner_polygon):
+
+            count_approximation_result("containment", level)
+            return False
+
+    count_approximation_result("containment")
+
+    return None
+
+
+def is_intersection_discarded(bounds0=None, bounds1=None, bounding_circle0=None, bounding_circle1=None):
+
+    """Return whether the intersection of two shapes can be discarded because their passed bounding boxes and/or bounding circles are disjoint, counting the result if any bounding data is available"""
+
+    if (bounds0 is not None and bounds1 is not None) or (bounding_circle0 is not None and bounding_circle1 is not None):
+
+        if (bounds0 is not None and bounds1 is not None and are_bounds_disjoint(bounds0, bounds1)) or (bounding_circle0 is not None and bounding_circle1 is not None and are_bounding_circles_disjoint(bounding_circle0, bounding_circle1)):
+
+            intersection_prefilter_stats["hits"] += 1
+            return True
+
+        intersection_prefilter_stats["misses"] += 1
+
+    return False
+
+
+def do_shapes_intersect(shape0, shape1, bounds0=None, bounds1=None, bounding_circle0=None, bounding_circle1=None, convex_parts0=None, convex_parts1=None, approximation0=None, approximation1=None):
+
+    """Return whether the two passed shapes intersect with one another; if their bounding boxes and/or bounding circles are passed, they are used to discard the intersection without an exact check when they are disjoint, if the placed approximations of both shapes are passed, they are used to settle the check when their result is certain, and if the (p, k, 2) arrays of the convex parts of both shapes are passed, the exact check is a separating axis test on them"""
+
+    # if possible, use the cheap bounding checks before the exact one
+    if is_intersection_discarded(bounds0, bounds1, bounding_circle0, bounding_circle1):
+
+        return False
+
+    # the approximations are only refined up to the exact geometry when they do not settle the check
+    if approximation0 is not None and approximation1 is not None:
+
+        has_intersection = get_approximate_intersection(approximation0, approximation1)
+        if has_intersection is not None:
+
+            return has_intersection
+
+    # shapes decomposed in convex parts intersect if any pair of their parts does
+    if convex_parts0 is not None and convex_parts1 is not None:
+
+        return do_convex_parts_intersect(convex_parts0, convex_parts1)
 
     # non-native shape types need to be the ones calling intersection, to handle all cases
     if type(shape0) == Circle or type(shape0) == Ellipse:
@@ -101,77 +443,190 @@ def do_shapes_intersect(shape0, shape1):
     return shape0.intersects(shape1)
 
 
-def get_intersection_points_between_shapes(shape0, shape1):
+def get_shape_intersections(shape, other_shapes, bounds=None, other_bounds=None, bounding_circle=None, other_bounding_circles=None, convex_parts=None, other_convex_parts=None, approximation=None, other_approximations=None):
 
-    """If the two passed shapes intersect in one or more points (a finite number) return all of them, otherwise return an empty list"""
+    """Return a list of booleans indicating whether the passed shape intersects with each of the other passed shapes; the bounding boxes and circles, the convex parts and the placed approximations, if passed (those of the other shapes as lists, with None for shapes without them), are used as in do_shapes_intersect; the separating axis tests of the shapes with convex parts are done at once, and the rest of pairs are checked in turn"""
 
-    intersection_points = list()
+    intersections = [False] * len(other_shapes)
+    convex_indices = list()
 
-    # the contour of polygons and multi-polygons is used for the check, to detect boundary intersection points
-    if type(shape0) == Polygon:
+    for i, other_shape in enumerate(other_shapes):
 
-        shape0 = shape0.exterior
+        if not is_intersection_discarded(bounds, other_bounds[i] if other_bounds else None, bounding_circle, other_bounding_circles[i] if other_bounding_circles else None):
 
-    elif type(shape0) == MultiPolygon:
+            # the approximations settle the check when their result is certain
+            has_intersection = get_approximate_intersection(approximation, other_approximations[i]) if approximation is not None and other_approximations and other_approximations[i] is not None else None
+            if has_intersection is not None:
+                intersections[i] = has_intersection
 
-        shape0 = MultiLineString(shape0.boundary)
+            # shapes decomposed in convex parts are checked with a separating axis test
+            elif convex_parts is not None and other_convex_parts and other_convex_parts[i] is not None:
+                convex_indices.append(i)
 
-    if type(shape1) == Polygon:
+            else:
+                intersections[i] = do_shapes_intersect(shape, other_shape)
 
-        shape1 = shape1.exterior
+    if convex_indices:
+        for i, has_intersection in zip(convex_indices, get_convex_part_set_intersections(convex_parts, [other_convex_parts[i] for i in convex_indices])):
+            intersections[i] = has_intersection
 
-    elif type(shape1) == MultiPolygon:
+    return intersections
 
-        shape1 = MultiLineString(shape1.boundary)
 
-    # non-native shape types use their approximate polygon boundaries
-    if type(shape0) == Circle or type(shape0) == Ellipse:
+def does_shape_intersect_any(shape, other_shapes, bounds=None, other_bounds=None, bounding_circle=None, other_bounding_circles=None, convex_parts=None, other_convex_parts=None, approximation=None, other_approximations=None):
+
+    """Return whether the passed shape intersects with any of the other passed shapes, with the same use of bounding data, convex parts and approximations as get_shape_intersections; without convex parts, the checks stop at the first intersection"""
+
+    if convex_parts is None:
+
+        for i, other_shape in enumerate(other_shapes):
+
+            if do_shapes_intersect(shape, other_shape, bounds, other_bounds[i] if other_bounds else None, bounding_circle, other_bounding_circles[i] if other_bounding_circles else None, approximation0=approximation, approximation1=other_approximations[i] if other_approximations else None):
+
+                return True
+
+        return False
+
+    return any(get_shape_intersections(shape, other_shapes, bounds, other_bounds, bounding_circle, other_bounding_circles, convex_parts, other_convex_parts, approximation, other_approximations))
+
+
+def get_shape_containments(container_shape, content_shapes):
+
+    """Return a list of booleans indicating whether the passed container shape contains each of the passed content shapes"""
+
+    return [does_shape_contain_other(container_shape, content_shape) for content_shape in content_shapes]
+
+
+def get_boundary_for_intersection_points(shape):
+
+    """Return the boundary of the passed shape used to find intersection points with other shapes: the contour of polygons and multi-polygons, the boundary of the approximate polygon of circles and ellipses, or the shape itself otherwise"""
+
+    if type(shape) == Polygon:
+
+        return shape.exterior
+
+    if type(shape) == MultiPolygon:
+
+        return MultiLineString(shape.boundary)
+
+    if type(shape) == Circle or type(shape) == Ellipse:
+
+        return shape.polygon.exterior
+
+    return shape
+
+
+def get_boundary_segment_array(shape):
+
+    """Return an (n, 4) array with the (x0, y0, x1, y1) segments of the boundary of the passed shape used to find intersection points with other shapes (as get_boundary_for_intersection_points): the exterior of polygons, all the rings of multi-polygons, and the exterior of the approximate polygon of circles and ellipses"""
+
+    if type(shape) == Circle or type(shape) == Ellipse:
+        rings = [shape.polygon.exterior]
+    elif type(shape) == MultiPolygon:
+        rings = [ring for polygon in shape.geoms for ring in [polygon.exterior] + list(polygon.interiors)]
+    else:
+        rings = [shape.exterior]
+
+    return np.concatenate([np.hstack((coords[:-1], coords[1:])) for coords in (np.array(ring.coords)[:, :2] for ring in rings)])
 
-        shape0 = shape0.polygon.exterior
 
-    if type(shape1) == Circle or type(shape1) == Ellipse:
+def get_points_of_intersection(intersection_result):
 
-        shape1 = shape1.polygon.exterior
+    """Return a list with the (x, y) points of the passed intersection result, if it is made of a finite number of points, or an empty list otherwise"""
 
-    intersection_result = shape0.intersection(shape1)
+    intersection_points = list()
 
-    if intersection_result:
+    if not intersection_result.is_empty:
 
         if type(intersection_result) == Point:
             intersection_points.append((intersection_result.x, intersection_result.y))
 
         elif type(intersection_result) == MultiPoint:
-            for point in intersection_result:
+            for point in intersection_result.geoms:
                 intersection_points.append((point.x, point.y))
 
     return intersection_points
 
 
-def does_shape_contain_other(container_shape, content_shape):
+def get_intersection_points_with_shapes(shape, other_shapes):
+
+    """Return a list with all the intersection points (when finite) of the passed shape with the other passed shapes"""
+
+    return [point for other_shape in other_shapes for point in get_intersection_points_between_shapes(shape, other_shape)]
+
+
+def get_intersection_points_between_shapes(shape0, shape1):
+
+    """If the two passed shapes intersect in one or more points (a finite number) return all of them, otherwise return an empty list"""
 
-    """Return whether the first shape is a container of the second one, which in such case acts as the content of the first one"""
+    # the contour of polygons and multi-polygons is used for the check, to detect boundary intersection points, while non-native shape types use their approximate polygon boundaries
+    return get_points_of_intersection(get_boundary_for_intersection_points(shape0).intersection(get_boundary_for_intersection_points(shape1)))
+
+
+def does_shape_contain_other(container_shape, content_shape, content_approximation=None):
+
+    """Return whether the first shape is a container of the second one, which in such case acts as the content of the first one; if the placed approximations of the content are passed, they are used to settle the check when their result is certain"""
+
+    # the approximations are only refined up to the exact geometry when they do not settle the check
+    if content_approximation is not None:
+
+        is_contained = get_approximate_containment(container_shape, content_approximation)
+        if is_contained is not None:
+            return is_contained
 
     # Shapely core shapes do not know about circle or ellipse, so let them handle the check
     if type(container_shape) == Circle or type(container_shape) == Ellipse:
         return container_shape.contains(content_shape)
 
+    # a prepared shape handles circles with its own index of holes, and uses the prepared geometry for the rest of shapes (the approximate polygon, for ellipses)
+    if type(container_shape) == PreparedShape:
+
+        if type(content_shape) == Circle:
+            return content_shape.within(container_shape)
+
+        if type(content_shape) == Ellipse:
+            content_shape = content_shape.polygon
+
+        return container_shape.contains(content_shape)
+
     # use the standard within check
     return content_shape.within(container_shape)
 
 
 def copy_shape(shape):
 
-    """Create and return a deep copy of the passed shape"""
+    """Return a copy of the passed shape; shapes are treated as immutable values (changes create new shapes, see get_modified_copy), so the shape itself is shared by reference"""
+
+    return shape
+
+
+def get_modified_copy(shape, center=None, polygon=None):
+
+    """Return a shallow copy of the passed circle or ellipse with the passed center and/or approximate polygon, if any, without modifying the passed shape or recalculating the rest of its data"""
+
+    shape_copy = type(shape).__new__(type(shape))
+    shape_copy.center = center if center is not None else shape.center
+    shape_copy.polygon = polygon if polygon is not None else shape.polygon
 
     if type(shape) == Circle:
+        shape_copy.radius = shape.radius
+
+    else:
+        shape_copy.half_width = shape.half_width
+        shape_copy.half_height = shape.half_height
 
-        return Circle(shape.center, shape.radius)
+    return shape_copy
 
-    if type(shape) == Ellipse:
 
-        return Ellipse(shape.center, shape.half_width, shape.half_height, shape.polygon)
+def get_shape_memory_size(shape):
+
+    """Return an estimation of the memory used by the geometry of the passed shape, in bytes, based on the size of its binary representation"""
+
+    # circles and ellipses are represented by their approximate polygons
+    if type(shape) == Circle or type(shape) == Ellipse:
+        shape = shape.polygon
 
-    return copy.deepcopy(shape)
+    return len(shape.wkb)
 
 
 def get_rectangle_points_from_bounds(min_x, min_y, max_x, max_y):
@@ -0,0 +1,132 @@
+import math
+
+# default number of grid cells per placeable item, used to derive the resolution of the grid from the size of the problem
+CELLS_PER_ITEM = 1.
+
+
+class PlacedItemGrid(object):
+
+    """Class representing a uniform grid over the bounding rectangle of a container, indexing the bounds of the placed items so that geometric checks can be restricted to the items that are near a given region"""
+
+    __slots__ = ("min_x", "min_y", "cell_width", "cell_height", "column_num", "row_num", "cells", "item_bounds", "item_cells")
+
+    def __init__(self, container_bounds, item_num, cells_per_item=CELLS_PER_ITEM):
+
+        """Constructor"""
+
+        min_x, min_y, max_x, max_y = container_bounds
+
+        # the grid has (approximately) as many cells as requested per item, distributed in a square layout
+        side_cell_num = max(1, int(math.ceil(math.sqrt(item_num * cells_per_item))))
+        self.min_x = min_x
+        self.min_y = min_y
+        self.column_num = side_cell_num
+        self.row_num = side_cell_num
+        self.cell_width = max(max_x - min_x, 1e-12) / self.column_num
+        self.cell_height = max(max_y - min_y, 1e-12) / self.row_num
+
+        # mapping of cell to the indices of the items whose bounds overlap the cell
+        self.cells = dict()
+
+        # bounds and cell range of each indexed item
+        self.item_bounds = dict()
+        self.item_cells = dict()
+
+    def __deepcopy__(self, memo=None):
+
+        """Return a deep copy"""
+
+        # the grid resolution is shared, and only the containers of indexed data are duplicated (bounds and cell ranges are immutable tuples)
+        grid_copy = PlacedItemGrid.__new__(PlacedItemGrid)
+        grid_copy.min_x, grid_copy.min_y, grid_copy.cell_width, grid_copy.cell_height, grid_copy.column_num, grid_copy.row_num = self.min_x, self.min_y, self.cell_width, self.cell_height, self.column_num, self.row_num
+        grid_copy.cells = {cell: set(indices) for cell, indices in self.cells.items()}
+        grid_copy.item_bounds = dict(self.item_bounds)
+        grid_copy.item_cells = dict(self.item_cells)
+
+        return grid_copy
+
+    def get_cell_range(self, bounds):
+
+        """Return the (min_column, min_row, max_column, max_row) range of cells covered by the passed bounds, clamped to the grid; bounds outside the grid are assigned to the border cells, which keeps overlapping bounds in common cells"""
+
+        min_x, min_y, max_x, max_y = bounds
+        max_column = self.column_num - 1
+        max_row = self.row_num - 1
+
+        return (min(max(int(math.floor((min_x - self.min_x) / self.cell_width)), 0), max_column),
+                min(max(int(math.floor((min_y - self.min_y) / self.cell_height)), 0), max_row),
+                min(max(int(math.floor((max_x - self.min_x) / self.cell_width)), 0), max_column),
+                min(max(int(math.floor((max_y - self.min_y) / self.cell_height)), 0), max_row))
+
+    def insert(self, item_index, bounds):
+
+        """Index the item with the passed index with the passed bounds"""
+
+        cell_range = self.get_cell_range(bounds)
+        self.item_bounds[item_index] = bounds
+        self.item_cells[item_index] = cell_range
+
+        min_column, min_row, max_column, max_row = cell_range
+        for column in range(min_column, max_column + 1):
+            for row in range(min_row, max_row + 1):
+                cell = (column, row)
+                if cell in self.cells:
+                    self.cells[cell].add(item_index)
+                else:
+                    self.cells[cell] = {item_index}
+
+    def remove(self, item_index):
+
+        """Stop indexing the item with the passed index, and return whether it was indexed"""
+
+        if item_index not in self.item_cells:
+            return False
+
+        min_column, min_row, max_column, max_row = self.item_cells.pop(item_index)
+        del self.item_bounds[item_index]
+
+        for column in range(min_column, max_column + 1):
+            for row in range(min_row, max_row + 1):
+                cell = (column, row)
+                indices = self.cells[cell]
+                indices.discard(item_index)
+                if not indices:
+                    del self.cells[cell]
+
+        return True
+
+    def update(self, item_index, bounds):
+
+        """Update the bounds of the item with the passed index, re-indexing it only if its covered cells change"""
+
+        if item_index in self.item_cells and self.get_cell_range(bounds) == self.item_cells[item_index]:
+            self.item_bounds[item_index] = bounds
+            return
+
+        self.remove(item_index)
+        self.insert(item_index, bounds)
+
+    def get_neighbor_indices(self, bounds, item_index_to_ignore=None):
+
+        """Return the indices of the indexed items whose bounds overlap (or touch) the passed bounds, ignoring the passed item index if any"""
+
+        min_x, min_y, max_x, max_y = bounds
+        min_column, min_row, max_column, max_row = self.get_cell_range(bounds)
+
+        candidate_indices = set()
+        for column in range(min_column, max_column + 1):
+            for row in range(min_row, max_row + 1):
+                cell = (column, row)
+                if cell in self.cells:
+                    candidate_indices.update(self.cells[cell])
+
+        candidate_indices.discard(item_index_to_ignore)
+
+        # discard the candidates sharing a cell but with bounds not overlapping the passed ones; touching bounds are kept, since touching shapes are considered intersecting
+        neighbor_indices = list()
+        for index in candidate_indices:
+            other_min_x, other_min_y, other_max_x, other_max_y = self.item_bounds[index]
+            if other_min_x <= max_x and min_x <= other_max_x and other_min_y <= max_y and min_y <= other_max_y:
+                neighbor_indices.append(index)
+
+        return neighbor_indices
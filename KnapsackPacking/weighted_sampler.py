@@ -0,0 +1,116 @@
+import random
+
+
+class WeightedSampler(object):
+
+    """Class representing a set of weighted positions (from 0 to n-1) from which a position can be randomly selected with a probability proportional to its weight, keeping the partial sums of the weights in a Fenwick tree (binary indexed tree) so that selections, removals and truncations take logarithmic time"""
+
+    __slots__ = ("weights", "weight_tree", "count_tree", "limit", "top_step")
+
+    def __init__(self, weights):
+
+        """Constructor"""
+
+        # weight of each position, or None if removed
+        self.weights = list(weights)
+        position_num = len(self.weights)
+
+        # node i (starting from 1) of each tree holds the sum of the weights (or the number of non-removed positions) of the positions in the range (i - lowbit(i), i], built in linear time
+        self.weight_tree = [0.] + self.weights
+        self.count_tree = [0] + [1] * position_num
+        for i in range(1, position_num + 1):
+            parent = i + (i & -i)
+            if parent <= position_num:
+                self.weight_tree[parent] += self.weight_tree[i]
+                self.count_tree[parent] += self.count_tree[i]
+
+        # only the positions below the limit can be selected
+        self.limit = position_num
+
+        # highest power of two not greater than the number of positions, where the descent of the tree starts
+        self.top_step = 1 << (position_num.bit_length() - 1) if position_num else 0
+
+    def __len__(self):
+
+        """Return the number of positions that can be selected, i.e. not removed and below the limit"""
+
+        return self.get_prefix_sum(self.count_tree, self.limit)
+
+    def get_prefix_sum(self, tree, end):
+
+        """Return the sum of the values of the first positions, up to the passed end (excluded), of the passed tree"""
+
+        prefix_sum = tree[0]
+        while end > 0:
+            prefix_sum += tree[end]
+            end -= end & -end
+
+        return prefix_sum
+
+    def get_total_weight(self):
+
+        """Return the sum of the weights of the positions that can be selected"""
+
+        return self.get_prefix_sum(self.weight_tree, self.limit)
+
+    def sample(self):
+
+        """Randomly select and return one of the positions that can be selected, with a probability proportional to its weight; there must be some"""
+
+        # randomly select a weight within the range of the sum
+        remaining_weight = random.uniform(0, self.get_total_weight())
+
+        # descend the tree to find the first position whose cumulative weight exceeds the selected one, as a binary search over the cumulative weights would
+        position = 0
+        step = self.top_step
+        while step:
+            next_position = position + step
+            if next_position < len(self.weight_tree) and self.weight_tree[next_position] <= remaining_weight:
+                position = next_position
+                remaining_weight -= self.weight_tree[next_position]
+            step >>= 1
+
+        # rounding errors of the partial sums (or selecting exactly the total weight) may rarely lead to a position that cannot be selected, in which case the nearest one that can be selected is used
+        if position >= self.limit or self.weights[position] is None:
+            position = self.get_nearest_selectable_position(min(position, self.limit - 1))
+
+        return position
+
+    def get_nearest_selectable_position(self, position):
+
+        """Return the nearest position to the passed one that can be selected, preferring lower ones"""
+
+        for lower_position in range(position, -1, -1):
+            if self.weights[lower_position] is not None:
+                return lower_position
+
+        for higher_position in range(position + 1, self.limit):
+            if self.weights[higher_position] is not None:
+                return higher_position
+
+        return -1
+
+    def remove(self, position):
+
+        """Remove the passed position, so that it cannot be selected anymore, and return whether it was present"""
+
+        weight = self.weights[position]
+
+        if weight is None:
+            return False
+
+        self.weights[position] = None
+
+        i = position + 1
+        while i < len(self.weight_tree):
+            self.weight_tree[i] -= weight
+            self.count_tree[i] -= 1
+            i += i & -i
+
+        return True
+
+    def truncate(self, limit):
+
+        """Discard the positions from the passed limit onwards, so that they cannot be selected anymore"""
+
+        self.limit = min(self.limit, limit)
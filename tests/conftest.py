@@ -0,0 +1,7 @@
+import os
+import sys
+import matplotlib
+
+# the modules of the package are imported by name, like the scripts of the package do, and figures are never shown
+matplotlib.use("Agg")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "KnapsackPacking"))
@@ -0,0 +1,85 @@
+import random
+import numpy as np
+import pytest
+from shapely.geometry import MultiPolygon, Polygon
+import greedy
+from problem_solution import Container, Item, Problem, Solution
+from circle import Circle
+from ellipse import Ellipse
+from shape_functions import get_bounds
+
+
+def get_problem():
+
+    """Return a problem with a rectangular container and repeated non-convex, holed, square, circular and elliptical items"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    frame = MultiPolygon([(((0, 0), (0, 1.5), (1.5, 1.5), (1.5, 0)), [((0.3, 0.3), (0.3, 1.2), (1.2, 1.2), (1.2, 0.3))])])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    items = [Item(shape, 1., value) for _ in range(4) for value, shape in enumerate([l_shape, frame, square, Circle((0., 0.), 0.5), Ellipse((0., 0.), 0.7, 0.4)], 1)]
+
+    return Problem(Container(100., Polygon([(0, 0), (9, 0), (9, 5), (0, 5)])), items)
+
+
+def assert_aggregate_stats_match(solution):
+
+    """Assert that the incrementally maintained area, global bounds and global bounding rectangle area of the passed solution match a recalculation from the geometry of its placed items"""
+
+    area = sum(placed_shape.shape.area for placed_shape in solution.placed_items.values())
+    assert abs(solution.get_area() - area) <= 1e-9 * max(area, 1.)
+
+    if solution.placed_items:
+        all_bounds = np.array([get_bounds(placed_shape.shape) for placed_shape in solution.placed_items.values()])
+        min_x, min_y = all_bounds[:, :2].min(axis=0)
+        max_x, max_y = all_bounds[:, 2:].max(axis=0)
+        assert np.allclose(solution.get_global_bounds(), (min_x, min_y, max_x, max_y), rtol=0., atol=1e-9)
+        assert abs(solution.get_global_bounding_rectangle_area() - (max_x - min_x) * (max_y - min_y)) <= 1e-9
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_stats_match_recalculation(seed):
+
+    """The aggregate statistics must match a recalculation after every random change, including those undone by rolling back a transaction"""
+
+    random.seed(seed)
+    solution = greedy.solve_problem(get_problem(), max_iter_num=200, repetition_num=1, seed=seed)
+    item_indices = list(range(len(solution.problem.items)))
+
+    for _ in range(10):
+        checkpoint = solution.begin_transaction()
+        for _ in range(20):
+            operation_probability = random.random()
+            item_index = random.choice(item_indices)
+            if operation_probability < 0.3:
+                solution.add_item(item_index, *solution.get_random_placement(item_index))
+            elif operation_probability < 0.45:
+                solution.remove_random_item()
+            elif operation_probability < 0.7:
+                solution.move_item(item_index, (random.uniform(-1., 1.), random.uniform(-1., 1.)))
+            elif operation_probability < 0.9:
+                solution.rotate_item(item_index, random.uniform(-90., 90.))
+            else:
+                solution.swap_placements(*random.sample(item_indices, 2))
+            assert_aggregate_stats_match(solution)
+        if random.random() < 0.5:
+            solution.rollback(checkpoint)
+        solution.commit_transaction()
+        assert_aggregate_stats_match(solution)
+
+
+def test_global_bounds_shrink_after_removing_extremes():
+
+    """Removing the items that define the minimum and maximum coordinates of the global bounds must shrink them, and the area of the global bounding rectangle must use its width and height"""
+
+    problem = get_problem()
+    solution = Solution(problem)
+    for item_index, position in ((2, (1., 1.)), (7, (8., 4.)), (12, (4.5, 2.5))):
+        assert solution.add_item(item_index, position, 0.)
+    assert_aggregate_stats_match(solution)
+
+    for item_index in (2, 7):
+        solution.remove_item(item_index)
+        assert_aggregate_stats_match(solution)
+
+    assert np.allclose(solution.get_global_bounds(), (4., 2., 5., 3.))
+    assert solution.get_global_bounding_rectangle_area() == pytest.approx(1.)
@@ -0,0 +1,103 @@
+import copy
+import math
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+import greedy
+import problem_solution
+from problem_solution import Container, Item, Problem, Solution
+
+# number of equally distributed angles checked by the rotations until intersection
+ANGLE_NUM = 8
+
+
+def get_problem():
+
+    """Return a problem with a rectangular container and repeated non-convex items (L-shapes and stars) and squares"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    star = Polygon([(math.cos(angle) * radius, math.sin(angle) * radius) for angle, radius in zip(np.linspace(0, 2 * math.pi, 10, endpoint=False), [0.9, 0.4] * 5)])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    items = [Item(shape, 1., value) for _ in range(8) for value, shape in enumerate([l_shape, star, square], 1)]
+
+    return Problem(Container(100., Polygon([(0, 0), (7, 0), (7, 5), (0, 5)])), items)
+
+
+def get_discrete_step_num(solution, item_index, angle_sign, iter_angle):
+
+    """Return the number of incremental rotations of the passed angle that the item with the passed index can perform in turn, in the direction of the passed angle sign, up to the number of angles checked"""
+
+    solution = copy.deepcopy(solution)
+    step_num = 0
+    while step_num < ANGLE_NUM and solution.rotate_item(item_index, angle_sign * iter_angle):
+        step_num += 1
+
+    return step_num
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_sweep_never_skips_collisions(seed):
+
+    """The incremental rotations covered by the angle of the sweep must never exceed those that a discrete scan validates in turn, so that rotations never jump over obstacles, and must match them in most cases"""
+
+    solution = greedy.solve_problem(get_problem(), max_iter_num=500, repetition_num=1, seed=seed)
+    iter_angle = 360 / (ANGLE_NUM + 2)
+
+    matching_num = 0
+    for item_index in solution.placed_items:
+        for angle_sign in (1, -1):
+            sweep_step_num = min(ANGLE_NUM, int(solution.get_free_rotation_angle(item_index, angle_sign, ANGLE_NUM * iter_angle) / iter_angle))
+            discrete_step_num = get_discrete_step_num(solution, item_index, angle_sign, iter_angle)
+            assert sweep_step_num <= discrete_step_num
+            matching_num += sweep_step_num == discrete_step_num
+
+    assert matching_num > len(solution.placed_items)
+
+
+def test_sweep_flag_is_read_when_rotating(monkeypatch):
+
+    """Rotating until intersection must follow the module flag of the angular sweep at the time of the call"""
+
+    solution = Solution(get_problem())
+    assert solution.add_item(0, (3.5, 2.5), 0.)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the angular sweep is disabled")
+
+    monkeypatch.setattr(problem_solution, "USE_ANGULAR_SWEEP", False)
+    monkeypatch.setattr(Solution, "get_free_rotation_angle", fail)
+    assert solution.rotate_item_in_direction(0, True, ANGLE_NUM)
+
+
+def test_sweep_is_used_when_enabled(monkeypatch):
+
+    """Rotating until intersection with the module flag of the angular sweep enabled must find the free rotation angle with the sweep"""
+
+    solution = Solution(get_problem())
+    assert solution.add_item(0, (3.5, 2.5), 0.)
+
+    sweep_calls = list()
+    get_free_rotation_angle = Solution.get_free_rotation_angle
+
+    def record(*args, **kwargs):
+        sweep_calls.append(args)
+        return get_free_rotation_angle(*args, **kwargs)
+
+    monkeypatch.setattr(problem_solution, "USE_ANGULAR_SWEEP", True)
+    monkeypatch.setattr(Solution, "get_free_rotation_angle", record)
+    assert solution.rotate_item_in_direction(0, True, ANGLE_NUM)
+    assert len(sweep_calls) == 1
+
+
+def test_sweep_does_not_create_lazy_geometry():
+
+    """The angular sweep of lazy placements must work from their poses, without creating the geometry of any placement"""
+
+    solution = Solution(get_problem(), lazy_placements=True)
+    assert solution.add_item(0, (3.5, 2.5), 0.)
+    assert solution.add_item(3, (1.2, 1.2), 0.)
+    for placed_shape in solution.placed_items.values():
+        placed_shape.materialized_shape = None
+
+    assert solution.get_free_rotation_angle(0, 1, 90.) > 0.
+    assert all(placed_shape.materialized_shape is None for placed_shape in solution.placed_items.values())
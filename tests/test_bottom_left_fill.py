@@ -0,0 +1,68 @@
+import copy
+import math
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+import greedy
+from problem_solution import Container, Item, Problem, Solution
+from circle import Circle
+from no_fit_polygon import TOUCHING_GAP
+from shape_functions import are_bounds_within
+
+
+def get_problem():
+
+    """Return a problem with an L-shaped container and repeated non-convex, star-shaped, square and circular items"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    star = Polygon([(math.cos(angle) * radius, math.sin(angle) * radius) for angle, radius in zip(np.linspace(0, 2 * math.pi, 10, endpoint=False), [0.9, 0.4] * 5)])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    items = [Item(shape, 1., value) for _ in range(5) for value, shape in enumerate([l_shape, star, square, Circle((0., 0.), 0.4)], 1)]
+
+    return Problem(Container(100., Polygon([(0, 0), (8, 0), (8, 3), (4, 3), (4, 6), (0, 6)])), items)
+
+
+def get_placements(solution):
+
+    """Return the placements of the passed solution, in their order, in a comparable form (with undefined rotations as None)"""
+
+    return [(index, placed_shape.position, None if np.isnan(placed_shape.rotation) else placed_shape.rotation) for index, placed_shape in solution.placed_items.items()]
+
+
+@pytest.mark.parametrize("options", [dict(), dict(rotation_bucket_num=4), dict(lazy_placements=True)])
+def test_bottom_left_fill_is_valid_and_deterministic(options):
+
+    """Solving a problem with bottom-left-fill placements must produce valid solutions, and the same ones for the same seed"""
+
+    solutions = [greedy.solve_problem(get_problem(), max_iter_num=100, repetition_num=1, placement_strategy=greedy.BOTTOM_LEFT_FILL_PLACEMENT, seed=3, **options) for _ in range(2)]
+
+    assert len(solutions[0].placed_items) > 5
+    assert all(solutions[0].is_valid_placement(item_index) for item_index in solutions[0].placed_items)
+    assert get_placements(solutions[0]) == get_placements(solutions[1])
+
+
+def test_bottom_left_placements_are_sorted_and_within_bounds():
+
+    """The candidate placements must be sorted in bottom-left order of the bounds of the item, which must be within those of the container, must not change between calls or copies of the solution, and the first one must be taken in an empty container"""
+
+    problem = get_problem()
+    solution = Solution(problem)
+    assert solution.add_item(0, (1.5, 1.5), 0.)
+    assert solution.add_item(1, (5., 1.), 0.)
+
+    placements = solution.get_bottom_left_placements(2, 4)
+    min_ys = list()
+    for position, rotation in placements:
+        placement_solution = Solution(problem)
+        placement_solution._add_item(2, position, rotation)
+        min_x, min_y, max_x, max_y = placement_solution.placed_items[2].get_current_bounds()
+        assert are_bounds_within((min_x, min_y, max_x, max_y), problem.container.bounds)
+        min_ys.append(min_y)
+
+    assert placements and np.all(np.diff(min_ys) >= -1e-9)
+    assert placements == solution.get_bottom_left_placements(2, 4) == copy.deepcopy(solution).get_bottom_left_placements(2, 4)
+
+    empty_solution = Solution(problem)
+    position, rotation = empty_solution.get_bottom_left_placements(2, 4)[0]
+    assert empty_solution.add_item(2, position, rotation)
+    assert np.allclose(empty_solution.placed_items[2].get_current_bounds()[:2], (TOUCHING_GAP, TOUCHING_GAP))
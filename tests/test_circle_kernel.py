@@ -0,0 +1,71 @@
+import math
+import random
+import numpy as np
+from shapely.geometry import Point, Polygon
+from problem_solution import Container, Item, Problem, Solution
+from circle import Circle
+from circle_kernel import are_all_points_in_circle, get_circle_intersection_mask, is_any_point_in_circle
+from shape_functions import do_shapes_intersect, does_shape_contain_other
+
+
+def get_random_star(point_num, min_radius, max_radius):
+
+    """Return a random star-shaped polygon with the passed number of points, at random angles and distances from the origin in the passed range"""
+
+    angles = sorted(random.uniform(0., 2. * math.pi) for _ in range(point_num))
+
+    return Polygon([(math.cos(angle) * random.uniform(min_radius, max_radius), math.sin(angle) * random.uniform(min_radius, max_radius)) for angle in angles])
+
+
+def test_intersection_mask_matches_circle_checks():
+
+    """The circles found to intersect with a circle in array operations must be those that intersect with it one by one, including those that touch it"""
+
+    random.seed(0)
+    circle = Circle((0., 0.), 1.)
+    circles = [Circle((random.uniform(-3., 3.), random.uniform(-3., 3.)), random.uniform(0.1, 1.5)) for _ in range(500)] + [Circle((3., 4.), 4.), Circle((-3., -4.), 3.9999)]
+    mask = get_circle_intersection_mask(0., 0., 1., np.array([(other_circle.center.x, other_circle.center.y) for other_circle in circles]), np.array([other_circle.radius for other_circle in circles]))
+
+    assert mask.tolist() == [circle.intersects(other_circle) for other_circle in circles]
+    assert mask[-2] and not mask[-1]
+
+
+def test_point_checks_match_point_distances():
+
+    """The checks of the points of random polygons in a circle, in array operations, must match those of the distances of the points one by one"""
+
+    random.seed(1)
+    for _ in range(300):
+        circle = Circle((random.uniform(-1., 1.), random.uniform(-1., 1.)), random.uniform(0.2, 2.))
+        polygon = get_random_star(random.randint(3, 12), 0.2, 1.5)
+        coords = polygon.exterior.coords
+        points = np.array(coords)
+
+        assert circle.contains(polygon) == all(circle.center.distance(Point(coord)) < circle.radius for coord in coords)
+        assert are_all_points_in_circle(circle.center.x, circle.center.y, circle.radius, points) == circle.contains(polygon)
+        assert is_any_point_in_circle(circle.center.x, circle.center.y, circle.radius, points) == any(circle.center.distance(Point(coord)) <= circle.radius for coord in coords)
+
+
+def test_circle_placements_match_exact_checks():
+
+    """Adding circles to a solution, with their checks in array operations, must succeed exactly when they fit in the container without intersecting any placed shape one by one"""
+
+    random.seed(2)
+    shapes = [Circle((0., 0.), 0.5), Circle((0., 0.), 0.3), get_random_star(6, 0.3, 0.9), Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])]
+    problem = Problem(Container(100., Polygon([(0, 0), (6, 0), (6, 5), (0, 5)])), [Item(shape, 1., 1.) for _ in range(8) for shape in shapes])
+    solution = Solution(problem)
+    circle_num = 0
+
+    for _ in range(400):
+        item_index = random.randrange(len(problem.items))
+        if item_index in solution.placed_items:
+            continue
+        position, rotation = solution.get_random_placement(item_index)
+        other_shapes = [placed_shape.shape for placed_shape in solution.placed_items.values()]
+        is_added = solution.add_item(item_index, position, rotation)
+        if type(problem.items[item_index].shape) == Circle:
+            shape = Circle(position, problem.items[item_index].shape.radius)
+            assert is_added == (does_shape_contain_other(problem.container.shape, shape) and not any(do_shapes_intersect(shape, other_shape) for other_shape in other_shapes))
+            circle_num += is_added
+
+    assert circle_num > 3
@@ -0,0 +1,121 @@
+import copy
+import random
+import pytest
+from shapely.geometry import MultiPolygon, Polygon
+from problem_solution import Container, Item, Problem, Solution
+from circle import Circle
+from shape_functions import does_shape_contain_other
+
+
+def get_square_points(half_side):
+
+    """Return the points of a square centered at the origin with the passed half side"""
+
+    return ((-half_side, -half_side), (-half_side, half_side), (half_side, half_side), (half_side, -half_side))
+
+
+def get_problem():
+
+    """Return a problem with a square container, frames (multi-polygons with a hole) of decreasing size that fit in the holes of the larger ones, and small squares and circles"""
+
+    frames = [MultiPolygon([(get_square_points(half_side), [get_square_points(half_side * 0.8)])]) for half_side in (2., 1.5, 1.)]
+    items = [Item(frame, 1., 1.) for frame in frames for _ in range(2)]
+    items.extend(Item(Polygon(get_square_points(0.2)), 1., 1.) for _ in range(6))
+    items.extend(Item(Circle((0., 0.), 0.2), 1., 1.) for _ in range(6))
+
+    return Problem(Container(100., Polygon(get_square_points(6.))), items)
+
+
+def get_items_inside_item(solution, item_index):
+
+    """Return the indices of the items inside the item with the passed index, scanning all the placed items against the holes of the item"""
+
+    inside_item_indices = list()
+
+    if item_index in solution.placed_items:
+
+        item = solution.placed_items[item_index]
+
+        if type(item.shape) == MultiPolygon:
+
+            holes = list()
+            for geom in item.shape.geoms:
+                holes.extend(Polygon(hole) for hole in geom.interiors)
+
+            for other_index, placed_shape in solution.placed_items.items():
+
+                if other_index != item_index:
+
+                    for hole in holes:
+
+                        if does_shape_contain_other(hole, placed_shape.shape):
+
+                            inside_item_indices.append(other_index)
+                            break
+
+    return inside_item_indices
+
+
+def get_nested_solution(problem, **options):
+
+    """Return a solution where the frames of each pair are nested in each other, with small items inside the innermost ones"""
+
+    solution = Solution(problem, **options)
+    for center_index, center in enumerate(((-3., -3.), (3., 3.))):
+        for frame_index in range(3):
+            assert solution.add_item(frame_index * 2 + center_index, center, 0.)
+        assert solution.add_item(6 + center_index, center, 0.)
+        assert solution.add_item(12 + center_index, (center[0] + 0.5, center[1]), 0.)
+
+    return solution
+
+
+def apply_random_changes(solution, change_num):
+
+    """Apply the passed number of random tentative changes to the passed solution, moving and rotating items with their internal items in part of them"""
+
+    item_indices = list(range(len(solution.problem.items)))
+    for _ in range(change_num):
+        operation_probability = random.random()
+        item_index = random.choice(item_indices)
+        if operation_probability < 0.2:
+            solution.add_item(item_index, solution.get_random_placement(item_index)[0], random.choice((0., 45.)))
+        elif operation_probability < 0.3:
+            solution.remove_item(item_index)
+        elif operation_probability < 0.5:
+            solution.move_item(item_index, (random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5)), random.random() < 0.5)
+        elif operation_probability < 0.6:
+            solution.move_item_to(item_index, solution.get_random_placement(item_index)[0], random.random() < 0.5)
+        elif operation_probability < 0.8:
+            solution.rotate_item(item_index, random.uniform(-30., 30.), random.random() < 0.5)
+        elif operation_probability < 0.9:
+            solution.move_and_rotate_item(item_index, (random.uniform(-0.3, 0.3), random.uniform(-0.3, 0.3)), random.uniform(-30., 30.))
+        else:
+            solution.swap_placements(*random.sample(item_indices, 2))
+
+
+@pytest.mark.parametrize("options", [dict(), dict(lazy_placements=True)])
+def test_containment_tree_matches_scan(options):
+
+    """The items inside each item found with the containment tree, updated after random changes, must match a scan of all the placed items against its holes, also in copies and after rolling back changes"""
+
+    random.seed(0)
+    problem = get_problem()
+    solution = get_nested_solution(problem, **options)
+
+    inside_item_num = 0
+    for _ in range(60):
+        checkpoint = solution.begin_transaction()
+        apply_random_changes(solution, 5)
+        if random.random() < 0.3:
+            solution.rollback(checkpoint)
+        solution.commit_transaction()
+        if random.random() < 0.2:
+            solution = copy.deepcopy(solution)
+        for item_index in range(len(problem.items)):
+            inside_item_indices = get_items_inside_item(solution, item_index)
+            assert sorted(solution.get_items_inside_item(item_index)) == sorted(inside_item_indices)
+            inside_item_num += len(inside_item_indices)
+
+    # nested items must be well represented
+    assert inside_item_num > 100
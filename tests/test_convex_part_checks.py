@@ -0,0 +1,91 @@
+import math
+import random
+from shapely import affinity
+from shapely.geometry import MultiPolygon, Polygon
+from problem_solution import Item, PlacedShape
+from ellipse import Ellipse
+from shape_functions import do_shapes_intersect, get_shape_intersections, get_shape_vertex_array
+
+
+def get_random_star(point_num, min_radius, max_radius):
+
+    """Return a random star-shaped polygon with the passed number of points, at random angles and distances from the origin in the passed range"""
+
+    angles = sorted(random.uniform(0., 2. * math.pi) for _ in range(point_num))
+
+    return Polygon([(math.cos(angle) * random.uniform(min_radius, max_radius), math.sin(angle) * random.uniform(min_radius, max_radius)) for angle in angles])
+
+
+def get_random_shapes():
+
+    """Return a list of random convex and non-convex polygons, multi-polygons and ellipses"""
+
+    shapes = list()
+    for _ in range(15):
+        shapes.append(get_random_star(random.randint(3, 10), 1., 1.).convex_hull)
+        shapes.append(get_random_star(random.randint(5, 14), 0.3, 1.2))
+        shapes.append(MultiPolygon([get_random_star(5, 1., 1.).convex_hull, affinity.translate(get_random_star(7, 0.3, 1.), 2.5, 0.)]))
+        shapes.append(Ellipse((0., 0.), random.uniform(0.3, 1.2), random.uniform(0.3, 1.2)))
+    shapes.append(Polygon([(0, 0), (2, 0), (2, 0.5), (1, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)]))
+
+    return [shape for shape in shapes if type(shape) == Ellipse or shape.is_valid]
+
+
+def get_random_placement(item):
+
+    """Return the geometry of a random placement of the passed item, and the (p, k, 2) array of its convex parts"""
+
+    placed_shape = PlacedShape(item.shape, (random.uniform(-2., 2.), random.uniform(-2., 2.)), random.uniform(0., 360.))
+
+    return placed_shape.shape, get_shape_vertex_array(placed_shape.shape)[item.get_convex_part_indices()]
+
+
+def get_decomposed_items():
+
+    """Return items with random shapes that have a convex decomposition"""
+
+    random.seed(0)
+    items = [Item(shape, 1., 1.) for shape in get_random_shapes()]
+
+    return [item for item in items if item.get_convex_part_indices() is not None]
+
+
+def test_convex_part_checks_match_shapely():
+
+    """The separating axis tests on the convex parts of random placements must match the intersection checks of Shapely"""
+
+    items = get_decomposed_items()
+    intersection_num = 0
+    for _ in range(1000):
+        shape0, parts0 = get_random_placement(random.choice(items))
+        shape1, parts1 = get_random_placement(random.choice(items))
+        expected = do_shapes_intersect(shape0, shape1)
+        assert do_shapes_intersect(shape0, shape1, convex_parts0=parts0, convex_parts1=parts1) == expected
+        intersection_num += expected
+
+    # both outcomes must be well represented
+    assert 100 < intersection_num < 900
+
+
+def test_convex_part_checks_of_touching_shapes():
+
+    """The separating axis tests must match Shapely for polygons that touch, coincide or half overlap"""
+
+    for item in [item for item in get_decomposed_items() if type(item.shape) == Polygon]:
+        width = item.shape.bounds[2] - item.shape.bounds[0]
+        for displacement in (width, 0., width * 0.5):
+            moved_shape = affinity.translate(item.shape, displacement, 0.)
+            parts0 = get_shape_vertex_array(item.shape)[item.get_convex_part_indices()]
+            parts1 = get_shape_vertex_array(moved_shape)[item.get_convex_part_indices()]
+            assert do_shapes_intersect(item.shape, moved_shape, convex_parts0=parts0, convex_parts1=parts1) == do_shapes_intersect(item.shape, moved_shape)
+
+
+def test_batched_convex_part_checks_match_shapely():
+
+    """The batched separating axis tests of a shape against several others must match the intersection checks of Shapely"""
+
+    items = get_decomposed_items()
+    for _ in range(50):
+        shape, parts = get_random_placement(random.choice(items))
+        other_shapes, other_parts = zip(*[get_random_placement(random.choice(items)) for _ in range(16)])
+        assert get_shape_intersections(shape, list(other_shapes), convex_parts=parts, other_convex_parts=list(other_parts)) == get_shape_intersections(shape, list(other_shapes))
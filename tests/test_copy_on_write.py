@@ -0,0 +1,97 @@
+import copy
+import random
+from shapely.geometry import MultiPolygon, Point, Polygon
+import greedy
+from problem_solution import Container, Item, PlacedShape, Problem
+from circle import Circle
+from ellipse import Ellipse
+from shape_functions import get_modified_copy
+
+
+def get_deep_copy(shape):
+
+    """Return an independent copy of the passed shape, as copies of shapes were made before they were shared"""
+
+    if type(shape) == Circle:
+        return Circle(shape.center, shape.radius)
+
+    if type(shape) == Ellipse:
+        return Ellipse(shape.center, shape.half_width, shape.half_height, shape.polygon)
+
+    return copy.deepcopy(shape)
+
+
+def get_geometry(shape):
+
+    """Return the geometry of the passed shape in a comparable form: the binary representation of the shape, or of the center and approximate polygon of circles and ellipses"""
+
+    if type(shape) == Circle or type(shape) == Ellipse:
+        return shape.center.wkb, shape.polygon.wkb
+
+    return shape.wkb
+
+
+def get_shapes():
+
+    """Return shapes of every supported type: a non-convex polygon, a holed multi-polygon, a circle and an ellipse"""
+
+    return [Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)]), MultiPolygon([(((0, 0), (0, 2), (2, 2), (2, 0)), [((0.3, 0.3), (0.3, 1.7), (1.7, 1.7), (1.7, 0.3))])]), Circle((1., 1.), 0.5), Ellipse((1., 1.), 0.8, 0.4)]
+
+
+def test_shared_shapes_match_deep_copies():
+
+    """Random movements and rotations of a placed shape sharing the shape of its item must produce the same geometry as those of a placed shape with a deep copy of it, without changing the shared shape"""
+
+    random.seed(0)
+    for shape in get_shapes():
+        original_geometry = get_geometry(shape)
+        shared_shape = PlacedShape(shape, (1., 1.), 0.)
+        copied_shape = PlacedShape(get_deep_copy(shape), (1., 1.), 0.)
+
+        for _ in range(20):
+            if random.random() < 0.5:
+                displacement = (random.uniform(-1., 1.), random.uniform(-1., 1.))
+                shared_shape.move(displacement)
+                copied_shape.move(displacement)
+            else:
+                angle = random.uniform(-180., 180.)
+                shared_shape.rotate(angle)
+                copied_shape.rotate(angle)
+            assert get_geometry(shared_shape.shape) == get_geometry(copied_shape.shape)
+            assert shared_shape.get_current_bounds() == copied_shape.get_current_bounds()
+
+        assert get_geometry(shape) == original_geometry
+
+
+def test_modified_copy_leaves_original():
+
+    """A modified copy of a circle or ellipse must have the passed center and/or polygon and the rest of the data of the original, which must be left unchanged"""
+
+    for shape in get_shapes()[2:]:
+        original_geometry = get_geometry(shape)
+        center = Point(3., 4.)
+        modified_copy = get_modified_copy(shape, center=center)
+
+        assert modified_copy.center is center and modified_copy.polygon is shape.polygon
+        if type(shape) == Circle:
+            assert modified_copy.radius == shape.radius
+        else:
+            assert (modified_copy.half_width, modified_copy.half_height) == (shape.half_width, shape.half_height)
+        assert get_geometry(shape) == original_geometry
+
+
+def test_solution_copies_are_independent():
+
+    """Changing a deep copy of a solution whose placements share their shapes must leave the original solution unchanged"""
+
+    random.seed(1)
+    problem = Problem(Container(100., Polygon([(0, 0), (7, 0), (7, 5), (0, 5)])), [Item(shape, 1., 1.) for _ in range(3) for shape in get_shapes()])
+    solution = greedy.solve_problem(problem, max_iter_num=200, repetition_num=1, seed=0)
+    original_state = {index: (placed_shape.position, get_geometry(placed_shape.shape)) for index, placed_shape in solution.placed_items.items()}
+
+    solution_copy = copy.deepcopy(solution)
+    for item_index in list(solution_copy.placed_items):
+        solution_copy.move_and_rotate_item(item_index, (random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5)), random.uniform(-90., 90.))
+    solution_copy.remove_random_item()
+
+    assert {index: (placed_shape.position, get_geometry(placed_shape.shape)) for index, placed_shape in solution.placed_items.items()} == original_state
@@ -0,0 +1,83 @@
+import copy
+import random
+import numpy as np
+from shapely.geometry import Polygon
+import evolutionary
+from problem_solution import Container, Item, PlacedShape, Problem, Solution
+
+
+def get_problem():
+
+    """Return a problem with a rectangular container and repeated non-convex and square items"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    items = [Item(shape, 1., value) for _ in range(4) for value, shape in enumerate([l_shape, square], 1)]
+
+    return Problem(Container(100., Polygon([(0, 0), (5, 0), (5, 4), (0, 4)])), items)
+
+
+def test_fingerprint_ignores_placement_order():
+
+    """Solutions with the same placements, added in different orders, must have the same fingerprint, which changes when a placement does"""
+
+    problem = get_problem()
+    placements = [(0, (1., 1.), 0.), (1, (3.5, 1.), 0.), (3, (3.5, 3.), 45.)]
+    solution0 = Solution(problem)
+    solution1 = Solution(problem)
+    for item_index, position, rotation in placements:
+        assert solution0.add_item(item_index, position, rotation)
+    for item_index, position, rotation in reversed(placements):
+        assert solution1.add_item(item_index, position, rotation)
+
+    assert solution0.get_fingerprint() == solution1.get_fingerprint()
+    assert solution1.move_item(3, (0.1, 0.))
+    assert solution0.get_fingerprint() != solution1.get_fingerprint()
+
+
+def test_evaluation_is_memoized_by_fingerprint():
+
+    """The evaluation of a solution must be memoized for its duplicates, and must find invalid placements"""
+
+    problem = get_problem()
+    solution = Solution(problem)
+    assert solution.add_item(0, (1., 1.), 0.)
+    assert solution.add_item(1, (3.5, 1.), 0.)
+
+    assert solution.get_evaluation() == (True, solution.value)
+    assert copy.deepcopy(solution).is_valid()
+    assert problem.get_solution_evaluation_stats()["hits"] == 1
+    assert problem.get_solution_evaluation_stats()["misses"] == 1
+
+    # overlapping placements can only be created directly
+    invalid_solution = Solution(problem, {0: PlacedShape(problem.items[0].shape, (1., 1.), 0.), 1: PlacedShape(problem.items[1].shape, (0.5, 0.5), 0.)}, 2., 3.)
+    assert invalid_solution.get_evaluation() == (False, 0.)
+
+
+def test_deduplicated_offspring_are_unique():
+
+    """The offspring kept after deduplication must have distinct fingerprints, different from those of the population, and the search must still find valid solutions"""
+
+    problem = get_problem()
+    offspring = list()
+    original_get_unique_solutions = evolutionary.get_unique_solutions
+
+    def get_unique_solutions(solutions, existing_solutions=None):
+        unique_solutions = original_get_unique_solutions(solutions, existing_solutions)
+        offspring.append((unique_solutions, {solution.get_fingerprint() for solution in existing_solutions}))
+        return unique_solutions
+
+    random.seed(0)
+    np.random.seed(0)
+    evolutionary.get_unique_solutions = get_unique_solutions
+    try:
+        solution = evolutionary.solve_problem(problem, population_size=6, offspring_size=12, max_generation_num=3, mutation_min_iter_num=1, validate_offspring=True)
+    finally:
+        evolutionary.get_unique_solutions = original_get_unique_solutions
+
+    assert offspring
+    for unique_solutions, population_fingerprints in offspring:
+        fingerprints = [solution.get_fingerprint() for solution in unique_solutions]
+        assert len(set(fingerprints)) == len(fingerprints)
+        assert not population_fingerprints.intersection(fingerprints)
+    assert solution.is_valid()
@@ -0,0 +1,61 @@
+import random
+from shapely.geometry import MultiPolygon, Point, Polygon
+from problem_solution import Container, Item, Problem, Solution
+from circle import Circle
+from ellipse import Ellipse
+
+
+def get_problem(container_shape):
+
+    """Return a problem with the passed container shape and items of every kind of shape"""
+
+    items = [Item(Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)]), 1., 1.), Item(Polygon([(0, 0), (3, 0), (0, 1)]), 1., 1.), Item(Circle((0, 0), 0.7), 1., 1.), Item(Ellipse((0, 0), 1., 0.5), 1., 1.), Item(Polygon([(0, 0), (20, 0), (20, 20), (0, 20)]), 1., 1.)]
+
+    return Problem(Container(100., container_shape), items)
+
+
+def test_inner_fit_region_matches_exact_checks():
+
+    """A position of the bounds of the container must be in the inner-fit region of an item if and only if the item placed there is within the container"""
+
+    random.seed(0)
+
+    for container_shape in (Polygon([(0, 0), (10, 0), (10, 6), (0, 6)]), Polygon([(0, 0), (8, 0), (10, 5), (3, 9)]), Circle((5, 5), 5)):
+        problem = get_problem(container_shape)
+        min_x, min_y, max_x, max_y = problem.container.bounds
+
+        for item_index in problem.items:
+            for rotation in (0., 90., 135.):
+                region = problem.get_inner_fit_region(item_index, rotation, 8)
+
+                for _ in range(50):
+                    position = random.uniform(min_x, max_x), random.uniform(min_y, max_y)
+
+                    # the circular container is circumscribed by a polygon, so the region may only include positions out of the container
+                    if region.shape.intersects(Point(position)) or type(container_shape) != Circle:
+                        assert region.shape.intersects(Point(position)) == Solution(problem).add_item(item_index, position, rotation)
+
+
+def test_sampled_positions_fit():
+
+    """The positions drawn from the inner-fit region of an item must be valid placements, and the items too big for the container must not fit"""
+
+    random.seed(1)
+    problem = get_problem(Polygon([(0, 0), (10, 0), (10, 6), (0, 6)]))
+
+    for item_index in range(4):
+        region = problem.get_inner_fit_region(item_index, 45., 8)
+        for _ in range(50):
+            assert Solution(problem).add_item(item_index, region.sample_position(), 45.)
+
+    assert not problem.can_item_fit(4, 8)
+
+
+def test_non_convex_container_does_not_use_regions():
+
+    """Inner-fit regions must not be used in a non-convex container"""
+
+    problem = get_problem(MultiPolygon([(((0, 0), (0, 8), (8, 8), (8, 4), (5, 4), (5, 0)), [])]))
+
+    assert not Solution(problem, use_inner_fit_regions=True).use_inner_fit_regions
+    assert problem.can_item_fit(4, 8)
@@ -0,0 +1,63 @@
+import math
+import random
+from shapely.geometry import MultiPolygon, Polygon
+from problem_solution import Item, PlacedShape
+from circle import Circle
+from ellipse import Ellipse
+from shape_functions import do_shapes_intersect, get_intersection_prefilter_stats, reset_intersection_prefilter_stats
+
+
+def get_random_star(point_num, min_radius, max_radius):
+
+    """Return a random star-shaped polygon with the passed number of points, at random angles and distances from the origin in the passed range"""
+
+    angles = sorted(random.uniform(0., 2. * math.pi) for _ in range(point_num))
+
+    return Polygon([(math.cos(angle) * random.uniform(min_radius, max_radius), math.sin(angle) * random.uniform(min_radius, max_radius)) for angle in angles])
+
+
+def get_random_items():
+
+    """Return items with random polygons, multi-polygons, circles and ellipses"""
+
+    random.seed(0)
+    shapes = list()
+    for _ in range(5):
+        shapes.append(get_random_star(random.randint(3, 10), 1., 1.).convex_hull)
+        shapes.append(get_random_star(random.randint(5, 14), 0.3, 1.2))
+        shapes.append(MultiPolygon([(((0, 0), (0, 2), (2, 2), (2, 0)), [((0.3, 0.3), (0.3, 1.7), (1.7, 1.7), (1.7, 0.3))])]))
+        shapes.append(Circle((0., 0.), random.uniform(0.2, 1.)))
+        shapes.append(Ellipse((0., 0.), random.uniform(0.3, 1.2), random.uniform(0.3, 1.2)))
+
+    return [Item(shape, 1., 1.) for shape in shapes if type(shape) in (Circle, Ellipse) or shape.is_valid]
+
+
+def test_prefiltered_checks_match_exact():
+
+    """The intersection checks of random placements with their bounding boxes and circles must match the exact checks without them, and the prefilter must settle some of them"""
+
+    items = get_random_items()
+    reset_intersection_prefilter_stats()
+    intersection_num = 0
+    for _ in range(1000):
+        placed_shapes = [PlacedShape(item.shape, (random.uniform(-3., 3.), random.uniform(-3., 3.)), random.uniform(0., 360.)) for item in random.sample(items, 2)]
+        expected = do_shapes_intersect(placed_shapes[0].shape, placed_shapes[1].shape)
+        assert do_shapes_intersect(placed_shapes[0].shape, placed_shapes[1].shape, placed_shapes[0].get_current_bounds(), placed_shapes[1].get_current_bounds(), placed_shapes[0].get_bounding_circle(), placed_shapes[1].get_bounding_circle()) == expected
+        intersection_num += expected
+
+    # both outcomes must be well represented
+    assert 100 < intersection_num < 900
+    assert get_intersection_prefilter_stats()["hits"] > 0
+
+
+def test_prefilter_keeps_touching_shapes():
+
+    """Shapes whose bounding boxes or circles only touch must be checked exactly, since touching shapes intersect"""
+
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    other_square = Polygon([(1, 0), (2, 0), (2, 1), (1, 1)])
+    assert do_shapes_intersect(square, other_square, square.bounds, other_square.bounds)
+
+    circle = Circle((0., 0.), 1.)
+    other_circle = Circle((2., 0.), 1.)
+    assert do_shapes_intersect(circle, other_circle, bounding_circle0=(0., 0., 1.), bounding_circle1=(2., 0., 1.)) == circle.intersects(other_circle)
@@ -0,0 +1,88 @@
+import copy
+import random
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+import greedy
+from problem_solution import Container, Item, Problem
+
+
+def get_problem():
+
+    """Return a problem with a rectangular container and repeated non-convex and square items"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    items = [Item(shape, 1., value) for _ in range(6) for value, shape in enumerate([l_shape, square], 1)]
+
+    return Problem(Container(100., Polygon([(0, 0), (6, 0), (6, 5), (0, 5)])), items)
+
+
+def get_state(solution):
+
+    """Return the placements (in their order), weight, value, fingerprint and indexed bounds of the passed solution, in a comparable form"""
+
+    placements = [(index, placed_shape.position, placed_shape.rotation, placed_shape.get_pose(), tuple(np.round(placed_shape.get_current_bounds(), 9))) for index, placed_shape in solution.placed_items.items()]
+
+    return placements, round(solution.weight, 9), round(solution.value, 9), solution.fingerprint, sorted(solution.placed_item_grid.item_bounds.items())
+
+
+def apply_random_changes(solution, change_num):
+
+    """Apply the passed number of random tentative changes to the passed solution"""
+
+    item_indices = list(range(len(solution.problem.items)))
+    for _ in range(change_num):
+        operation_probability = random.random()
+        item_index = random.choice(item_indices)
+        if operation_probability < 0.2:
+            solution.add_item(item_index, solution.get_random_placement(item_index)[0], random.uniform(0., 360.))
+        elif operation_probability < 0.3:
+            solution.remove_random_item()
+        elif operation_probability < 0.5:
+            solution.move_item_to(item_index, solution.get_random_placement(item_index)[0])
+        elif operation_probability < 0.7:
+            solution.rotate_item(item_index, random.uniform(-90., 90.))
+        elif operation_probability < 0.85:
+            solution.move_and_rotate_item(item_index, (random.uniform(-1., 1.), random.uniform(-1., 1.)), random.uniform(-90., 90.))
+        else:
+            solution.swap_placements(*random.sample(item_indices, 2))
+
+
+@pytest.mark.parametrize("options", [dict(), dict(lazy_placements=True), dict(rotation_bucket_num=8)])
+def test_rollback_restores_copy(options):
+
+    """Rolling back random changes (to an intermediate checkpoint and to the start of the transaction) must restore the solution to a deep copy taken before them"""
+
+    random.seed(0)
+    solution = greedy.solve_problem(get_problem(), max_iter_num=200, repetition_num=1, seed=0, **options)
+
+    for _ in range(5):
+        solution_copy = copy.deepcopy(solution)
+        checkpoint = solution.begin_transaction()
+        apply_random_changes(solution, 30)
+        intermediate_checkpoint = solution.checkpoint()
+        intermediate_state = get_state(solution)
+        apply_random_changes(solution, 30)
+        solution.rollback(intermediate_checkpoint)
+        assert get_state(solution) == intermediate_state
+        solution.rollback(checkpoint)
+        solution.commit_transaction()
+        assert get_state(solution) == get_state(solution_copy)
+        apply_random_changes(solution, 10)
+
+
+def test_failed_change_leaves_no_entries():
+
+    """A tentative change undone within its method must leave no entries in the journal"""
+
+    solution = greedy.solve_problem(get_problem(), max_iter_num=200, repetition_num=1, seed=0)
+    solution.begin_transaction()
+    placed_index = next(iter(solution.placed_items))
+    unplaced_index = next(index for index in range(len(solution.problem.items)) if index not in solution.placed_items)
+
+    # positions outside the container are always invalid
+    assert not solution.add_item(unplaced_index, (100., 100.), 0.)
+    assert not solution.move_item_to(placed_index, (100., 100.))
+    assert not solution.move_and_rotate_item(placed_index, (100., 100.), 45.)
+    assert solution.journal == list()
@@ -0,0 +1,157 @@
+import math
+import random
+from shapely import affinity
+from shapely.geometry import MultiPolygon, Point, Polygon
+import greedy
+from problem_solution import Container, Item, Problem, Solution
+from no_fit_polygon import NoFitPolygonEngine, get_edge_minkowski_sum, get_minkowski_sum, TOUCHING_GAP
+from circle import Circle
+from shape_functions import are_bounds_within, do_shapes_intersect
+
+
+def get_translated_shape(shape, x, y):
+
+    """Return a copy of the passed shape translated by the passed displacement"""
+
+    if type(shape) == Circle:
+        return Circle((shape.center.x + x, shape.center.y + y), shape.radius)
+
+    return affinity.translate(shape, x, y)
+
+
+def get_star(point_num, min_radius, max_radius):
+
+    """Return a random star-shaped polygon with the passed number of points"""
+
+    angles = sorted(random.uniform(0, 2 * math.pi) for _ in range(point_num))
+
+    return Polygon([(math.cos(angle) * random.uniform(min_radius, max_radius), math.sin(angle) * random.uniform(min_radius, max_radius)) for angle in angles])
+
+
+def get_random_shapes(shape_num):
+
+    """Return a list with the passed number of random valid shapes: convex and non-convex polygons, L-shapes and multi-polygons"""
+
+    generators = [lambda: get_star(random.randint(3, 10), 1, 1).convex_hull, lambda: get_star(random.randint(5, 14), 0.3, 1.2), lambda: Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)]), lambda: MultiPolygon([get_star(5, 1, 1).convex_hull, affinity.translate(get_star(7, 0.3, 1), 2.5, 0)])]
+
+    shapes = list()
+    while len(shapes) < shape_num:
+        shape = random.choice(generators)()
+        if shape.is_valid:
+            shapes.append(shape)
+
+    return shapes
+
+
+def test_minkowski_sum_matches_edge_sums():
+
+    """The Minkowski sum found with convex decompositions must match the union of the sums of pairs of edges"""
+
+    random.seed(0)
+    shapes = get_random_shapes(60)
+
+    for shape0, shape1 in zip(shapes[::2], shapes[1::2]):
+        reflected_shape1 = affinity.scale(shape1, -1., -1., origin=(0., 0.))
+        expected_sum = get_edge_minkowski_sum(shape0, reflected_shape1)
+        assert get_minkowski_sum(shape0, reflected_shape1).symmetric_difference(expected_sum).area <= expected_sum.area * 1e-9
+
+
+def test_no_fit_polygon_matches_exact_checks():
+
+    """A position must be in the no-fit polygon of a pair of items if and only if the placed shapes intersect"""
+
+    random.seed(1)
+    items = {index: Item(shape, 1., 1.) for index, shape in enumerate(get_random_shapes(10) + [Circle((0, 0), 0.5)])}
+    engine = NoFitPolygonEngine(items, 4)
+
+    for fixed_index in items:
+        for moving_index in items:
+            fixed_bucket, moving_bucket = random.randrange(4), random.randrange(4)
+            _, prepared_no_fit_polygon = engine.get_no_fit_polygon(fixed_index, fixed_bucket, moving_index, moving_bucket)
+            fixed_shape = engine.get_rotated_shape(fixed_index, engine.get_rotation_bucket(fixed_index, fixed_bucket))
+            moving_shape = engine.get_rotated_shape(moving_index, engine.get_rotation_bucket(moving_index, moving_bucket))
+
+            for _ in range(20):
+                x, y = random.uniform(-4, 4), random.uniform(-4, 4)
+
+                # circles are approximated with inscribed polygons, so the no-fit polygon may only miss intersections with them
+                if prepared_no_fit_polygon.intersects(Point(x, y)) or type(moving_shape) != Circle and type(fixed_shape) != Circle:
+                    assert prepared_no_fit_polygon.intersects(Point(x, y)) == do_shapes_intersect(fixed_shape, get_translated_shape(moving_shape, x, y))
+
+
+def test_equal_items_share_no_fit_polygons():
+
+    """The no-fit polygons of items with equal shapes must be calculated once"""
+
+    items = {index: Item(Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)]), 1., 1.) for index in range(4)}
+    engine = NoFitPolygonEngine(items, 2)
+
+    for fixed_index in items:
+        for moving_index in items:
+            engine.get_no_fit_polygon(fixed_index, 1, moving_index, 0)
+
+    assert engine.get_stats()["misses"] == 1
+
+
+def get_solution(**options):
+
+    """Return a solution of a problem with a rectangular container and repeated non-convex items, with some of them placed, with rotations quantized to four buckets"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    star = Polygon([(math.cos(angle) * radius, math.sin(angle) * radius) for angle, radius in zip([i * math.pi / 5 for i in range(10)], [0.9, 0.4] * 5)])
+    problem = Problem(Container(100., Polygon([(0, 0), (8, 0), (8, 6), (0, 6)])), [Item(shape, 1., 1.) for _ in range(4) for shape in (l_shape, star)])
+    solution = Solution(problem, rotation_bucket_num=4, **options)
+    for item_index, position, rotation in ((0, (2., 2.), 0.), (1, (5., 2.), 90.), (2, (2.5, 4.5), 180.)):
+        assert solution.add_item(item_index, position, rotation)
+
+    return solution
+
+
+def test_precompute_calculates_all_pairs():
+
+    """Precomputing the no-fit polygons must calculate those of every pair of shapes and rotation buckets, once, so that later queries find them cached"""
+
+    solution = get_solution()
+    engine = NoFitPolygonEngine(solution.problem.items, 4)
+    engine.precompute()
+
+    assert engine.get_stats()["misses"] == (2 * 4) ** 2
+    for fixed_index in solution.problem.items:
+        for moving_index in solution.problem.items:
+            engine.get_no_fit_polygon(fixed_index, 3, moving_index, 1)
+    assert engine.get_stats()["misses"] == (2 * 4) ** 2
+
+
+def test_touching_positions_are_next_to_placed_items():
+
+    """The touching positions of an item must not make it intersect any placed item, and must be next to (at about the gap from) one of them"""
+
+    solution = get_solution()
+    engine = solution.problem.get_no_fit_polygon_engine(4)
+    placed_shapes = [placed_shape.shape for placed_shape in solution.placed_items.values()]
+
+    for item_index in (3, 4):
+        for rotation_bucket in range(4):
+            positions = engine.get_touching_positions(solution, item_index, rotation_bucket, TOUCHING_GAP)
+            assert positions
+            for x, y in positions:
+                shape = get_translated_shape(engine.get_rotated_shape(item_index, rotation_bucket), x, y)
+                assert not any(do_shapes_intersect(shape, placed_shape) for placed_shape in placed_shapes)
+                assert min(shape.distance(placed_shape) for placed_shape in placed_shapes) < 10 * TOUCHING_GAP
+
+
+def test_bottom_left_placements_include_touching_positions():
+
+    """With no-fit polygons, the candidate bottom-left placements must include the positions touching the placed items, and the greedy algorithm must find valid solutions with them"""
+
+    solution = get_solution(use_no_fit_polygons=True)
+    engine = solution.problem.get_no_fit_polygon_engine(4)
+    candidates = set(solution.get_bottom_left_placements(3, 4))
+    touching_placements = {((x, y), rotation_bucket * 90.) for rotation_bucket in range(4) for x, y in engine.get_touching_positions(solution, 3, rotation_bucket) if are_bounds_within(get_translated_shape(engine.get_rotated_shape(3, rotation_bucket), x, y).bounds, solution.problem.container.bounds)}
+
+    assert touching_placements and candidates.issuperset(touching_placements)
+    assert candidates.difference(get_solution().get_bottom_left_placements(3, 4))
+
+    result = greedy.solve_problem(solution.problem, max_iter_num=50, repetition_num=1, rotation_bucket_num=4, use_no_fit_polygons=True, placement_strategy=greedy.BOTTOM_LEFT_FILL_PLACEMENT, seed=0)
+    assert result.placed_items
+    assert all(result.is_valid_placement(item_index) for item_index in result.placed_items)
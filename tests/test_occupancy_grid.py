@@ -0,0 +1,75 @@
+import math
+import random
+import pytest
+from shapely.geometry import MultiPolygon, Polygon, box
+import greedy
+from problem_solution import Container, Item, Problem, Solution
+from circle import Circle
+from ellipse import Ellipse
+
+
+def get_problem():
+
+    """Return a problem with a rectangular container and repeated non-convex, holed, square, circular and elliptical items"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    frame = MultiPolygon([(((0, 0), (0, 1.5), (1.5, 1.5), (1.5, 0)), [((0.3, 0.3), (0.3, 1.2), (1.2, 1.2), (1.2, 0.3))])])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    items = [Item(shape, 1., value) for _ in range(4) for value, shape in enumerate([l_shape, frame, square, Circle((0., 0.), 0.5), Ellipse((0., 0.), 0.7, 0.4)], 1)]
+
+    return Problem(Container(100., Polygon([(0, 0), (7, 0), (7, 5), (0, 5)])), items)
+
+
+def test_full_cells_are_covered():
+
+    """Every cell that the occupancy grid considers fully covered by a placed item must be inside the shape of the item"""
+
+    solution = greedy.solve_problem(get_problem(), max_iter_num=300, repetition_num=1, use_occupancy_grid=True, seed=0)
+    grid = solution.occupancy_grid
+    grid.refresh(solution.placed_items)
+    full_cell_num = 0
+
+    for item_index, (_, rows, columns) in grid.item_cells.items():
+        shape = solution.placed_items[item_index].shape
+        shape = shape.polygon if type(shape) == Ellipse else shape
+        for row, column in zip(rows, columns):
+            cell = box(grid.min_x + column * grid.cell_width, grid.min_y + row * grid.cell_height, grid.min_x + (column + 1) * grid.cell_width, grid.min_y + (row + 1) * grid.cell_height)
+
+            # a cell is inside a circle if all its corners are, which its approximate polygon (inscribed in it) may not show
+            if type(shape) == Circle:
+                assert all(math.hypot(x - shape.center.x, y - shape.center.y) <= shape.radius for x, y in cell.exterior.coords)
+            else:
+                assert cell.within(shape)
+            full_cell_num += 1
+
+    assert full_cell_num > 0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_grid_never_rejects_valid_placements(seed):
+
+    """Random additions, movements and rotations must succeed or fail in the same cases with and without the occupancy grid"""
+
+    random.seed(seed)
+    problem = get_problem()
+    solutions = [Solution(problem), Solution(problem, use_occupancy_grid=True)]
+    item_indices = list(range(len(problem.items)))
+    success_num = 0
+
+    for _ in range(500):
+        operation_probability = random.random()
+        item_index = random.choice(item_indices)
+        if operation_probability < 0.5:
+            position, rotation = solutions[0].get_random_placement(item_index)
+            results = [solution.add_item(item_index, position, rotation) for solution in solutions]
+        elif operation_probability < 0.8:
+            displacement = (random.uniform(-1., 1.), random.uniform(-1., 1.))
+            results = [solution.move_item(item_index, displacement) for solution in solutions]
+        else:
+            angle = random.uniform(-90., 90.)
+            results = [solution.rotate_item(item_index, angle) for solution in solutions]
+        assert results[0] == results[1]
+        success_num += results[0]
+
+    assert success_num > 10
+    assert solutions[0].placed_items.keys() == solutions[1].placed_items.keys()
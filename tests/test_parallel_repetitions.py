@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+import greedy
+from problem_solution import Container, Item, Problem
+from circle import Circle
+
+
+def get_problem():
+
+    """Return a problem with a rectangular container and repeated non-convex, square and circular items"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    items = [Item(shape, 1., value) for _ in range(5) for value, shape in enumerate([l_shape, square, Circle((0., 0.), 0.5)], 1)]
+
+    return Problem(Container(100., Polygon([(0, 0), (6, 0), (6, 5), (0, 5)])), items)
+
+
+def get_placements(solution):
+
+    """Return the placements of the passed solution, by item index, in a comparable form (with undefined rotations as None)"""
+
+    return {index: (placed_shape.position, None if np.isnan(placed_shape.rotation) else placed_shape.rotation) for index, placed_shape in solution.placed_items.items()}
+
+
+@pytest.mark.parametrize("options", [dict(), dict(lazy_placements=True), dict(rotation_bucket_num=8)])
+def test_parallel_repetitions_match_sequential(options):
+
+    """Running the repetitions with a fixed seed in a pool of processes must find the same values per repetition and the same best solution as running them sequentially"""
+
+    results = list()
+    for process_num in (1, 2):
+        solution, repetition_values = greedy.solve_problem(get_problem(), max_iter_num=200, repetition_num=3, process_num=process_num, seed=7, return_repetition_values=True, **options)
+        results.append((repetition_values, solution.value, get_placements(solution)))
+
+    assert results[0] == results[1]
+    assert len(results[0][0]) == 3
@@ -0,0 +1,73 @@
+import random
+import numpy as np
+import pytest
+from shapely.geometry import MultiPolygon, Polygon
+import greedy
+import reversible
+from problem_solution import Container, Item, Problem, Solution
+from circle import Circle
+
+
+def get_problem():
+
+    """Return a problem with a holed container and repeated non-convex, square and circular items"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    items = [Item(shape, 1., value) for _ in range(5) for value, shape in enumerate([l_shape, square, Circle((0., 0.), 0.4)], 1)]
+    container_shape = MultiPolygon([(((0, 0), (0, 5), (7, 5), (7, 0)), [((3, 2), (3, 3), (4, 3), (4, 2))])])
+
+    return Problem(Container(100., container_shape), items)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_cached_checks_match_uncached(seed):
+
+    """Random changes, including repeated placements, must succeed or fail in the same cases with and without the cache of placement checks"""
+
+    random.seed(seed)
+    problem = get_problem()
+    solutions = [Solution(problem), Solution(problem, use_placement_check_cache=True)]
+    item_indices = list(range(len(problem.items)))
+    placements = list()
+    success_num = 0
+
+    for _ in range(500):
+        operation_probability = random.random()
+        item_index = random.choice(item_indices)
+        if operation_probability < 0.4:
+            placement = solutions[0].get_random_placement(item_index)
+            placements.append((item_index, placement))
+            results = [solution.add_item(item_index, *placement) for solution in solutions]
+
+        # repeating previous placements of items makes the cached checks be used
+        elif operation_probability < 0.6 and placements:
+            item_index, placement = random.choice(placements)
+            for solution in solutions:
+                if item_index in solution.placed_items:
+                    solution.remove_item(item_index)
+            results = [solution.add_item(item_index, *placement) for solution in solutions]
+        elif operation_probability < 0.8:
+            displacement = (random.uniform(-1., 1.), random.uniform(-1., 1.))
+            results = [solution.move_item(item_index, displacement) for solution in solutions]
+        else:
+            results = [solution.remove_item(item_index) if item_index in solution.placed_items else None for solution in solutions]
+        assert results[0] == results[1]
+        success_num += bool(results[0])
+
+    assert success_num > 10
+    assert problem.get_placement_check_stats()["hits"] > 0
+
+
+def test_solutions_with_cache_match_uncached():
+
+    """The algorithms must find the same solutions for a seed with and without the cache of placement checks"""
+
+    for solve_problem, options in ((greedy.solve_problem, dict(max_iter_num=300, repetition_num=2)), (reversible.solve_problem, dict(max_iter_num=300))):
+        placements = list()
+        for use_placement_check_cache in (False, True):
+            random.seed(0)
+            np.random.seed(0)
+            solution = solve_problem(get_problem(), use_placement_check_cache=use_placement_check_cache, **options)
+            placements.append({index: (placed_shape.position, placed_shape.get_pose()) for index, placed_shape in solution.placed_items.items()})
+        assert placements[0] and placements[0] == placements[1]
@@ -0,0 +1,60 @@
+import math
+import pickle
+import random
+from shapely.geometry import MultiPolygon, Polygon
+from problem_solution import Container, PlacedShape
+from circle import Circle
+from ellipse import Ellipse
+from shape_functions import does_shape_contain_other
+
+
+def get_random_star(point_num, min_radius, max_radius):
+
+    """Return a random star-shaped polygon with the passed number of points, at random angles and distances from the origin in the passed range"""
+
+    angles = sorted(random.uniform(0., 2. * math.pi) for _ in range(point_num))
+
+    return Polygon([(math.cos(angle) * random.uniform(min_radius, max_radius), math.sin(angle) * random.uniform(min_radius, max_radius)) for angle in angles])
+
+
+def get_containers():
+
+    """Return a simple polygonal container, and a multi-polygon container with holes and a second polygon"""
+
+    return [Container(100., Polygon([(0, 0), (6, 0), (6, 4), (3, 4), (3, 6), (0, 6)])), Container(100., MultiPolygon([(((-3, -3), (-3, 3), (3, 3), (3, -1), (0, -1), (0, -3)), [((1, 1), (1, 1.8), (1.8, 1.8), (1.8, 1)), ((-2, -2), (-2, -1), (-1, -1), (-1, -2))]), (((4, -3), (4, 3), (6, 3), (6, -3)), [])]))]
+
+
+def test_prepared_containment_checks_match_unprepared():
+
+    """The containment checks of random shapes in the prepared shape of a container must match those in the unprepared shape"""
+
+    random.seed(0)
+    shapes = [get_random_star(random.randint(3, 9), 0.2, 0.8) for _ in range(10)] + [Circle((0., 0.), random.uniform(0.1, 0.8)) for _ in range(5)] + [Ellipse((0., 0.), random.uniform(0.2, 0.8), random.uniform(0.2, 0.8)) for _ in range(5)]
+
+    for container in get_containers():
+        contained_num = 0
+        min_x, min_y, max_x, max_y = container.bounds
+        for _ in range(600):
+            shape = PlacedShape(random.choice(shapes), (random.uniform(min_x, max_x), random.uniform(min_y, max_y)), random.uniform(0., 360.)).shape
+            expected = does_shape_contain_other(container.shape, shape)
+            assert does_shape_contain_other(container.prepared_shape, shape) == expected
+            contained_num += expected
+
+        # both outcomes must be well represented
+        assert 50 < contained_num < 550
+
+
+def test_prepared_containment_of_touching_shapes():
+
+    """Shapes touching the boundary of a container (from inside or outside) must have the same containment with the prepared and unprepared shapes, also after unpickling the container"""
+
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    for container in get_containers() + [pickle.loads(pickle.dumps(container)) for container in get_containers()]:
+        for x, y in container.shape.convex_hull.exterior.coords:
+            for dx in (-1., 0.):
+                for dy in (-1., 0.):
+                    shape = Polygon([(x + dx + px, y + dy + py) for px, py in square.exterior.coords])
+                    assert does_shape_contain_other(container.prepared_shape, shape) == does_shape_contain_other(container.shape, shape)
+        for center, radius in (((1., 1.), 1.), ((1.4, 1.4), 0.4), ((5., 0.), 1.)):
+            circle = Circle(center, radius)
+            assert does_shape_contain_other(container.prepared_shape, circle) == does_shape_contain_other(container.shape, circle)
@@ -0,0 +1,78 @@
+import random
+import numpy as np
+from shapely.geometry import LineString, MultiLineString, Point, Polygon, box
+import greedy
+from problem_solution import Container, Item, Problem
+from ray_casting import get_nearest_ray_hit_proportion, get_ray_box_crossing_mask
+
+
+def get_random_ray():
+
+    """Return the origin and (x, y) displacement of a random ray, which is axis-parallel in some cases"""
+
+    origin = (random.uniform(-1., 1.), random.uniform(-1., 1.))
+    displacement = [random.uniform(-2., 2.), random.uniform(-2., 2.)]
+    if random.random() < 0.2:
+        displacement[random.randrange(2)] = 0.
+
+    return origin, tuple(displacement)
+
+
+def test_nearest_hits_match_shapely():
+
+    """The nearest hit of random rays with random segments must be at the distance of the nearest intersection point found by Shapely"""
+
+    random.seed(0)
+    for _ in range(500):
+        origin, displacement = get_random_ray()
+        if displacement == (0., 0.):
+            continue
+        segments = np.random.RandomState(random.randrange(1000)).uniform(-1.5, 1.5, (random.randint(1, 8), 4))
+        hit_proportion = get_nearest_ray_hit_proportion(origin, displacement, segments)
+
+        ray = LineString([origin, (origin[0] + displacement[0], origin[1] + displacement[1])])
+        intersection = ray.intersection(MultiLineString([[(x0, y0), (x1, y1)] for x0, y0, x1, y1 in segments]))
+        if intersection.is_empty:
+            assert hit_proportion is None
+        else:
+            assert abs(hit_proportion * ray.length - Point(origin).distance(intersection)) < 1e-9
+
+
+def test_box_crossings_match_shapely():
+
+    """The boxes crossed by random rays, including axis-parallel ones, must be those whose rectangles intersect the ray according to Shapely"""
+
+    random.seed(0)
+    for _ in range(200):
+        origin, displacement = get_random_ray()
+        bounds = np.sort(np.random.RandomState(random.randrange(1000)).uniform(-2., 2., (10, 2, 2)), axis=1).transpose(0, 2, 1).reshape(-1, 4)[:, [0, 2, 1, 3]]
+        ray = LineString([origin, (origin[0] + displacement[0], origin[1] + displacement[1])]) if displacement != (0., 0.) else Point(origin)
+        assert get_ray_box_crossing_mask(origin, displacement, bounds).tolist() == [box(*box_bounds).intersects(ray) for box_bounds in bounds]
+
+
+def test_ray_from_placed_item_stops_at_first_boundary():
+
+    """The nearest hit found for rays from the reference positions of placed items, checking the segments of the nearby items only, must be where a discrete scan along the ray first reaches the boundary of the container or of another item"""
+
+    random.seed(0)
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    items = [Item(shape, 1., 1.) for _ in range(6) for shape in (l_shape, square)]
+    solution = greedy.solve_problem(Problem(Container(100., Polygon([(0, 0), (6, 0), (6, 5), (0, 5)])), items), max_iter_num=200, repetition_num=1, seed=0)
+
+    for item_index, placed_item in solution.placed_items.items():
+        other_boundaries = [solution.problem.container.shape.boundary] + [other_placed_item.shape.boundary for other_index, other_placed_item in solution.placed_items.items() if other_index != item_index]
+        for _ in range(5):
+            angle = random.uniform(0., 2. * np.pi)
+            displacement = (np.cos(angle) * 8., np.sin(angle) * 8.)
+
+            # the item's own boundary is not an obstacle, and the container's is always hit within the maximum distance
+            hit_proportion = solution.get_ray_hit_proportion(item_index, displacement)
+            assert hit_proportion is not None
+
+            # the points of the ray before the hit are away from every boundary, and the hit is on one
+            for proportion in np.linspace(0., hit_proportion, 50, endpoint=False)[1:]:
+                point = Point(placed_item.position[0] + displacement[0] * proportion, placed_item.position[1] + displacement[1] * proportion)
+                assert min(boundary.distance(point) for boundary in other_boundaries) > 0.
+            hit_point = Point(placed_item.position[0] + displacement[0] * hit_proportion, placed_item.position[1] + displacement[1] * hit_proportion)
+            assert min(boundary.distance(hit_point) for boundary in other_boundaries) < 1e-9
@@ -0,0 +1,62 @@
+import math
+import random
+import numpy as np
+from shapely.geometry import Polygon
+from problem_solution import Container, Item, PlacedShape, Problem, Solution
+from circle import Circle
+
+# number of equally distributed angles to which rotations are quantized
+ROTATION_BUCKET_NUM = 8
+
+
+def get_problem():
+
+    """Return a problem with a rectangular container and repeated non-convex, star-shaped, square and circular items"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    star = Polygon([(math.cos(angle) * radius, math.sin(angle) * radius) for angle, radius in zip(np.linspace(0, 2 * math.pi, 10, endpoint=False), [0.9, 0.4] * 5)])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    items = [Item(shape, 1., value) for _ in range(5) for value, shape in enumerate([l_shape, star, square, Circle((0., 0.), 0.4)], 1)]
+
+    return Problem(Container(100., Polygon([(0, 0), (7, 0), (7, 5), (0, 5)])), items)
+
+
+def test_moved_templates_match_placed_shapes():
+
+    """A rotation template moved to a position must have the pose, geometry and bounds of the item placed directly there with the angle of the bucket, and the template must be left as it was"""
+
+    random.seed(0)
+    problem = get_problem()
+    for item in problem.items.values():
+        for rotation_bucket in range(ROTATION_BUCKET_NUM):
+            template = item.get_rotation_template(rotation_bucket, ROTATION_BUCKET_NUM)
+            template_shape = template.shape
+            position = (random.uniform(0., 7.), random.uniform(0., 5.))
+            moved_shape = template.get_moved_copy(position)
+            placed_shape = PlacedShape(item.shape, position, rotation_bucket * 360. / ROTATION_BUCKET_NUM)
+
+            assert moved_shape.position == placed_shape.position
+            assert np.array_equal(moved_shape.rotation, placed_shape.rotation, equal_nan=True)
+            assert moved_shape.shape.symmetric_difference(placed_shape.shape).area < 1e-9
+            assert np.allclose(moved_shape.get_current_bounds(), placed_shape.get_current_bounds(), rtol=0., atol=1e-9)
+            assert template.shape is template_shape and template.position == (0., 0.)
+
+
+def test_solutions_with_templates_match_direct_placements():
+
+    """Adding items with quantized rotations must succeed or fail in the same cases with rotation templates as with directly placed shapes"""
+
+    random.seed(1)
+    problem = get_problem()
+    solutions = [Solution(problem), Solution(problem, rotation_bucket_num=ROTATION_BUCKET_NUM)]
+    added_num = 0
+    for _ in range(300):
+        item_index = random.randrange(len(problem.items))
+        position = (random.uniform(0., 7.), random.uniform(0., 5.))
+        rotation = random.randrange(ROTATION_BUCKET_NUM) * 360. / ROTATION_BUCKET_NUM
+        is_added = solutions[0].add_item(item_index, position, rotation)
+        assert solutions[1].add_item(item_index, position, rotation) == is_added
+        added_num += is_added
+
+    assert added_num > 5
+    assert solutions[0].placed_items.keys() == solutions[1].placed_items.keys()
@@ -0,0 +1,107 @@
+import math
+import random
+import numpy as np
+from shapely import affinity
+from shapely.geometry import MultiPolygon, Polygon
+import greedy
+import problem_solution
+from problem_solution import Container, Item, LazyPlacedShape, Problem
+from ellipse import Ellipse
+from prepared_shape import PreparedShape
+from shape_functions import do_shapes_intersect, does_shape_contain_other
+
+
+def get_random_star(point_num, min_radius, max_radius):
+
+    """Return a random star-shaped polygon with the passed number of points, at random angles and distances from the origin in the passed range"""
+
+    angles = sorted(random.uniform(0., 2. * math.pi) for _ in range(point_num))
+
+    return Polygon([(math.cos(angle) * random.uniform(min_radius, max_radius), math.sin(angle) * random.uniform(min_radius, max_radius)) for angle in angles])
+
+
+def get_dense_l_shape():
+
+    """Return an L-shaped polygon with hundreds of points along its boundary"""
+
+    ring = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)]).exterior
+
+    return Polygon([ring.interpolate(distance).coords[0] for distance in np.linspace(0., ring.length, 400, endpoint=False)])
+
+
+def get_random_items():
+
+    """Return items with random simple and complex (with levels of simplified polygons) shapes, including multi-polygons, holed shapes and ellipses"""
+
+    random.seed(0)
+    shapes = [get_dense_l_shape(), MultiPolygon([(((0, 0), (0, 2), (2, 2), (2, 0)), [((0.3, 0.3), (0.3, 1.7), (1.7, 1.7), (1.7, 0.3))])])]
+    for _ in range(5):
+        shapes.append(get_random_star(random.randint(3, 10), 1., 1.).convex_hull)
+        shapes.append(get_random_star(random.randint(5, 14), 0.3, 1.2))
+        shapes.append(get_random_star(300, 0.7, 1.))
+        shapes.append(MultiPolygon([get_random_star(5, 1., 1.).convex_hull, affinity.translate(get_random_star(7, 0.3, 1.), 2.5, 0.)]))
+        shapes.append(Ellipse((0., 0.), random.uniform(0.3, 1.2), random.uniform(0.3, 1.2)))
+
+    return [Item(shape, 1., 1.) for shape in shapes]
+
+
+def get_random_placement(item):
+
+    """Return the geometry of a random lazy placement of the passed item, and its placed approximations (or None if it has none)"""
+
+    placed_shape = LazyPlacedShape(item.canonical_shape, item.vertex_array, (random.uniform(-2.5, 2.5), random.uniform(-2.5, 2.5)), random.uniform(0., 360.), item.bounding_radius)
+    approximation = item.get_approximation()
+
+    return placed_shape.shape, approximation.get_placement(*placed_shape.get_pose()) if approximation is not None else None
+
+
+def test_approximations_have_levels_for_complex_shapes():
+
+    """The shapes with many points must have levels of simplified polygons, and the simple ones only circles"""
+
+    for item in get_random_items():
+        approximation = item.get_approximation()
+        if approximation is not None:
+            assert (approximation.get_level_num() > 0) == (len(item.vertex_array) >= 256)
+
+
+def test_approximate_intersection_checks_match_exact():
+
+    """The intersection checks settled with the approximations of random placements must match the exact checks"""
+
+    items = get_random_items()
+    intersection_num = 0
+    for _ in range(1000):
+        shape0, approximation0 = get_random_placement(random.choice(items))
+        shape1, approximation1 = get_random_placement(random.choice(items))
+        expected = do_shapes_intersect(shape0, shape1)
+        assert do_shapes_intersect(shape0, shape1, approximation0=approximation0, approximation1=approximation1) == expected
+        intersection_num += expected
+
+    # both outcomes must be well represented
+    assert 100 < intersection_num < 900
+
+
+def test_approximate_containment_checks_match_exact():
+
+    """The containment checks settled with the approximations of random placements must match the exact checks, in a prepared holed container"""
+
+    container_shape = PreparedShape(MultiPolygon([(((-3, -3), (-3, 3), (3, 3), (3, -1), (0, -1), (0, -3)), [((1, 1), (1, 1.8), (1.8, 1.8), (1.8, 1))])]))
+    for item in get_random_items():
+        for _ in range(20):
+            shape, approximation = get_random_placement(item)
+            assert does_shape_contain_other(container_shape, shape, approximation) == does_shape_contain_other(container_shape, shape)
+
+
+def test_solutions_with_approximations_match_exact(monkeypatch):
+
+    """Solving a problem with lazy placements must find the same solution with and without approximations, since they only settle checks whose result is certain"""
+
+    items = [Item(shape, 1., 1.) for shape in (get_dense_l_shape(), Polygon([(0, 0), (1, 0), (1, 1), (0, 1)]), Ellipse((0., 0.), 0.6, 0.4)) for _ in range(4)]
+    positions = list()
+    for use_shape_approximations in (False, True):
+        monkeypatch.setattr(problem_solution, "USE_SHAPE_APPROXIMATIONS", use_shape_approximations)
+        solution = greedy.solve_problem(Problem(Container(100., Polygon([(0, 0), (5, 0), (5, 4), (0, 4)])), items), max_iter_num=300, repetition_num=1, lazy_placements=True, seed=0)
+        positions.append({index: (placed_shape.position, placed_shape.rotation) for index, placed_shape in solution.placed_items.items()})
+
+    assert positions[0] and positions[0] == positions[1]
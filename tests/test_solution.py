@@ -0,0 +1,97 @@
+import pickle
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+import greedy
+from problem_solution import Circle, Container, Item, Problem, Solution, PackedSolution, PlacedShape, LazyPlacedShape, get_quantized_pose
+from shape_functions import get_pose_matrix, transform_shape
+
+
+def get_square_problem():
+
+    """Return a problem with a square container and two square items"""
+
+    container = Container(10., Polygon([(0, 0), (10, 0), (10, 10), (0, 10)]))
+    items = [Item(Polygon([(0, 0), (1, 0), (1, 1), (0, 1)]), 1., 1.), Item(Polygon([(0, 0), (2, 0), (2, 1), (0, 1)]), 1., 2.)]
+
+    return Problem(container, items)
+
+
+def test_add_item_with_default_rotation():
+
+    """Adding an item without a rotation (which is undefined by default) must place it unrotated, with a valid pose"""
+
+    solution = Solution(get_square_problem())
+
+    assert solution.add_item(0, (5., 5.))
+    assert solution.add_item(1, (2., 2.))
+
+    for placed_shape in solution.placed_items.values():
+        pose_position, pose_rotation = placed_shape.get_pose()
+        assert pose_rotation == 0.
+        assert all(type(value) == int for value in get_quantized_pose(placed_shape, 1e-3, 1e-3))
+
+
+def test_packed_solution_with_default_rotation():
+
+    """Packing and unpacking a solution with unrotated items must keep their geometry"""
+
+    problem = get_square_problem()
+    solution = Solution(problem)
+    solution.add_item(0, (5., 5.))
+    solution.add_item(1, (2., 2.))
+
+    unpacked_solution = PackedSolution(solution).unpack(problem)
+
+    for item_index, placed_shape in solution.placed_items.items():
+        unpacked_shape = unpacked_solution.placed_items[item_index]
+        assert not np.isnan(unpacked_shape.get_pose()[1])
+        assert unpacked_shape.shape.symmetric_difference(placed_shape.shape).area < 1e-9
+
+
+def test_pose_after_rotation_around_other_origin():
+
+    """The pose of a placed shape rotated around the origin of another shape (like the items inside a rotated item) must describe its geometry"""
+
+    item = get_square_problem().items[1]
+
+    for placed_shape in (PlacedShape(item.shape, (3., 4.), 30.), LazyPlacedShape(item.canonical_shape, item.vertex_array, (3., 4.), 30., item.bounding_radius)):
+        placed_shape.rotate(45., False, (1., 1.))
+        placed_shape.rotate(-100., False, (6., 2.))
+
+        pose_position, pose_rotation = placed_shape.get_pose()
+        pose_shape = transform_shape(item.canonical_shape, get_pose_matrix(pose_position, pose_rotation))
+        assert pose_shape.symmetric_difference(placed_shape.shape).area < 1e-9
+
+
+def get_mixed_problem():
+
+    """Return a problem with a rectangular container and repeated L-shaped, square and circular items"""
+
+    l_shape = Polygon([(0, 0), (2, 0), (2, 0.5), (0.5, 0.5), (0.5, 2), (0, 2)])
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    items = [Item(shape, 1., value) for _ in range(5) for value, shape in enumerate([l_shape, square, Circle((0., 0.), 0.6)], 1)]
+
+    return Problem(Container(100., Polygon([(0, 0), (6, 0), (6, 5), (0, 5)])), items)
+
+
+@pytest.mark.parametrize("lazy_placements", [False, True])
+def test_packed_solution_round_trip(lazy_placements):
+
+    """Unpacking a pickled packed solution must restore placements of the same kind, with the same positions, rotations, geometry and validity"""
+
+    problem = get_mixed_problem()
+    solution = greedy.solve_problem(problem, max_iter_num=200, repetition_num=1, lazy_placements=lazy_placements, seed=0)
+
+    unpacked_solution = pickle.loads(pickle.dumps(solution.pack())).unpack(problem)
+
+    assert unpacked_solution.placed_items.keys() == solution.placed_items.keys()
+    assert (unpacked_solution.weight, unpacked_solution.value) == (solution.weight, solution.value)
+    for item_index, placed_shape in solution.placed_items.items():
+        unpacked_shape = unpacked_solution.placed_items[item_index]
+        assert type(unpacked_shape) == (LazyPlacedShape if lazy_placements else PlacedShape)
+        assert unpacked_shape.position == placed_shape.position
+        assert np.array_equal(unpacked_shape.rotation, placed_shape.rotation, equal_nan=True)
+        assert abs(unpacked_shape.shape.area - placed_shape.shape.area) < 1e-9
+        assert unpacked_shape.shape.symmetric_difference(placed_shape.shape).area < 1e-9
+        assert unpacked_solution.is_valid_placement(item_index)
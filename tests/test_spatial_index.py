@@ -0,0 +1,62 @@
+import random
+from spatial_index import PlacedItemGrid
+
+
+def get_random_bounds(container_bounds):
+
+    """Return random (min_x, min_y, max_x, max_y) bounds of a box around a point of (or slightly outside) the passed container bounds"""
+
+    min_x, min_y, max_x, max_y = container_bounds
+    x, y = random.uniform(min_x - 1., max_x + 1.), random.uniform(min_y - 1., max_y + 1.)
+    half_width, half_height = random.uniform(0., 1.5), random.uniform(0., 1.5)
+
+    return x - half_width, y - half_height, x + half_width, y + half_height
+
+
+def get_brute_force_neighbor_indices(item_bounds, bounds, item_index_to_ignore=None):
+
+    """Return the sorted indices of the passed indexed bounds that overlap (or touch) the passed bounds, checking all of them"""
+
+    min_x, min_y, max_x, max_y = bounds
+
+    return sorted(index for index, (other_min_x, other_min_y, other_max_x, other_max_y) in item_bounds.items() if index != item_index_to_ignore and other_min_x <= max_x and min_x <= other_max_x and other_min_y <= max_y and min_y <= other_max_y)
+
+
+def test_neighbor_queries_match_brute_force():
+
+    """The neighbors found in the grid must match a check of all the indexed bounds, while items are inserted, moved and removed"""
+
+    random.seed(0)
+    container_bounds = (0., 0., 10., 6.)
+    grid = PlacedItemGrid(container_bounds, 30)
+    item_bounds = dict()
+
+    for _ in range(2000):
+        item_index = random.randrange(30)
+        operation_probability = random.random()
+        if operation_probability < 0.4 and item_index not in item_bounds:
+            item_bounds[item_index] = get_random_bounds(container_bounds)
+            grid.insert(item_index, item_bounds[item_index])
+        elif operation_probability < 0.7 and item_index in item_bounds:
+            item_bounds[item_index] = get_random_bounds(container_bounds)
+            grid.update(item_index, item_bounds[item_index])
+        elif operation_probability < 0.8 and item_index in item_bounds:
+            del item_bounds[item_index]
+            grid.remove(item_index)
+
+        bounds = get_random_bounds(container_bounds)
+        assert sorted(grid.get_neighbor_indices(bounds)) == get_brute_force_neighbor_indices(item_bounds, bounds)
+        assert sorted(grid.get_neighbor_indices(bounds, item_index)) == get_brute_force_neighbor_indices(item_bounds, bounds, item_index)
+
+
+def test_touching_bounds_are_neighbors():
+
+    """Bounds that only touch the queried ones, including those on the boundaries of cells, must be found"""
+
+    grid = PlacedItemGrid((0., 0., 4., 4.), 4)
+    grid.insert(0, (0., 0., 2., 2.))
+    grid.insert(1, (2., 2., 4., 4.))
+    grid.insert(2, (3., 0., 4., 1.))
+
+    assert sorted(grid.get_neighbor_indices((2., 2., 2., 2.))) == [0, 1]
+    assert grid.get_neighbor_indices((1., 1., 3., 1.), 0) == [2]
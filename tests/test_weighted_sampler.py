@@ -0,0 +1,67 @@
+import random
+from weighted_sampler import WeightedSampler
+
+
+def get_linear_sample(weights, limit, selected_weight):
+
+    """Return the first of the positions below the passed limit with a weight (not None) whose cumulative weight exceeds the passed one, scanning all of them, or the last one with a weight if none does"""
+
+    cumulative_weight = 0.
+    last_position = -1
+    for position in range(limit):
+        if weights[position] is not None:
+            cumulative_weight += weights[position]
+            last_position = position
+            if cumulative_weight > selected_weight:
+                return position
+
+    return last_position
+
+
+def test_samples_match_linear_scan():
+
+    """The positions sampled with the tree must be those that a linear scan of the cumulative weights finds for the same random numbers, while positions are removed and discarded"""
+
+    random.seed(0)
+
+    # weights that are multiples of a power of two are summed without rounding errors, so that both methods must agree exactly
+    weights = [random.randint(1, 16) / 4. for _ in range(100)]
+    sampler = WeightedSampler(weights)
+    limit = len(weights)
+
+    for iteration in range(300):
+        if iteration % 10 == 9:
+            limit = random.randint(limit // 2, limit)
+            sampler.truncate(limit)
+        if not len(sampler):
+            break
+
+        selectable_weights = [weight for weight in weights[:limit] if weight is not None]
+        assert len(sampler) == len(selectable_weights)
+        assert sampler.get_total_weight() == sum(selectable_weights)
+
+        state = random.getstate()
+        position = sampler.sample()
+        random.setstate(state)
+        assert position == get_linear_sample(weights, limit, random.uniform(0, sum(selectable_weights)))
+
+        assert weights[position] is not None and position < limit
+        weights[position] = None
+        assert sampler.remove(position)
+        assert not sampler.remove(position)
+
+
+def test_sample_frequencies_follow_weights():
+
+    """The positions must be sampled with frequencies proportional to their weights"""
+
+    random.seed(0)
+    weights = [1., 2., 3., 4.]
+    sampler = WeightedSampler(weights)
+    counts = [0] * len(weights)
+    sample_num = 20000
+    for _ in range(sample_num):
+        counts[sampler.sample()] += 1
+
+    for weight, count in zip(weights, counts):
+        assert abs(count / sample_num - weight / sum(weights)) < 0.02